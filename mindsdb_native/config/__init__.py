@@ -31,6 +31,24 @@ class Config:
     # Default options for unning on sagemaker
     SAGEMAKER = if_env_else('SAGEMAKER', False)
 
+    # How many loaded models to keep in memory between predict calls (0 disables the cache)
+    MODEL_CACHE_SIZE = int(if_env_else('MODEL_CACHE_SIZE', 8))
+
+    # Upper bound (in bytes) on the estimated memory used by the cached models
+    MODEL_CACHE_MAX_MEMORY = int(if_env_else('MODEL_CACHE_MAX_MEMORY', 4 * pow(10, 9)))
+
+    # Upper bound (in bytes) on the disk space used by the cached type deduction and analysis of columns (0 disables the cache)
+    COLUMN_CACHE_MAX_SIZE = int(if_env_else('COLUMN_CACHE_MAX_SIZE', 5 * pow(10, 8)))
+
+    # Directory of the cached type deduction and analysis of columns (by default `.column_cache` in MINDSDB_STORAGE_PATH)
+    COLUMN_CACHE_PATH = if_env_else('COLUMN_CACHE_PATH', None)
+
+    # Concurrent `apredict` calls are merged into batches of up to this many rows ...
+    COALESCE_MAX_BATCH_SIZE = int(if_env_else('COALESCE_MAX_BATCH_SIZE', 256))
+
+    # ... waiting at most this many seconds for a batch to fill up
+    COALESCE_MAX_WAIT = float(if_env_else('COALESCE_MAX_WAIT', 0.005))
+
     @classmethod
     def telemetry_enabled(cls):
         telemetry_file = os.path.join(cls.MINDSDB_STORAGE_PATH, '..', 'telemetry.lock')
@@ -81,3 +81,6 @@ NO_LOGS_LOG_LEVEL = 50
 # Magic numbers for extracting significant clusters out of the confidence distribution
 PEAK_CONFIDENCE_THRESHOLD = 0.12
 CLUSTER_MEMBER_CONFIDENCE_THRESHOLD = 0.06
+
+# Number of calibration examples ICPs keep when they are recalibrated by `adjust`, the newest ones
+ICP_CALIBRATION_WINDOW = 10000
@@ -14,13 +14,14 @@ from mindsdb_native.libs.data_types.mindsdb_logger import log
 from mindsdb_native.libs.controllers.transaction import AnalyseTransaction
 from mindsdb_native.libs.controllers.predictor import _get_memory_optimizations, _prepare_sample_settings, Predictor
 from mindsdb_native.libs.helpers.multi_data_source import get_ds
-from mindsdb_native.libs.helpers.general_helpers import load_lmd, load_hmd
+from mindsdb_native.libs.helpers.general_helpers import load_lmd, load_hmd, save_lmd
 from mindsdb_native.libs.constants.mindsdb import (
     MODEL_STATUS_TRAINED,
     MODEL_STATUS_ERROR,
     TRANSACTION_ANALYSE
 )
 from mindsdb_native.libs.helpers.locking import MDBLock
+from mindsdb_native.libs.helpers.model_cache import MODEL_CACHE
 
 
 def validate(to_predict, from_data, accuracy_score_functions, learn_args=None, test_args=None):
@@ -151,6 +152,9 @@ def rename_model(old_model_name, new_model_name):
         if old_model_name == new_model_name:
             return True
 
+        MODEL_CACHE.invalidate(old_model_name)
+        MODEL_CACHE.invalidate(new_model_name)
+
         try:
             shutil.rmtree(os.path.join(CONFIG.MINDSDB_STORAGE_PATH, new_model_name))
             shutil.copytree(
@@ -166,10 +170,7 @@ def rename_model(old_model_name, new_model_name):
         lmd['name'] = new_model_name
         hmd['name'] = new_model_name
 
-        with open(os.path.join(CONFIG.MINDSDB_STORAGE_PATH,
-                            new_model_name, 'light_model_metadata.pickle'),
-                'wb') as fp:
-            pickle.dump(lmd, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        save_lmd(os.path.join(CONFIG.MINDSDB_STORAGE_PATH, new_model_name, 'light_model_metadata.pickle'), lmd)
 
         with open(os.path.join(CONFIG.MINDSDB_STORAGE_PATH,
                             new_model_name, 'heavy_model_metadata.pickle'),
@@ -188,6 +189,7 @@ def delete_model(model_name):
     :param model_name: name of the model
     :return: bool (True/False) True if model was deleted
     """
+    MODEL_CACHE.invalidate(model_name)
     p = os.path.join(CONFIG.MINDSDB_STORAGE_PATH, model_name)
     if os.path.isdir(p):
         with MDBLock('exclusive', 'delete_' + model_name):
@@ -205,7 +207,8 @@ def import_model(model_archive_path, new_name=None):
     shutil.unpack_archive(model_archive_path, extract_dir=extract_dir)
 
     try:
-        lmd = load_lmd(os.path.join(extract_dir, 'light_model_metadata.pickle'))
+        # Read every section now, the files are moved before the lmd is saved again
+        lmd = dict(load_lmd(os.path.join(extract_dir, 'light_model_metadata.pickle')))
     except Exception:
         shutil.rmtree(extract_dir)
         raise
@@ -224,9 +227,9 @@ def import_model(model_archive_path, new_name=None):
         os.path.join(CONFIG.MINDSDB_STORAGE_PATH, lmd['name'])
     )
 
+    MODEL_CACHE.invalidate(lmd['name'])
     with MDBLock('exclusive', 'detele_' + lmd['name']):
-        with open(os.path.join(CONFIG.MINDSDB_STORAGE_PATH, lmd['name'], 'light_model_metadata.pickle'), 'wb') as fp:
-            pickle.dump(lmd, fp,protocol=pickle.HIGHEST_PROTOCOL)
+        save_lmd(os.path.join(CONFIG.MINDSDB_STORAGE_PATH, lmd['name'], 'light_model_metadata.pickle'), lmd)
 
     print('Model files loaded')
     return lmd['name']
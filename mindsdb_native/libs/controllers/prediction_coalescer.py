@@ -0,0 +1,169 @@
+import os
+import time
+import asyncio
+from collections import deque
+
+from pandas import DataFrame
+
+from mindsdb_native.config import CONFIG
+from mindsdb_native.libs.data_types.transaction_output_data import PredictTransactionOutputData
+from mindsdb_native.libs.helpers.general_helpers import load_lmd
+from mindsdb_native.libs.helpers.model_cache import get_model_version
+
+
+def _get_rows(when_data, max_batch_size):
+    """
+    :return: `when_data` as a list of row dicts if it can be merged with other requests, None otherwise
+    """
+    if isinstance(when_data, dict):
+        return [when_data]
+    elif isinstance(when_data, list) and len(when_data) <= max_batch_size and all(isinstance(x, dict) for x in when_data):
+        return when_data
+    elif isinstance(when_data, DataFrame) and len(when_data) <= max_batch_size:
+        return when_data.to_dict('records')
+    return None
+
+
+def _slice_output(output, start, end):
+    """
+    :return: the rows of `output` from `start` to `end`, sharing its transaction (and thus its timings) and whatever
+    it already computed for the explanations. The input confidence of `output` is only kept by a slice with all of
+    its rows, since it's computed over all of them.
+    """
+    data = {k: v[start:end] for k, v in output._data.items()}
+    sliced_output = PredictTransactionOutputData(transaction=output._transaction, data=data)
+    if start == 0 and end >= len(output):
+        sliced_output._input_confidence = output._input_confidence
+    sliced_output._extra_insights = output._extra_insights
+    sliced_output._class_distribution_map = getattr(output, '_class_distribution_map', None)
+    sliced_output._important_cols = getattr(output, '_important_cols', None)
+    explanations = getattr(output, '_explanations', None)
+    if explanations is not None:
+        sliced_output._explanations = explanations[start:end]
+    return sliced_output
+
+
+class PredictionCoalescer():
+    """
+    Merges concurrent `apredict` calls for the same predictor into a single `predict` call.
+
+    Requests with the same predict arguments are queued until either `max_batch_size` rows are waiting or
+    `max_wait` seconds have passed since the first one arrived, then a single transaction is run over the
+    merged rows (in a worker thread, one batch at a time for every set of arguments) and each caller gets back the
+    slice with its own rows.
+    Timeseries models and large inputs are not merged, since rows from different callers would end up being
+    treated as history of each other.
+    """
+    def __init__(self, predictor, max_batch_size=None, max_wait=None, max_stats=1000):
+        self.predictor = predictor
+        self.max_batch_size = CONFIG.COALESCE_MAX_BATCH_SIZE if max_batch_size is None else max_batch_size
+        self.max_wait = CONFIG.COALESCE_MAX_WAIT if max_wait is None else max_wait
+
+        # One entry per predict call made, see `_run_batch`
+        self.batch_stats = deque(maxlen=max_stats)
+
+        self._pending = {}
+        self._timers = {}
+        # One lock per set of predict arguments, see `_get_lock`
+        self._locks = {}
+        self._is_timeseries = None
+        # References to the running batches, so they aren't garbage collected before they finish
+        self._tasks = set()
+
+    def _load_is_timeseries(self):
+        try:
+            lmd = load_lmd(os.path.join(CONFIG.MINDSDB_STORAGE_PATH, self.predictor.name, 'light_model_metadata.pickle'))
+            return lmd['tss']['is_timeseries']
+        except Exception:
+            return None
+
+    async def _model_is_timeseries(self):
+        version = get_model_version(self.predictor.name)
+        if self._is_timeseries is None or self._is_timeseries[0] != version:
+            # the metadata is only read again when the model changes, and never from within the event loop
+            loop = asyncio.get_event_loop()
+            is_timeseries = await loop.run_in_executor(None, self._load_is_timeseries)
+            self._is_timeseries = (version, is_timeseries)
+        return self._is_timeseries[1]
+
+    async def _run_in_executor(self, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, lambda: self.predictor.predict(*args, **kwargs))
+
+    def _get_lock(self, key):
+        """
+        :return: the lock that makes the predictions with the arguments of `key` run one at a time, requests with
+        other arguments don't wait for them
+        """
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+
+    async def predict(self, when_data, **predict_kwargs):
+        # Only requests with the same arguments can be merged
+        key = repr(sorted(predict_kwargs.items(), key=lambda kv: kv[0]))
+
+        rows = _get_rows(when_data, self.max_batch_size)
+        if rows is None or await self._model_is_timeseries() is not False:
+            async with self._get_lock(key):
+                return await self._run_in_executor(when_data=when_data, **predict_kwargs)
+
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+
+        if key not in self._pending:
+            self._pending[key] = {'kwargs': predict_kwargs, 'requests': [], 'nr_rows': 0}
+        batch = self._pending[key]
+        batch['requests'].append((rows, future, time.time()))
+        batch['nr_rows'] += len(rows)
+
+        if batch['nr_rows'] >= self.max_batch_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+
+        return await future
+
+    def _flush(self, key):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self._pending.pop(key, None)
+        if batch is not None:
+            task = asyncio.ensure_future(self._run_batch(key, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, key, batch):
+        requests = batch['requests']
+        try:
+            await self._predict_batch(key, batch)
+        except Exception as e:
+            # Any failure is handed to the callers still waiting, instead of being lost with the task
+            for _, future, _ in requests:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _predict_batch(self, key, batch):
+        requests = batch['requests']
+        merged_rows = [row for rows, _, _ in requests for row in rows]
+
+        async with self._get_lock(key):
+            started_at = time.time()
+            output = await self._run_in_executor(when_data=merged_rows, **batch['kwargs'])
+            finished_at = time.time()
+
+        self.batch_stats.append({
+            'nr_requests': len(requests),
+            'nr_rows': len(merged_rows),
+            'max_queue_latency': started_at - min(enqueued_at for _, _, enqueued_at in requests),
+            'predict_time': finished_at - started_at
+        })
+
+        start = 0
+        for rows, future, _ in requests:
+            end = start + len(rows)
+            if not future.done():
+                future.set_result(None if output is None else _slice_output(output, start, end))
+            start = end
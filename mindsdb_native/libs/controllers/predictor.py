@@ -4,18 +4,27 @@ import psutil
 import uuid
 import pickle
 import functools
+import itertools
 import time
+import multiprocessing as mp
+
+import numpy as np
+import pandas as pd
 
 from mindsdb_native.__about__ import __version__
 from mindsdb_native.libs.data_types.mindsdb_logger import MindsdbLogger
-from mindsdb_native.libs.helpers.multi_data_source import get_ds
+from mindsdb_native.libs.helpers.multi_data_source import get_ds, iter_data_chunks
 from mindsdb_native.config import CONFIG
 from mindsdb_native.libs.controllers.transaction import (
     LearnTransaction, PredictTransaction, MutatingTransaction, AdjustTransaction
 )
 from mindsdb_native.libs.constants.mindsdb import *
+from mindsdb_native.libs.data_types.transaction_output_data import PredictTransactionOutputData
+from mindsdb_native.libs.controllers.prediction_coalescer import PredictionCoalescer
 from mindsdb_native.libs.helpers.general_helpers import load_lmd, load_hmd
 from mindsdb_native.libs.helpers.locking import MDBLock
+from mindsdb_native.libs.helpers.mp_helpers import get_nr_procs
+from mindsdb_native.libs.helpers.model_cache import MODEL_CACHE
 from mindsdb_native.libs.helpers.stats_helpers import sample_data
 
 
@@ -31,6 +40,122 @@ def _get_memory_optimizations(df):
     return sample_for_analysis, disable_lightwood_transform_cache
 
 
+# Rows per chunk when predicting in chunks an input whose length isn't known upfront
+PREDICTION_CHUNK_SIZE = 10000
+
+
+def _get_prediction_chunks(df, chunk_size, group_by=None):
+    """
+    Splits `df` into chunks of about `chunk_size` rows, keeping the original order of the rows within each chunk.
+    If `group_by` columns are given, every group is kept whole within a single chunk.
+
+    :return: a generator of (positions, chunk) tuples, `positions` being the positions in `df` of the rows of `chunk`
+    """
+    if not group_by:
+        for i in range(0, len(df), chunk_size):
+            yield np.arange(i, min(i + chunk_size, len(df))), df.iloc[i:i + chunk_size]
+        return
+
+    # Rows with a missing group value all end up in the same (-1) group instead of being dropped
+    group_ids = df.groupby(group_by, sort=False).ngroup().fillna(-1).astype(int).values
+    group_positions = pd.Series(np.arange(len(df))).groupby(group_ids, sort=False).indices
+
+    current = []
+    current_len = 0
+    for positions in group_positions.values():
+        if current and current_len + len(positions) > chunk_size:
+            chunk_positions = np.sort(np.concatenate(current))
+            yield chunk_positions, df.iloc[chunk_positions]
+            current = []
+            current_len = 0
+        current.append(positions)
+        current_len += len(positions)
+    if current:
+        chunk_positions = np.sort(np.concatenate(current))
+        yield chunk_positions, df.iloc[chunk_positions]
+
+
+def _iter_input_chunks(when_data, chunk_size):
+    """
+    Reads `when_data` `chunk_size` rows at a time, without loading the whole of it when it comes from a file or a database
+
+    :return: a generator of (None, chunk) tuples, the chunks holding consecutive rows in order
+    """
+    if isinstance(when_data, list):
+        for i in range(0, len(when_data), chunk_size):
+            yield None, when_data[i:i + chunk_size]
+    else:
+        for chunk in iter_data_chunks(when_data, chunk_size):
+            yield None, chunk.reset_index(drop=True)
+
+
+def _merge_prediction_chunks(chunk_outputs, nr_rows=None):
+    """
+    :param chunk_outputs: list of (positions, data) tuples, `positions` being the positions in the input of the rows
+    predicted in `data`, or None for chunks of consecutive rows given in order
+    :param nr_rows: number of rows in the input, only needed when some chunks have positions
+
+    :return: the `data` of all chunks merged, with the rows in the same order as in the input
+    """
+    keys = list(chunk_outputs[0][1].keys())
+    if all(positions is None for positions, _ in chunk_outputs):
+        return {k: [x for _, data in chunk_outputs for x in data[k]] for k in keys}
+
+    merged = {k: [None] * nr_rows for k in keys}
+    for positions, data in chunk_outputs:
+        for k in keys:
+            column = merged[k]
+            for position, x in zip(positions, data[k]):
+                column[position] = x
+    return merged
+
+
+def _merge_input_confidences(input_confidences, weights):
+    """
+    :return: the average of the confidence compositions predicted for every chunk, weighted by its number of rows
+    """
+    merged = {}
+    total = 0
+    for input_confidence, weight in zip(input_confidences, weights):
+        if input_confidence is None:
+            continue
+        total += weight
+        for pred_col, composition in input_confidence.items():
+            merged_composition = merged.setdefault(pred_col, {})
+            for col, value in composition.items():
+                merged_composition[col] = merged_composition.get(col, 0) + value * weight
+    if total == 0:
+        return None
+    return {pred_col: {col: value / total for col, value in composition.items()} for pred_col, composition in merged.items()}
+
+
+# Predictor living in each prediction worker process, its model stays warm between chunks
+_worker_predictor = None
+
+
+def _init_predict_worker(name, storage_path):
+    global _worker_predictor
+    CONFIG.MINDSDB_STORAGE_PATH = storage_path
+    CONFIG.CHECK_FOR_UPDATES = False
+    _worker_predictor = Predictor(name)
+
+
+def _predict_chunk(task):
+    positions, chunk, predict_kwargs, return_lmd = task
+    output = _worker_predictor.predict(when_data=chunk, **predict_kwargs)
+    if output is None:
+        return positions, len(chunk), None, None, [], None, None
+    return (
+        positions,
+        len(chunk),
+        output._data,
+        output._transaction.lmd if return_lmd else None,
+        output._transaction.timings,
+        output._input_confidence,
+        output._extra_insights
+    )
+
+
 def _prepare_sample_settings(user_provided_settings,
                              sample_for_analysis):
     default_sample_settings = dict(
@@ -102,6 +227,7 @@ class Predictor:
         self.log = MindsdbLogger(log_level=log_level, uuid=self.uuid, report_uuid=self.report_uuid)
         self.breakpoint = None
         self.transaction = None
+        self.coalescer = None
 
         if not CONFIG.SAGEMAKER:
             # If storage path is not writable, raise an exception as this can no longer be
@@ -149,7 +275,8 @@ class Predictor:
               equal_accuracy_for_all_output_categories=False,
               output_categories_importance_dictionary=None,
               advanced_args=None,
-              sample_settings=None):
+              sample_settings=None,
+              resume=False):
         """
         Learn to predict a column or columns from the data in 'from_data'
 
@@ -168,13 +295,22 @@ class Predictor:
             Includes `sample_for_analysis`. `sample_margin_of_error`, `sample_confidence_level`, `sample_percentage`, `sample_function`.
             Default values depend on the size of input dataset and available memory.
             Generally, the bigger the dataset, the more sampling is used.
+        :param advanced_args: dictionary of advanced options. `max_train_rows_memory` (default None), if set, is a cap
+            in bytes on the estimated memory of the copies of the training rows learn makes: the training rows are
+            subsampled to fit it. It doesn't bound the memory used by the whole learn, the data as extracted and
+            analyzed, and the test and validation rows, are kept whole.
 
         Optional debug arguments:
         :param stop_training_in_x_seconds: (default None), if set, you want training to finish in a given number of seconds
 
+        Optional recovery arguments:
+        :param resume: (default False), if True and a previous learn of this predictor on the same data didn't finish,
+            continue it after its last successful phase instead of learning from scratch
+
         :return:
         """
         with MDBLock('exclusive', 'learn_' + self.name):
+            MODEL_CACHE.invalidate(self.name)
             ignore_columns = [] if ignore_columns is None else ignore_columns
             timeseries_settings = {} if timeseries_settings is None else timeseries_settings
             advanced_args = {} if advanced_args is None else advanced_args
@@ -231,6 +367,7 @@ class Predictor:
                 sample_settings = sample_settings,
                 stop_training_in_x_seconds = stop_training_in_x_seconds,
                 rebuild_model = rebuild_model,
+                resume = resume,
                 model_accuracy = {'train': {}, 'test': {}},
                 column_importances = None,
                 columns_buckets_importances = None,
@@ -259,6 +396,7 @@ class Predictor:
                 tags_delimiter = advanced_args.get('tags_delimiter', ','),
                 force_predict = advanced_args.get('force_predict', False),
                 use_mixers = advanced_args.get('use_mixers', None) if advanced_args.get('models', None) is None else advanced_args['models'],
+                successive_halving = advanced_args.get('successive_halving', False),
                 setup_args = from_data.setup_args if hasattr(from_data, 'setup_args') else None,
                 debug = advanced_args.get('debug', False),
                 allow_incomplete_history = advanced_args.get('allow_incomplete_history', False),
@@ -271,7 +409,9 @@ class Predictor:
                 remove_columns_with_missing_targets = advanced_args.get('remove_columns_with_missing_targets', True),
                 max_processes = advanced_args.get('max_processes', None),
                 max_per_proc_usage = advanced_args.get('max_per_proc_usage', None),
+                max_train_rows_memory = advanced_args.get('max_train_rows_memory', None),
                 dateutil_parser_kwargs_per_column = advanced_args.get('dateutil_parser_kwargs_per_column', {}),
+                icp_calibration_window = advanced_args.get('icp_calibration_window', ICP_CALIBRATION_WINDOW),
 
                 learn_started_at = time.time(),
             )
@@ -298,7 +438,7 @@ class Predictor:
                     'heavy_model_metadata.pickle'
                 ))
 
-                for k in ['data_preparation', 'rebuild_model', 'type', 'columns_to_ignore', 'sample_margin_of_error', 'sample_confidence_level', 'stop_training_in_x_seconds']:
+                for k in ['data_preparation', 'rebuild_model', 'resume', 'type', 'columns_to_ignore', 'sample_margin_of_error', 'sample_confidence_level', 'stop_training_in_x_seconds']:
                     if old_lmd[k] is not None: light_transaction_metadata[k] = old_lmd[k]
 
                 if old_hmd['from_data'] is not None:
@@ -341,10 +481,11 @@ class Predictor:
                 else:
                     acc_f = accuracy_score_functions
 
+                explanations = predictions.explain_all()
                 if score_using is None:
-                    predicted = [x.explanation[col] for x in predictions]
+                    predicted = [x[col] for x in explanations]
                 else:
-                    predicted = [x.explanation[col][score_using] for x in predictions]
+                    predicted = [x[col][score_using] for x in explanations]
 
                 real = [x[f'__observed_{col}'] for x in predictions]
                 accuracy_dict[f'{col}_accuracy'] = acc_f(real, predicted)
@@ -389,6 +530,11 @@ class Predictor:
             if advanced_args is None:
                 advanced_args = {}
 
+            if advanced_args.get('n_jobs', 1) != 1 or advanced_args.get('chunk_size', None) is not None:
+                output = self._predict_in_chunks(when_data, use_gpu, advanced_args, backend)
+                if output is not None:
+                    return output
+
             transaction_type = TRANSACTION_PREDICT
             when_ds = None
             when = None
@@ -446,8 +592,178 @@ class Predictor:
             self.transaction.run()
             return self.transaction.output_data
 
+    def _predict_in_chunks(self, when_data, use_gpu, advanced_args, backend):
+        """
+        Splits `when_data` into chunks of `advanced_args['chunk_size']` rows and predicts them in a pool of
+        `advanced_args['n_jobs']` worker processes, each keeping its own warm copy of the model.
+
+        Files and databases are read a chunk at a time, as the workers need them. Timeseries inputs are split along
+        `group_by` boundaries, which needs the whole input to be loaded, and their predictions are put back in the
+        order of the input.
+
+        :return: the merged TransactionOutputData, or None if `when_data` can't be split and should be predicted as usual
+        """
+        if backend is not None and not isinstance(backend, str):
+            self.log.warning('Custom model backends can\'t be sent to worker processes, predicting in a single process')
+            return None
+
+        if isinstance(when_data, dict):
+            return None
+
+        group_by = None
+        lmd = load_lmd(os.path.join(CONFIG.MINDSDB_STORAGE_PATH, self.name, 'light_model_metadata.pickle'))
+        if lmd['tss']['is_timeseries']:
+            group_by = lmd['tss']['group_by']
+            if group_by is None:
+                return None
+            if isinstance(group_by, str):
+                group_by = [group_by]
+
+        df = None
+        nr_rows = None
+        if group_by is not None:
+            df = pd.DataFrame(when_data) if isinstance(when_data, list) else get_ds(when_data).df
+            nr_rows = len(df)
+        elif isinstance(when_data, (list, pd.DataFrame)):
+            nr_rows = len(when_data)
+
+        n_jobs = advanced_args.get('n_jobs', None)
+        if n_jobs is None or n_jobs < 1:
+            # every worker only holds the chunks it's predicting, so its memory usage is estimated from a single one
+            if df is not None:
+                sample_df = df.iloc[:PREDICTION_CHUNK_SIZE]
+            elif isinstance(when_data, list):
+                sample_df = pd.DataFrame(when_data[:PREDICTION_CHUNK_SIZE])
+            elif isinstance(when_data, pd.DataFrame):
+                sample_df = when_data.iloc[:PREDICTION_CHUNK_SIZE]
+            else:
+                sample_df = None
+            n_jobs = get_nr_procs(advanced_args.get('max_processes', None),
+                                  advanced_args.get('max_per_proc_usage', None),
+                                  sample_df)
+
+        chunk_size = advanced_args.get('chunk_size', None)
+        if chunk_size is None:
+            chunk_size = PREDICTION_CHUNK_SIZE if nr_rows is None else int(np.ceil(nr_rows / n_jobs))
+        chunk_size = max(chunk_size, 1)
+
+        if group_by is not None:
+            chunks = _get_prediction_chunks(df, chunk_size, group_by)
+            if isinstance(when_data, list):
+                chunks = ((positions, chunk.to_dict('records')) for positions, chunk in chunks)
+            else:
+                chunks = ((positions, chunk.reset_index(drop=True)) for positions, chunk in chunks)
+        else:
+            chunks = _iter_input_chunks(when_data, chunk_size)
+
+        # Inputs that fit in a single chunk are predicted as usual
+        first_chunks = list(itertools.islice(chunks, 2))
+        if len(first_chunks) < 2:
+            return None
+        chunks = itertools.chain(first_chunks, chunks)
+
+        predict_kwargs = dict(
+            use_gpu=use_gpu,
+            advanced_args={k: v for k, v in advanced_args.items() if k not in ('n_jobs', 'chunk_size')},
+            backend=backend
+        )
+        tasks = ((positions, chunk, predict_kwargs, i == 0) for i, (positions, chunk) in enumerate(chunks))
+
+        if nr_rows is not None:
+            n_jobs = min(n_jobs, int(np.ceil(nr_rows / chunk_size)))
+        self.log.info(f'Predicting in chunks of {chunk_size} rows using {n_jobs} processes')
+
+        chunk_outputs = []
+        timings = []
+        input_confidences = []
+        extra_insights = None
+        nr_chunk_rows = []
+        pool = mp.Pool(processes=n_jobs,
+                       initializer=_init_predict_worker,
+                       initargs=(self.name, CONFIG.MINDSDB_STORAGE_PATH))
+        try:
+            # `imap` only reads the input as fast as the workers consume it, contrary to `map`
+            for result in pool.imap(_predict_chunk, tasks):
+                positions, nr_input_rows, data, chunk_lmd, chunk_timings, input_confidence, chunk_extra_insights = result
+                if data is None:
+                    raise Exception('Failed to make predictions in a worker process, see the log for details')
+                if positions is not None and any(len(v) != len(positions) for v in data.values()):
+                    raise Exception('Got a different number of predictions than rows from a worker process')
+                if chunk_lmd is not None:
+                    lmd = chunk_lmd
+                chunk_outputs.append((positions, data))
+                timings.extend(chunk_timings)
+                input_confidences.append(input_confidence)
+                nr_chunk_rows.append(nr_input_rows)
+                if extra_insights is None:
+                    extra_insights = chunk_extra_insights
+        finally:
+            pool.close()
+            pool.join()
+
+        self.transaction = PredictTransaction(
+            session=self,
+            light_transaction_metadata=lmd,
+            heavy_transaction_metadata={'name': self.name}
+        )
+        self.transaction.timings.extend(timings)
+        output = PredictTransactionOutputData(transaction=self.transaction,
+                                              data=_merge_prediction_chunks(chunk_outputs, nr_rows))
+        output._input_confidence = _merge_input_confidences(input_confidences, nr_chunk_rows)
+        output._extra_insights = extra_insights
+        self.transaction.output_data = output
+        return self.transaction.output_data
+
+    def predict_stream(self,
+                       when_data,
+                       chunk_size=10000,
+                       use_gpu=None,
+                       advanced_args=None,
+                       backend=None):
+        """
+        Generator version of `predict` for inputs too large to be held in memory at once.
+
+        CSV files and SQL datasources are read incrementally, `chunk_size` rows at a time, and every chunk is
+        predicted separately, so the memory used is bounded by `chunk_size` instead of the size of `when_data`.
+        For timeseries models every group has to be contained within a single chunk, since the history of a group
+        is not carried over from one chunk to the next.
+
+        :param when_data: python dict, list of dicts, file path, a pandas data frame, url to a file or a datasource
+        :param chunk_size: number of rows predicted at a time
+
+        :return: a generator of TransactionOutputData objects, one per chunk
+        """
+        for chunk in iter_data_chunks(when_data, chunk_size):
+            if len(chunk) == 0:
+                continue
+            yield self.predict(when_data=chunk, use_gpu=use_gpu, advanced_args=advanced_args, backend=backend)
+
+    async def apredict(self,
+                       when_data,
+                       use_gpu=None,
+                       advanced_args=None,
+                       backend=None):
+        """
+        Coroutine version of `predict`, runs the prediction in a worker thread.
+
+        Concurrent calls made with single rows or small batches (dicts, lists of dicts or small data frames)
+        are merged into a single transaction by `self.coalescer`, each caller only gets back its own rows.
+
+        :return: TransactionOutputData object
+        """
+        if self.coalescer is None:
+            self.coalescer = PredictionCoalescer(self)
+
+        return await self.coalescer.predict(
+            when_data,
+            use_gpu=use_gpu,
+            advanced_args=advanced_args,
+            backend=backend
+        )
+
     def adjust(self, from_data):
         with MDBLock('exclusive', 'learn_' + self.name):
+            MODEL_CACHE.invalidate(self.name)
 
             light_transaction_metadata = load_lmd(os.path.join(
                 CONFIG.MINDSDB_STORAGE_PATH,
@@ -1,6 +1,17 @@
 from mindsdb_native.libs.helpers.general_helpers import *
-from mindsdb_native.libs.helpers.confidence_helpers import get_numerical_conf_range, get_categorical_conf, get_anomalies
+from mindsdb_native.libs.helpers.confidence_helpers import (
+    get_numerical_conf_range,
+    get_categorical_conf,
+    get_all_categorical_ranges,
+    get_anomalies,
+    CATEGORICAL_CONF_CANDIDATES
+)
 from mindsdb_native.libs.helpers.conformal_helpers import restore_icp_state, clear_icp_state
+from mindsdb_native.libs.helpers.model_cache import MODEL_CACHE
+from mindsdb_native.libs.helpers.metadata_writer import MetadataWriter
+from mindsdb_native.libs.data_types.light_model_metadata import LMD_SECTIONS
+from mindsdb_native.libs.helpers.time_budget import TimeBudget
+from mindsdb_native.libs.helpers.date_helpers import ParseMemo
 from mindsdb_native.libs.data_types.transaction_data import TransactionData
 from mindsdb_native.libs.data_types.transaction_output_data import (
     PredictTransactionOutputData,
@@ -11,17 +22,34 @@ from mindsdb_native.config import CONFIG
 
 
 import _thread
+import time
 import traceback
 import importlib
 import datetime
 import pickle
+import shutil
 import dill
 import sys
 from copy import deepcopy
+from contextlib import contextmanager
 import pandas as pd
 import numpy as np
 
 
+# What, besides the core of the light metadata, every phase can change: the heavy metadata ('hmd'), the ICPs ('icp')
+# and the sections of the light metadata (see `LMD_SECTIONS`). Phases not listed can change all of it.
+PHASE_METADATA_CHANGES = {
+    'DataExtractor': set(),
+    'DataCleaner': set(),
+    'DataSplitter': set(),
+    'TypeDeductor': {'stats'},
+    'DataAnalyzer': {'stats'},
+    'DataTransformer': {'stats'},
+    'ModelInterface': {'stats'}
+}
+ALL_METADATA = {'hmd', 'icp'} | set(LMD_SECTIONS)
+
+
 class BreakpointException(Exception):
     def __init__(self, ret):
         self.ret = ret
@@ -57,7 +85,50 @@ class Transaction:
 
         self.log = logger
 
+        # Execution time of every phase and of the stages within them, see `timer`
+        self.timings = []
+        self._started_at = time.time()
+
+        # Writes the metadata files, see `save_metadata`. Only created by the transactions that save metadata
+        self.metadata_writer = None
+        # Sections of the light metadata written to disk by this transaction, see `dump_lmd`
+        self.stored_lmd_sections = {}
+        # Metadata changed since it was last saved, see `PHASE_METADATA_CHANGES`
+        self.dirty_metadata = set(ALL_METADATA)
+
+        # Predictions made by the model backend on the transaction's data, see `LightwoodBackend.predict`
+        self.prediction_memo = {}
+
+        # Dates parsed by the phases, shared so each distinct string is parsed once, see `ParseMemo`
+        self.parse_memo = ParseMemo()
+
+        # Deadlines of the phases, only planned for learn
+        self.time_budget = TimeBudget()
+
+    def add_timing(self, name, started_at):
+        self.timings.append({
+            'name': name,
+            'start': started_at - self._started_at,
+            'duration': time.time() - started_at
+        })
+
+    @contextmanager
+    def timer(self, name):
+        """
+        Records how long the code within the context takes to run in `self.timings`
+
+        :param name: the phase name, or `<PhaseName>.<stage>` for stages within a phase
+        """
+        started_at = time.time()
+        try:
+            yield
+        finally:
+            self.add_timing(name, started_at)
+
     def load_metadata(self):
+        """
+        :return: True if both the light and heavy metadata were loaded
+        """
         try:
             import resource
             resource.setrlimit(resource.RLIMIT_STACK, [0x10000000, resource.RLIM_INFINITY])
@@ -65,10 +136,13 @@ class Transaction:
         except Exception:
             pass
 
+        loaded = True
+
         fn = os.path.join(CONFIG.MINDSDB_STORAGE_PATH, self.lmd['name'], 'light_model_metadata.pickle')
         try:
             self.lmd = load_lmd(fn)
         except Exception as e:
+            loaded = False
             self.log.error(e)
             self.log.error(f'Could not load mindsdb light metadata from the file: {fn}')
 
@@ -76,9 +150,15 @@ class Transaction:
         try:
             self.hmd = load_hmd(fn)
         except Exception as e:
+            loaded = False
             self.log.error(e)
             self.log.error(f'Could not load mindsdb heavy metadata in the file: {fn}')
 
+        self.load_icp()
+
+        return loaded
+
+    def load_icp(self):
         icp_fn = os.path.join(CONFIG.MINDSDB_STORAGE_PATH, self.hmd['name'], 'icp.pickle')
         try:
             with open(icp_fn, 'rb') as fp:
@@ -95,19 +175,10 @@ class Transaction:
             self.log.error(e)
             self.log.error(f'Could not load mindsdb conformal predictor in the file: {icp_fn}')
 
-    def save_metadata(self):
-        Path(CONFIG.MINDSDB_STORAGE_PATH).joinpath(self.lmd['name']).mkdir(mode=0o777, exist_ok=True, parents=True)
-        fn = os.path.join(CONFIG.MINDSDB_STORAGE_PATH, self.lmd['name'], 'light_model_metadata.pickle')
-        self.lmd['updated_at'] = str(datetime.datetime.now())
-        try:
-            with open(fn, 'wb') as fp:
-                pickle.dump(self.lmd, fp,protocol=pickle.HIGHEST_PROTOCOL)
-        except Exception as e:
-            self.log.error(traceback.format_exc())
-            self.log.error(e)
-            self.log.error(f'Could not save mindsdb light metadata in the file: {fn}')
+    def _get_metadata_path(self, fn):
+        return os.path.join(CONFIG.MINDSDB_STORAGE_PATH, self.lmd['name'], fn)
 
-        fn = os.path.join(CONFIG.MINDSDB_STORAGE_PATH, self.hmd['name'], 'heavy_model_metadata.pickle')
+    def _dump_hmd(self):
         save_hmd = {}
         null_out_fields = ['from_data', 'icp', 'breakpoint','sample_function']
         for k in null_out_fields:
@@ -119,42 +190,95 @@ class Transaction:
             if k == 'model_backend' and not isinstance(self.hmd['model_backend'], str):
                 save_hmd[k] = None
 
+        # Don't save data for now
+        return pickle.dumps(save_hmd, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _dump_icp(self):
+        mdb_predictors = {}
+        try:
+            for key in self.hmd['icp'].keys():
+                if key != '__mdb_active':
+                    mdb_predictors[key] = {}
+                    for group, icp in self.hmd['icp'][key].items():
+                        if group not in ['__mdb_groups', '__mdb_group_keys']:
+                            mdb_predictors[key][group] = icp.nc_function.model.model
+                            clear_icp_state(icp.nc_function)
+
+            return dill.dumps(self.hmd['icp'], protocol=dill.HIGHEST_PROTOCOL)
+        finally:
+            # restore predictor in ICP
+            for key in mdb_predictors:
+                for group, model in mdb_predictors[key].items():
+                    self.hmd['icp'][key][group].nc_function.model.model = model
+
+    def _write_metadata(self, files):
+        if self.metadata_writer is None:
+            self.metadata_writer = MetadataWriter(logger=self.log)
+        self.metadata_writer.write(files)
+
+    def save_metadata(self):
+        """
+        Serializes the light metadata, and the parts of the heavy metadata (and the ICP, if active) changed since they
+        were last saved (see `dirty_metadata`), then hands them to `self.metadata_writer`
+        """
+        MODEL_CACHE.invalidate(self.lmd['name'])
+        Path(CONFIG.MINDSDB_STORAGE_PATH).joinpath(self.lmd['name']).mkdir(mode=0o777, exist_ok=True, parents=True)
+        self.lmd['updated_at'] = str(datetime.datetime.now())
+
+        dirty = self.dirty_metadata
+        self.dirty_metadata = set()
+        files = []
+
+        fn = self._get_metadata_path('heavy_model_metadata.pickle')
         try:
-            with open(fn, 'wb') as fp:
-                # Don't save data for now
-                pickle.dump(save_hmd, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            if 'hmd' in dirty:
+                files.append((fn, self._dump_hmd()))
         except Exception as e:
             self.log.error(e)
             self.log.error(traceback.format_exc())
             self.log.error(f'Could not save mindsdb heavy metadata in the file: {fn}')
 
-        if 'icp' in self.hmd.keys() and self.hmd.get('icp', {}) and self.hmd['icp'].get('__mdb_active', False):
-            icp_fn = os.path.join(CONFIG.MINDSDB_STORAGE_PATH, self.hmd['name'], 'icp.pickle')
-            mdb_predictors = {}
+        if 'icp' in dirty and 'icp' in self.hmd.keys() and self.hmd.get('icp', {}) and self.hmd['icp'].get('__mdb_active', False):
+            icp_fn = self._get_metadata_path('icp.pickle')
             try:
-                with open(icp_fn, 'wb') as fp:
-                    for key in self.hmd['icp'].keys():
-                        if key != '__mdb_active':
-                            mdb_predictors[key] = {}
-                            for group, icp in self.hmd['icp'][key].items():
-                                if group not in ['__mdb_groups', '__mdb_group_keys']:
-                                    mdb_predictors[key][group] = icp.nc_function.model.model
-                                    clear_icp_state(icp.nc_function)
-
-                    dill.dump(self.hmd['icp'], fp, protocol=dill.HIGHEST_PROTOCOL)
-
-                    # restore predictor in ICP
-                    for key in self.hmd['icp'].keys():
-                        if key != '__mdb_active':
-                            for group, icp in self.hmd['icp'][key].items():
-                                if group not in ['__mdb_groups', '__mdb_group_keys']:
-                                    icp.nc_function.model.model = mdb_predictors[key][group]
-
+                files.append((icp_fn, self._dump_icp()))
             except Exception as e:
                 self.log.error(e)
                 self.log.error(traceback.format_exc())
                 self.log.error(f'Could not save mindsdb conformal predictor in the file: {icp_fn}')
 
+        # The light metadata goes last, its core file is what status polling and the model cache look at
+        fn = self._get_metadata_path('light_model_metadata.pickle')
+        try:
+            for section in dirty:
+                self.stored_lmd_sections.pop(section, None)
+            files.extend(dump_lmd(fn, self.lmd, self.stored_lmd_sections))
+        except Exception as e:
+            self.log.error(traceback.format_exc())
+            self.log.error(e)
+            self.log.error(f'Could not save mindsdb light metadata in the file: {fn}')
+
+        self._write_metadata(files)
+
+    def set_current_phase(self, phase):
+        """
+        Sets `current_phase` and persists it by rewriting only the core of the light metadata
+        """
+        self.lmd['current_phase'] = phase
+        self.lmd['updated_at'] = str(datetime.datetime.now())
+        MODEL_CACHE.invalidate(self.lmd['name'])
+        Path(CONFIG.MINDSDB_STORAGE_PATH).joinpath(self.lmd['name']).mkdir(mode=0o777, exist_ok=True, parents=True)
+
+        fn = self._get_metadata_path('light_model_metadata.pickle')
+        try:
+            # Sections are only written if this transaction didn't write them yet
+            files = dump_lmd(fn, self.lmd, self.stored_lmd_sections)
+        except Exception as e:
+            self.log.error(traceback.format_exc())
+            self.log.error(f'Could not save mindsdb light metadata in the file: {fn}')
+        else:
+            self._write_metadata(files)
+
     def _call_phase_module(self, module_name, **kwargs):
         """
         Loads the module and runs it
@@ -162,6 +286,7 @@ class Transaction:
 
         self.lmd['is_active'] = True
         self.lmd['phase'] = module_name
+        self.time_budget.start_phase(module_name)
         module_path = convert_cammelcase_to_snake_string(module_name)
         module_full_path = f'mindsdb_native.libs.phases.{module_path}.{module_path}'
         try:
@@ -184,6 +309,8 @@ class Transaction:
                         raise ValueError('breakpoint dict must have callable values')
             return ret
         finally:
+            self.time_budget.finish_phase(module_name)
+            self.dirty_metadata |= PHASE_METADATA_CHANGES.get(module_name, ALL_METADATA)
             self.lmd['phase'] = module_name
             self.lmd['is_active'] = False
 
@@ -195,47 +322,179 @@ class MutatingTransaction(Transaction):
     def run(self, mutating_callback):
         self.load_metadata()
         mutating_callback(self.lmd, self.hmd)
+        self.dirty_metadata = set(ALL_METADATA)
         self.save_metadata()
 
+
+def _settings_equal(a, b):
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+
 class LearnTransaction(Transaction):
+    # Phases that change `input_data`, the others only read it
+    DATA_PHASES = ['DataExtractor', 'DataCleaner', 'DataSplitter', 'DataTransformer']
+    # Keys of the light metadata that don't change what learn computes, so they can differ when resuming it
+    RESUME_IGNORED_SETTINGS = ['learn_started_at', 'stop_training_in_x_seconds', 'timings', 'time_budget', 'resume',
+                               'current_phase', 'phase', 'is_active', 'checkpoint', 'report_uuid', 'created_at',
+                               'updated_at']
+
+    def _get_steps(self):
+        """
+        :return: the phases learn runs, in order, as (phase name, kwargs, status set before running it,
+        whether to checkpoint `input_data` after it)
+        """
+        steps = [
+            ('DataExtractor', {}, None, False),
+            # The data is the same until the second DataCleaner, so the type deduction and analysis can be skipped
+            ('DataCleaner', {}, None, True),
+            ('TypeDeductor', {'input_data': self.input_data}, None, False),
+            ('DataAnalyzer', {'input_data': self.input_data}, MODEL_STATUS_DATA_ANALYSIS, False),
+            ('DataCleaner', {}, None, False),
+            ('DataSplitter', {}, None, False),
+            ('DataTransformer', {'input_data': self.input_data}, None, True),
+            ('ModelInterface', {'mode': 'train'}, MODEL_STATUS_TRAINING, False)
+        ]
+        if not self.lmd['quick_learn']:
+            steps.append(('ModelAnalyzer', {}, MODEL_STATUS_ANALYZING, False))
+        return steps
+
+    def _get_checkpoint_path(self, step):
+        return self._get_metadata_path(os.path.join('checkpoints', f'input_data_{step}.pickle'))
+
+    def _save_checkpoint(self, step):
+        """
+        Pickles `input_data` as it is after learn step nr `step`
+        """
+        path = self._get_checkpoint_path(step)
+        Path(path).parent.mkdir(mode=0o777, exist_ok=True, parents=True)
+        write_file_atomically(path, pickle.dumps(self.input_data, protocol=pickle.HIGHEST_PROTOCOL))
+        self.lmd['checkpoint']['data_steps'].append(step)
+
+    def _get_learn_settings(self):
+        """
+        :return: a copy of the arguments of learn as they are in the light metadata, see `RESUME_IGNORED_SETTINGS`
+        """
+        return deepcopy({k: v for k, v in self.lmd.items() if k not in self.RESUME_IGNORED_SETTINGS})
+
+    def _remove_checkpoints(self):
+        shutil.rmtree(self._get_metadata_path('checkpoints'), ignore_errors=True)
+
+    def _resume(self):
+        """
+        Restores the metadata and the data of the learn previously run on this model,
+        if it was run on the same data
+
+        :return: the nr of the first learn step left to run
+        """
+        fn = self._get_metadata_path('light_model_metadata.pickle')
+        try:
+            old_lmd = load_lmd(fn)
+        except Exception:
+            self.log.warning('There is no previous learn to resume, learning from scratch')
+            return 1
+
+        checkpoint = old_lmd.get('checkpoint', None)
+        if checkpoint is None or checkpoint['data_fingerprint'] != self.lmd['checkpoint']['data_fingerprint'] \
+                or old_lmd['predict_columns'] != self.lmd['predict_columns']:
+            self.log.warning('The previous learn was run on different data or targets, learning from scratch')
+            return 1
+
+        old_settings = checkpoint.get('settings', None)
+        new_settings = self.lmd['checkpoint']['settings']
+        if old_settings is None:
+            changed = ['all']
+        else:
+            changed = [k for k in sorted(set(old_settings) | set(new_settings))
+                       if not _settings_equal(old_settings.get(k, None), new_settings.get(k, None))]
+        if changed:
+            self.log.warning(f'The previous learn was run with different arguments ({", ".join(changed)}), learning from scratch')
+            return 1
+
+        if old_lmd['stop_training_in_x_seconds'] != self.lmd['stop_training_in_x_seconds']:
+            self.log.warning('The previous learn was run with a different stop_training_in_x_seconds, '
+                             'the phases it completed won\'t run again with the new one')
+
+        completed = checkpoint['completed_steps']
+        data_steps = [x for x in checkpoint['data_steps'] if x < completed and os.path.exists(self._get_checkpoint_path(x))]
+        # The data extracted by this learn is the data as it was after the first step
+        data_step = max(data_steps, default=0)
+        if data_step > 0:
+            with open(self._get_checkpoint_path(data_step), 'rb') as fp:
+                self.input_data = pickle.load(fp)
+
+        # Steps that changed the data since the checkpoint have to run again
+        steps = self._get_steps()
+        start = completed
+        for i in range(data_step + 1, completed):
+            if steps[i][0] in self.DATA_PHASES:
+                start = i
+                break
+
+        for k in ['learn_started_at', 'stop_training_in_x_seconds', 'timings', 'time_budget', 'resume']:
+            old_lmd[k] = self.lmd[k]
+        old_lmd['checkpoint']['data_steps'] = [x for x in data_steps if x < start]
+        self.lmd = old_lmd
+
+        self.log.info(f'Resuming the previous learn from the {steps[start][0] if start < len(steps) else "end"} phase')
+        return start
+
     def _run(self):
+        # Metadata is saved after every phase, writing it in the background lets the next phase start right away
+        self.metadata_writer = MetadataWriter(background=True, logger=self.log)
+        self.time_budget = TimeBudget(
+            total=self.lmd['stop_training_in_x_seconds'],
+            started_at=self.lmd['learn_started_at'],
+            phases=[x[0] for x in self._get_steps()[1:]]
+        )
         try:
+            self.lmd['timings'] = self.timings
+            self.lmd['time_budget'] = self.time_budget.report
             self.lmd['current_phase'] = MODEL_STATUS_PREPARING
-            self.save_metadata()
+            if not self.lmd['resume']:
+                self._remove_checkpoints()
+                self.save_metadata()
 
+            # The data is always extracted, to check it's the same when resuming
             self._call_phase_module(module_name='DataExtractor')
+            self.time_budget.plan(*self.input_data.data_frame.shape)
+            self.lmd['checkpoint'] = {
+                'data_fingerprint': get_data_fingerprint(self.input_data.data_frame),
+                'completed_steps': 1,
+                'data_steps': [],
+                'settings': self._get_learn_settings()
+            }
+
+            start = self._resume() if self.lmd['resume'] else 1
+            steps = self._get_steps()
+            for name, _, _, _ in steps[1:start]:
+                self.time_budget.skip_phase(name)
+            if start > [x[0] for x in steps].index('ModelInterface'):
+                # The predictor was trained before the previous learn was interrupted
+                self._call_phase_module(module_name='ModelInterface', mode='load')
             self.save_metadata()
 
-            self._call_phase_module(module_name='DataCleaner')
-            self.save_metadata()
+            for i in range(start, len(steps)):
+                name, kwargs, status, checkpoint = steps[i]
+                if status is not None:
+                    self.set_current_phase(status)
 
-            self._call_phase_module(module_name='TypeDeductor',
-                                    input_data=self.input_data)
-            self.save_metadata()
-
-            self.lmd['current_phase'] = MODEL_STATUS_DATA_ANALYSIS
-            self._call_phase_module(module_name='DataAnalyzer',
-                                    input_data=self.input_data)
-            self.save_metadata()
-
-            # quick_learn can still be set to False explicitly to disable this behavior
-            if self.lmd['quick_learn'] is None:
-                n_cols = len(self.lmd['columns'])
-                n_cells = n_cols * self.lmd['data_preparation']['used_row_count']
-                if n_cols >= 80 and n_cells > int(1e5):
-                    self.log.warning('Data has too many columns, disabling column importance feature')
-                    self.lmd['disable_column_importance'] = True
-
-            self._call_phase_module(module_name='DataCleaner')
-            self.save_metadata()
+                self._call_phase_module(module_name=name, **kwargs)
 
-            self._call_phase_module(module_name='DataSplitter')
-            self.save_metadata()
+                if name == 'DataAnalyzer' and self.lmd['quick_learn'] is None:
+                    # quick_learn can still be set to False explicitly to disable this behavior
+                    n_cols = len(self.lmd['columns'])
+                    n_cells = n_cols * self.lmd['data_preparation']['used_row_count']
+                    if n_cols >= 80 and n_cells > int(1e5):
+                        self.log.warning('Data has too many columns, disabling column importance feature')
+                        self.lmd['disable_column_importance'] = True
 
-            self._call_phase_module(module_name='DataTransformer', input_data=self.input_data)
-            self.lmd['current_phase'] = MODEL_STATUS_TRAINING
-            self.save_metadata()
-            self._call_phase_module(module_name='ModelInterface', mode='train')
+                if checkpoint:
+                    self._save_checkpoint(i)
+                self.lmd['checkpoint']['completed_steps'] = i + 1
+                self.save_metadata()
 
             if self.lmd['quick_learn']:
                 predict_method = self.session.predict
@@ -245,11 +504,10 @@ class LearnTransaction(Transaction):
                     kwargs['advanced_args']['quick_predict'] = True
                     return predict_method(*args, **kwargs)
                 self.session.predict = predict_method_wrapper
-            else:
-                self.lmd['current_phase'] = MODEL_STATUS_ANALYZING
-                self.save_metadata()
-                self._call_phase_module(module_name='ModelAnalyzer')
 
+            # Checkpoints are only needed to resume a learn that didn't finish
+            self._remove_checkpoints()
+            self.lmd['checkpoint']['data_steps'] = []
             self.lmd['current_phase'] = MODEL_STATUS_TRAINED
             self.save_metadata()
             return
@@ -264,6 +522,14 @@ class LearnTransaction(Transaction):
             self.save_metadata()
             raise e
 
+        finally:
+            # Drop the candidate predictors and data referenced by memoized predictions, and the memoized dates
+            self.prediction_memo = {}
+            self.parse_memo = ParseMemo()
+            # Nothing can read a half saved model once learn returns
+            self.metadata_writer.close()
+            self.metadata_writer = None
+
     def run(self):
         if CONFIG.EXEC_LEARN_IN_THREAD == False:
             self._run()
@@ -277,11 +543,14 @@ class AdjustTransaction(Transaction):
             self.lmd['current_phase'] = MODEL_STATUS_PREPARING
             self._call_phase_module(module_name='DataExtractor')
             self._call_phase_module(module_name='DataCleaner')
+            self._call_phase_module(module_name='DataAnalyzer', input_data=self.input_data, mode='adjust')
             self._call_phase_module(module_name='DataSplitter')
             self._call_phase_module(module_name='DataTransformer', input_data=self.input_data)
             self.lmd['current_phase'] = MODEL_STATUS_ADJUSTING
 
             self._call_phase_module(module_name='ModelInterface', mode='finetune')
+            self.load_icp()
+            self._call_phase_module(module_name='ModelAnalyzer', mode='adjust')
             predict_method = self.session.predict
             def predict_method_wrapper(*args, **kwargs):
                 return predict_method(*args, **kwargs)
@@ -309,6 +578,18 @@ class AnalyseTransaction(Transaction):
         self.lmd['current_phase'] = MODEL_STATUS_DONE
 
 class PredictTransaction(Transaction):
+    def load_metadata(self):
+        # Repeated predictions reuse the metadata, ICPs and lightwood predictor already loaded by this process
+        cached = MODEL_CACHE.get_metadata(self.lmd['name'])
+        if cached is not None:
+            self.lmd, self.hmd = cached
+            return True
+
+        loaded = super().load_metadata()
+        if loaded:
+            MODEL_CACHE.set_metadata(self.lmd['name'], self.lmd, self.hmd)
+        return loaded
+
     def run(self):
         old_lmd = {}
         for k in self.lmd: old_lmd[k] = self.lmd[k]
@@ -386,7 +667,8 @@ class PredictTransaction(Transaction):
         # confidence estimation using calibrated inductive conformal predictors (ICPs)
         if self.hmd['icp']['__mdb_active'] and not self.lmd['quick_predict']:
 
-            icp_X = deepcopy(self.input_data.cached_pred_df)
+            with self.timer('ICP.deepcopy'):
+                icp_X = deepcopy(self.input_data.cached_pred_df)
 
             # replace observed data w/predictions
             for col in self.lmd['predict_columns']:
@@ -423,9 +705,10 @@ class PredictTransaction(Transaction):
                 if (is_numerical or is_categorical) and self.hmd['icp'].get(predicted_col, False):
 
                     # reorder DF index
-                    index = self.hmd['icp'][predicted_col]['__default'].index.values
-                    index = np.append(index, predicted_col) if predicted_col not in index else index
-                    icp_X = icp_X.reindex(columns=index)  # important, else bounds can be invalid
+                    with self.timer('ICP.reindex'):
+                        index = self.hmd['icp'][predicted_col]['__default'].index.values
+                        index = np.append(index, predicted_col) if predicted_col not in index else index
+                        icp_X = icp_X.reindex(columns=index)  # important, else bounds can be invalid
 
                     # only one normalizer, even if it's a grouped time series task
                     normalizer = self.hmd['icp'][predicted_col]['__default'].nc_function.normalizer
@@ -438,9 +721,11 @@ class PredictTransaction(Transaction):
                     result = pd.DataFrame(index=icp_X.index, columns=['lower', 'upper', 'significance'])
 
                     # base ICP
-                    X = deepcopy(icp_X)
+                    with self.timer('ICP.deepcopy'):
+                        X = deepcopy(icp_X)
 
                     # get all possible ranges
+                    icp_predict_started_at = time.time()
                     if self.lmd['tss']['is_timeseries'] and self.lmd['tss']['nr_predictions'] > 1 and is_numerical:
 
                         # bounds in time series are only given for the first forecast
@@ -458,13 +743,13 @@ class PredictTransaction(Transaction):
                         self.hmd['icp'][predicted_col]['__default'].nc_function.model.prediction_cache = \
                             output_data[f'{predicted_col}_class_distribution']
 
-                        conf_candidates = list(range(20)) + list(range(20, 100, 10))
-                        all_ranges = np.array(
-                            [self.hmd['icp'][predicted_col]['__default'].predict(X.values, significance=s / 100)
-                             for s in conf_candidates])
-                        all_confs = np.swapaxes(np.swapaxes(all_ranges, 0, 2), 0, 1)
+                        all_confs = get_all_categorical_ranges(self.hmd['icp'][predicted_col]['__default'],
+                                                               X.values,
+                                                               CATEGORICAL_CONF_CANDIDATES)
+                    self.add_timing('ICP.predict', icp_predict_started_at)
 
                     # convert (B, 2, 99) into (B, 2) given width or error rate constraints
+                    bounds_started_at = time.time()
                     if is_numerical:
                         significances = self.lmd.get('fixed_confidence', None)
                         if significances is not None:
@@ -478,13 +763,14 @@ class PredictTransaction(Transaction):
                         result.loc[X.index, 'lower'] = confs[:, 0]
                         result.loc[X.index, 'upper'] = confs[:, 1]
                     else:
-                        conf_candidates = list(range(20)) + list(range(20, 100, 10))
-                        significances = get_categorical_conf(all_confs, conf_candidates)
+                        significances = get_categorical_conf(all_confs, CATEGORICAL_CONF_CANDIDATES)
 
                     result.loc[X.index, 'significance'] = significances
+                    self.add_timing('ICP.bounds', bounds_started_at)
 
                     # grouped time series, we replace bounds in rows that have a trained ICP
                     if self.hmd['icp'][predicted_col].get('__mdb_groups', False):
+                        grouped_started_at = time.time()
                         icps = self.hmd['icp'][predicted_col]
                         group_keys = icps['__mdb_group_keys']
 
@@ -524,14 +810,12 @@ class PredictTransaction(Transaction):
                                         result.loc[insert_index, 'significance'] = significances
 
                                     else:
-                                        conf_candidates = list(range(20)) + list(range(20, 100, 10))
-                                        all_ranges = np.array(
-                                            [icp.predict(X.values, significance=s / 100)
-                                             for s in conf_candidates])
-                                        all_confs = np.swapaxes(np.swapaxes(all_ranges, 0, 2), 0, 1)
-                                        significances = get_categorical_conf(all_confs, conf_candidates)
+                                        all_confs = get_all_categorical_ranges(icp, X.values, CATEGORICAL_CONF_CANDIDATES)
+                                        significances = get_categorical_conf(all_confs, CATEGORICAL_CONF_CANDIDATES)
                                         result.loc[X.index, 'significance'] = significances
 
+                        self.add_timing('ICP.grouped_icps', grouped_started_at)
+
                     output_data[f'{predicted_col}_confidence'] = result['significance'].tolist()
                     confs = [[a, b] for a, b in zip(result['lower'], result['upper'])]
                     output_data[f'{predicted_col}_confidence_range'] = confs
@@ -0,0 +1,136 @@
+import os
+import pickle
+import hashlib
+from collections.abc import MutableMapping
+
+
+# Keys of the light metadata stored in their own files, read only when one of them is first accessed
+LMD_SECTIONS = {
+    'stats': ['stats_v2'],
+    'analysis': [
+        'column_importances',
+        'columns_buckets_importances',
+        'accuracy_histogram',
+        'confusion_matrices',
+        'accuracy_samples',
+        'test_data_plot'
+    ]
+}
+
+
+def get_section_path(path, section):
+    """
+    :param path: path of the light metadata file (light_model_metadata.pickle)
+    :return: path of the file holding `section`
+    """
+    return '{}_{}.pickle'.format(os.path.splitext(path)[0], section)
+
+
+def dump_section(values):
+    """
+    :return: the version of the section with `values` (a hash of their content) and the bytes of its file
+    """
+    data = pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+    version = hashlib.sha1(data).hexdigest()
+    return version, pickle.dumps((version, data), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_section(path, version):
+    """
+    :param version: the version of the section the core of the lmd was written with
+    :return: the values of the section stored at `path`
+    """
+    with open(path, 'rb') as fp:
+        stored_version, data = pickle.load(fp)
+    if stored_version != version:
+        raise Exception(f'The model metadata was saved again since it was loaded, {path} no longer matches it. '
+                        'Please load the model again.')
+    return pickle.loads(data)
+
+
+class LightModelMetadata(MutableMapping):
+    """
+    A light model metadata (lmd) dict whose sections (see `LMD_SECTIONS`) are read from disk on first access.
+
+    The core records the version of every section it was written with, so a section rewritten since (e.g. the
+    model was learned again) is never mixed with an older core.
+
+    It pickles (and deep copies) as a plain dict with every section loaded.
+    """
+    def __init__(self, data, sections, path, versions, loaded_sections=None):
+        self._data = data
+        self._path = path
+        # section -> keys, as stored on disk
+        self._sections = sections
+        self._versions = versions
+        # key -> section, for the keys that haven't been read yet
+        self._pending = {k: section for section, keys in sections.items() for k in keys if k not in data}
+        # shared by all the copies of this lmd, so every section is read at most once
+        self._loaded_sections = {} if loaded_sections is None else loaded_sections
+
+    def _load(self, key):
+        section = self._pending[key]
+        if section not in self._loaded_sections:
+            self._loaded_sections[section] = load_section(get_section_path(self._path, section), self._versions[section])
+
+        for k, s in list(self._pending.items()):
+            if s == section:
+                del self._pending[k]
+                if k in self._loaded_sections[section]:
+                    self._data[k] = self._loaded_sections[section][k]
+
+    def __getitem__(self, key):
+        if key in self._pending:
+            self._load(key)
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self._pending.pop(key, None)
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        if key in self._pending:
+            del self._pending[key]
+        else:
+            del self._data[key]
+
+    def __contains__(self, key):
+        return key in self._data or key in self._pending
+
+    def __iter__(self):
+        yield from list(self._data)
+        yield from [k for k in self._pending if k not in self._data]
+
+    def __len__(self):
+        return len(self._data) + len([k for k in self._pending if k not in self._data])
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    @property
+    def loaded_sections(self):
+        return set(self._loaded_sections)
+
+    def get_stored_section(self, section):
+        """
+        :return: the (version, keys) of `section` as stored on disk, if none of its keys was read or changed yet,
+        None otherwise
+        """
+        keys = self._sections.get(section, [])
+        if section in self._loaded_sections or any(self._pending.get(k) != section for k in keys):
+            return None
+        return self._versions[section], list(keys)
+
+    def copy(self):
+        """
+        :return: a shallow copy that shares the sections read from disk with this lmd
+        """
+        sections = {}
+        for k, section in self._pending.items():
+            sections.setdefault(section, []).append(k)
+        copy = LightModelMetadata(dict(self._data), sections, self._path, self._versions, self._loaded_sections)
+        copy._sections = self._sections
+        return copy
@@ -1,7 +1,41 @@
+from itertools import compress
+
+import numpy as np
+import pandas as pd
+
 from mindsdb_native.libs.constants.mindsdb import *
 
 from mindsdb_native.libs.data_types.mindsdb_logger import log
-from mindsdb_native.libs.data_types.transaction_output_row import TransactionOutputRow
+from mindsdb_native.libs.data_types.transaction_output_row import (
+    TransactionOutputRow,
+    get_important_cols,
+    is_missing_value
+)
+
+
+def _get_prediction_qualities(confidences, is_none):
+    """
+    :param confidences: numpy.ndarray of floats
+    :param is_none: numpy.ndarray of bools, flags the rows without a confidence estimation
+    :return: a list with how confident every prediction is, in words
+    """
+    qualities = np.select(
+        [is_none, confidences < 0.2, confidences < 0.4, confidences < 0.6, confidences < 0.8],
+        ['missing confidence estimation', 'not confident', 'not very confident', 'somewhat confident', 'confident'],
+        default='very confident'
+    )
+    return qualities.tolist()
+
+
+def _get_missing_mask(values):
+    """
+    :return: numpy.ndarray of bools, `is_missing_value` of every value
+    """
+    series = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        # numbers are only missing when they are nan or infinite (see `value_isnan`)
+        return ~np.isfinite(series.to_numpy(dtype=float))
+    return np.fromiter(map(is_missing_value, values), dtype=bool, count=len(values))
 
 
 class TrainTransactionOutputData():
@@ -17,6 +51,11 @@ class PredictTransactionOutputData():
         self._input_confidence = None
         self._extra_insights = None
 
+        # Per-transaction invariants used by the explanations, computed on first use
+        self._class_distribution_map = None
+        self._important_cols = None
+        self._explanations = None
+
     def __iter__(self):
         for i, value in enumerate(self._data[self._transaction.lmd['columns'][0]]):
             yield TransactionOutputRow(self, i)
@@ -29,3 +68,139 @@ class PredictTransactionOutputData():
 
     def __len__(self):
         return len(self._data[self._transaction.lmd['columns'][0]])
+
+    @property
+    def timings(self):
+        """
+        :return: a list with the execution time of every phase and stage of the transaction that made these predictions
+        """
+        return self._transaction.timings
+
+    def _get_class_distribution_map(self):
+        if self._class_distribution_map is None:
+            lmd = self._transaction.lmd
+            class_distribution_map = {}
+            try:
+                if lmd.get('output_class_distribution', False):
+                    for column in lmd['predict_columns']:
+                        if f'{column}_class_map' in lmd['lightwood_data']:
+                            class_map = lmd['lightwood_data'][f'{column}_class_map']
+                            class_map_items = list(class_map.items())
+                            class_map_items.sort(key=lambda x: int(x[0]))
+                            class_distribution_map[column] = [x[1] for x in class_map_items]
+            except Exception:
+                class_distribution_map = {}
+            self._class_distribution_map = class_distribution_map
+        return self._class_distribution_map
+
+    def _get_important_cols(self):
+        if self._important_cols is None:
+            self._important_cols = get_important_cols(self._transaction.lmd)
+        return self._important_cols
+
+    def _explain_rows(self, indexes):
+        """
+        Builds the explanations of the rows at `indexes`, one column at a time: every field of the explanations is
+        computed for all the rows at once and the per-row dicts are only assembled at the end
+        """
+        lmd = self._transaction.lmd
+        class_distribution_map = self._get_class_distribution_map()
+        is_multi_ts = lmd['tss']['is_timeseries'] and lmd['tss']['nr_predictions'] > 1
+        indexes = np.asarray(indexes, dtype=int)
+
+        def take(values):
+            return [values[i] for i in indexes]
+
+        # Missing important columns don't depend on the target, so they're computed once for all of them
+        important_cols = self._get_important_cols()
+        missing_masks = []
+        for col in important_cols:
+            if col not in self._data or '_class_distribution' in col:
+                missing_masks.append(np.ones(len(indexes), dtype=bool))
+            else:
+                missing_masks.append(_get_missing_mask(take(self._data[col])))
+        if len(important_cols) > 0:
+            missing_masks = np.stack(missing_masks, axis=1)
+        else:
+            missing_masks = np.zeros((len(indexes), 0), dtype=bool)
+
+        answers = [{} for _ in indexes]
+        for pred_col in lmd['predict_columns']:
+            fields = {}
+
+            if f'{pred_col}_class_distribution' in self._data and pred_col in class_distribution_map:
+                classes = class_distribution_map[pred_col]
+                fields['class_distribution'] = [dict(zip(classes, x)) for x in take(self._data[f'{pred_col}_class_distribution'])]
+
+            predictions = take(self._data[pred_col])
+            if is_multi_ts:
+                fields['predicted_value'] = [x[0] for x in predictions]
+                fields['all_predicted_values'] = predictions
+            else:
+                fields['predicted_value'] = predictions
+
+            if f'{pred_col}_anomaly' in self._data and lmd.get('anomaly_detection', False):
+                fields['anomaly'] = take(self._data[f'{pred_col}_anomaly'])
+
+            confidences = self._data.get(f'{pred_col}_confidence')
+            if confidences is not None:
+                confidences = take(confidences)
+                is_none = np.array([x is None for x in confidences], dtype=bool)
+                confidences = np.array([np.nan if x is None else x for x in confidences], dtype=float)
+                confidences = np.round(confidences, 4)
+                if not is_none.any():
+                    fields['confidence'] = confidences.tolist()
+            else:
+                is_none = np.ones(len(indexes), dtype=bool)
+                confidences = np.full(len(indexes), np.nan)
+            fields['prediction_quality'] = _get_prediction_qualities(confidences, is_none)
+
+            if self._transaction.lmd['stats_v2'][pred_col]['typing']['data_type'] in (DATA_TYPES.NUMERIC, DATA_TYPES.DATE):
+                confidence_ranges = self._data.get(f'{pred_col}_confidence_range')
+                if confidence_ranges is not None:
+                    fields['confidence_interval'] = take(confidence_ranges)
+
+            fields['important_missing_information'] = [list(compress(important_cols, x)) for x in missing_masks]
+
+            if self._input_confidence is not None:
+                confidence_composition = {k:v for (k,v) in self._input_confidence[pred_col].items() if v > 0}
+                fields['confidence_composition'] = [dict(confidence_composition) for _ in indexes]
+
+            if self._extra_insights is not None:
+                fields['extra_insights'] = [self._extra_insights[pred_col]] * len(indexes)
+
+            keys = list(fields.keys())
+            explanations = [dict(zip(keys, x)) for x in zip(*fields.values())]
+
+            if 'confidence' not in fields and (~is_none).any():
+                # only some rows have a confidence estimation, the others leave it out of their explanation
+                for explanation, confidence, none in zip(explanations, confidences.tolist(), is_none):
+                    if not none:
+                        explanation['confidence'] = confidence
+
+            for answer, explanation in zip(answers, explanations):
+                answer[pred_col] = explanation
+
+        return answers
+
+    def explain_row(self, index):
+        if self._explanations is not None:
+            return self._explanations[index]
+        return self._explain_rows([index])[0]
+
+    def explain_all(self):
+        """
+        :return: a list with the explanation of every row, computed in a single pass over the prediction columns
+        """
+        if self._explanations is None:
+            self._explanations = self._explain_rows(range(len(self)))
+        return self._explanations
+
+    def to_pandas(self):
+        """
+        :return: a pandas DataFrame with one column per prediction output (raw `model_` outputs excluded)
+        """
+        return pd.DataFrame({k: v for k, v in self._data.items() if not k.startswith('model_')})
+
+    def to_numpy(self):
+        return self.to_pandas().to_numpy()
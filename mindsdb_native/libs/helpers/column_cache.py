@@ -0,0 +1,123 @@
+import os
+import pickle
+import shutil
+import hashlib
+import threading
+
+from mindsdb_native.__about__ import __version__
+from mindsdb_native.config import CONFIG
+from mindsdb_native.libs.data_types.mindsdb_logger import log
+from mindsdb_native.libs.helpers.general_helpers import get_data_fingerprint
+from mindsdb_native.libs.helpers.metadata_writer import write_file_atomically
+
+
+def get_column_cache_key(lmd, col_name, column, nr_rows_analyzed, *args):
+    """
+    :param column: the whole column `col_name` of the data being analyzed
+    :param nr_rows_analyzed: number of rows of the (sampled) data the analysis looks at
+    :param args: anything else the cached results depend on
+
+    :return: a key that changes with the data of the column and with every option that changes how it's analyzed
+    """
+    key = [
+        __version__,
+        col_name,
+        get_data_fingerprint(column.to_frame()),
+        nr_rows_analyzed,
+        sorted(lmd.get('dateutil_parser_kwargs_per_column', {}).get(col_name, {}).items()),
+        lmd.get('tags_delimiter', ','),
+        col_name in lmd.get('force_categorical_encoding', []),
+        lmd.get('data_types', {}).get(col_name),
+        lmd.get('data_subtypes', {}).get(col_name),
+        *args
+    ]
+    return hashlib.sha1(pickle.dumps(key)).hexdigest()
+
+
+class ColumnCache():
+    """
+    On-disk cache of the per-column results of the type deduction and data analysis, shared by all models,
+    so learning again from the same data (e.g. with other targets or ignored columns) skips analyzing it.
+
+    Entries are pickle files named after the phase and key they were stored under. Once they take more than
+    `max_size` bytes, the least recently used ones are removed.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    @property
+    def path(self):
+        if CONFIG.COLUMN_CACHE_PATH is not None:
+            return CONFIG.COLUMN_CACHE_PATH
+        # Hidden, so it isn't mistaken for a model
+        return os.path.join(CONFIG.MINDSDB_STORAGE_PATH, '.column_cache')
+
+    def _get_path(self, phase, key):
+        return os.path.join(self.path, f'{phase}_{key}.pickle')
+
+    def get(self, phase, key):
+        """
+        :return: the value stored under `key` by `phase`, or None if there's none
+        """
+        if not self.enabled:
+            return None
+
+        path = self._get_path(phase, key)
+        try:
+            with open(path, 'rb') as fp:
+                value = pickle.load(fp)
+            # The modification time is the last time the entry was used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning(f'Could not read the cached {phase} results in {path}: {e}')
+            return None
+        return value
+
+    def set(self, phase, key, value):
+        if not self.enabled:
+            return
+
+        try:
+            os.makedirs(self.path, mode=0o777, exist_ok=True)
+            write_file_atomically(self._get_path(phase, key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            self._evict()
+        except Exception as e:
+            log.warning(f'Could not cache the {phase} results: {e}')
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for fn in os.listdir(self.path):
+                if not fn.endswith('.pickle'):
+                    continue
+                path = os.path.join(self.path, fn)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+            entries.sort()
+            total_size = sum(x[1] for x in entries)
+            # Always keep the most recently used entry, even if it's larger than the size cap
+            for _, size, path in entries[:-1]:
+                if total_size <= self.max_size:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total_size -= size
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+COLUMN_CACHE = ColumnCache(max_size=CONFIG.COLUMN_CACHE_MAX_SIZE)
@@ -36,22 +36,23 @@ def set_conf_range(X, icp, target, typing_info, lmd, std_tol=1, group='__default
         # ICP gets all possible bounds (shape: (B, 2, 99))
         all_ranges = icp.predict(X.values)
 
-        # iterate over confidence levels until spread >= a multiplier of the dataset stddev
+        # pick the first confidence level whose mean spread is within a multiplier of the dataset stddev
         if significance is not None:
             conf = int(100*(1-significance))
             return significance, all_ranges[:, :, conf]
         else:
+            # (99, B) contiguous so that each mean is reduced exactly like the 1d spread of a single level
+            spreads = np.ascontiguousarray((all_ranges[:, 1, :] - all_ranges[:, 0, :]).T).mean(axis=1)
             for tol in [std_tol, std_tol + 1, std_tol + 2]:
-                for significance in range(99):
+                tolerance = lmd['stats_v2'][target]['train_std_dev'][group] * tol
+                within_tolerance = spreads[:99] <= tolerance
+                if within_tolerance.any():
+                    significance = int(np.argmax(within_tolerance))
                     ranges = all_ranges[:, :, significance]
-                    spread = np.mean(ranges[:, 1] - ranges[:, 0])
-                    tolerance = lmd['stats_v2'][target]['train_std_dev'][group] * tol
-
-                    if spread <= tolerance:
-                        confidence = (99 - significance) / 100
-                        if lmd['stats_v2'][target].get('positive_domain', False):
-                            ranges[ranges < 0] = 0
-                        return confidence, ranges
+                    confidence = (99 - significance) / 100
+                    if lmd['stats_v2'][target].get('positive_domain', False):
+                        ranges[ranges < 0] = 0
+                    return confidence, ranges
             else:
                 ranges = all_ranges[:, :, 0]
                 if lmd['stats_v2'][target].get('positive_domain', False):
@@ -88,30 +89,26 @@ def get_numerical_conf_range(all_confs, predicted_col, stats, std_tol=1, group='
         error_rate = None
 
     if error_rate is None:
-        significances = []
-        conf_ranges = []
         std_dev = stats[predicted_col]['train_std_dev'][group]
-
         tolerance = std_dev * std_tol
 
-        for sample_idx in range(all_confs.shape[0]):
-            sample = all_confs[sample_idx, :, :]
-            for idx in range(sample.shape[1]):
-                significance = (99 - idx) / 100
-                diff = sample[1, idx] - sample[0, idx]
-                if diff <= tolerance:
-                    conf_range = list(sample[:, idx])
-                    significances.append(significance)
-                    conf_ranges.append(conf_range)
-                    break
-            else:
-                significances.append(0.9991)  # default: confident that value falls inside big bounds
-                bounds = sample[:, 0]
-                sigma = (bounds[1] - bounds[0]) / 4
-                conf_range = [bounds[0] - sigma, bounds[1] + sigma]
-                conf_ranges.append(conf_range)
+        # first (i.e. most confident) level per sample whose bounds are narrower than the tolerance
+        widths = all_confs[:, 1, :] - all_confs[:, 0, :]
+        within_tolerance = widths <= tolerance
+        found = within_tolerance.any(axis=1)
+        first_idx = np.argmax(within_tolerance, axis=1)
+
+        rows = np.arange(all_confs.shape[0])
+        conf_ranges = all_confs[rows, :, first_idx].astype(float)
+        significances = np.where(found, (99 - first_idx) / 100, 0.9991)  # default: confident that value falls inside big bounds
 
-        conf_ranges = np.array(conf_ranges)
+        # samples without a narrow enough bound get the widest one, padded by a quarter of its width on each side
+        bounds = all_confs[~found, :, 0]
+        sigma = (bounds[:, 1] - bounds[:, 0]) / 4
+        conf_ranges[~found, 0] = bounds[:, 0] - sigma
+        conf_ranges[~found, 1] = bounds[:, 1] + sigma
+
+        significances = significances.tolist()
     else:
         # fixed error rate
         error_rate = max(0.01, min(1.0, error_rate))
@@ -125,23 +122,35 @@ def get_numerical_conf_range(all_confs, predicted_col, stats, std_tol=1, group='
     return significances, conf_ranges
 
 
+CATEGORICAL_CONF_CANDIDATES = list(range(20)) + list(range(20, 100, 10))
+
+
 def get_categorical_conf(all_confs, conf_candidates):
     """ Gets ICP confidence estimation for categorical targets.
     Prediction set is always unitary and includes only the predicted label.
     :param all_confs: numpy.ndarray, all possible label sets depending on confidence level
     :param conf_candidates: list, includes preset confidence levels to check
     """
-    significances = []
-    for sample_idx in range(all_confs.shape[0]):
-        sample = all_confs[sample_idx, :, :]
-        for idx in range(sample.shape[1]):
-            conf = (99 - conf_candidates[idx]) / 100
-            if np.sum(sample[:, idx]) == 1:
-                significances.append(conf)
-                break
-        else:
-            significances.append(0.005)  # default: not confident label is the predicted one
-    return significances
+    # first (i.e. most confident) candidate per sample whose label set contains a single label
+    singletons = np.sum(all_confs, axis=1) == 1
+    found = singletons.any(axis=1)
+    first_idx = np.argmax(singletons, axis=1)
+
+    confs = (99 - np.array(conf_candidates)) / 100
+    significances = np.where(found, confs[first_idx], 0.005)  # default: not confident label is the predicted one
+    return significances.tolist()
+
+
+def get_all_categorical_ranges(icp, X, conf_candidates):
+    """ Gets the label sets of a categorical ICP at every candidate confidence level.
+    P-values are computed once and thresholded for all candidates, instead of calling the ICP once per candidate.
+    :param icp: nonconformist.icp.IcpClassifier
+    :param X: numpy.ndarray
+    :param conf_candidates: list, includes preset confidence levels to check
+    :return: numpy.ndarray of shape (B, nr_classes, len(conf_candidates))
+    """
+    pvals = icp.predict(X, significance=None)
+    return pvals[:, :, np.newaxis] > (np.array(conf_candidates) / 100)
 
 
 def get_anomalies(bounds, observed_series, cooldown=1):
@@ -1,4 +1,3 @@
-import os
 import torch
 import numpy as np
 from scipy.interpolate import interp1d
@@ -7,9 +6,7 @@ from nonconformist.base import RegressorAdapter
 from nonconformist.base import ClassifierAdapter
 from nonconformist.nc import BaseScorer, RegressionErrFunc
 
-from lightwood.api.predictor import Predictor
-from lightwood.api.ensemble import LightwoodEnsemble
-from mindsdb_native.config import CONFIG
+from mindsdb_native.libs.helpers.model_cache import MODEL_CACHE
 
 
 def t_softmax(x, t=1.0, axis=1):
@@ -31,11 +28,7 @@ def restore_icp_state(col, hmd, session):
     try:
         predictor = session.transaction.model_backend.predictor
     except AttributeError:
-        model_path = os.path.join(CONFIG.MINDSDB_STORAGE_PATH, hmd['name'], 'lightwood_data')
-        try:
-            predictor = Predictor(load_from_path=model_path)
-        except RuntimeError as e:
-            predictor = LightwoodEnsemble(load_from_path=os.path.join(CONFIG.MINDSDB_STORAGE_PATH, hmd['name']))
+        predictor = MODEL_CACHE.get_predictor(hmd['name'])
 
     for group, icp in icps.items():
         if group not in ['__mdb_groups', '__mdb_group_keys']:
@@ -48,6 +41,27 @@ def restore_icp_state(col, hmd, session):
                 icp.nc_function.normalizer.model = icp.nc_function.model.model
 
 
+def recalibrate_icp(icp, x, y, window):
+    """
+    Adds the nonconformity scores of `x` and `y` to the calibration of an already calibrated ICP, keeping the
+    scores of the last `window` calibration examples. The caches of the ICP's model (and normalizer) must hold the
+    predictions for `x`.
+
+    Scores are kept in the order they were added in `icp.mdb_cal_history`, for ICPs calibrated before it existed
+    their previous scores are all considered older than the new ones.
+    """
+    if not hasattr(icp, 'mdb_cal_history'):
+        icp.mdb_cal_history = np.array(icp.cal_scores[0])
+
+    if hasattr(icp, 'classes') and icp.classes is not None:
+        # IcpClassifier, new classes can show up in the new data
+        icp.classes = np.unique(np.hstack([icp.classes, y]))
+
+    new_scores = icp.nc_function.score(x, y)
+    icp.mdb_cal_history = np.hstack([icp.mdb_cal_history, new_scores])[-window:]
+    icp.cal_scores = {0: np.sort(icp.mdb_cal_history)[::-1]}
+
+
 class BoostedAbsErrorErrFunc(RegressionErrFunc):
     """ Calculates absolute error nonconformity for regression problems. Applies linear interpolation
     for nonconformity scores when we have less than 100 samples in the validation dataset.
@@ -1,3 +1,4 @@
+import dateutil.parser
 
 
 DATE_ORDER_KWARGS = {
@@ -6,3 +7,52 @@ DATE_ORDER_KWARGS = {
     'DMY': {'yearfirst': False, 'dayfirst': True},
     'MDY': {'yearfirst': False, 'dayfirst': False},
 }
+
+# How many distinct strings a `ParseMemo` remembers the parse of
+PARSE_MEMO_MAX_SIZE = 100000
+
+
+class ParseMemo():
+    """
+    Remembers how `dateutil.parser.parse` parsed (or failed to parse) the strings it was given, so the phases of
+    a transaction that parse the same dates (the type deduction, data analysis and data transformation) parse
+    every distinct string only once.
+    """
+    def __init__(self, max_size=PARSE_MEMO_MAX_SIZE):
+        self.max_size = max_size
+        self._parses = {}
+
+    def parse(self, value, **kwargs):
+        """
+        :return: `dateutil.parser.parse(value, **kwargs)`, raising the exception it raised if it failed
+        """
+        if not isinstance(value, str):
+            return dateutil.parser.parse(value, **kwargs)
+
+        try:
+            key = (value, tuple(sorted(kwargs.items())))
+            parsed = self._parses.get(key)
+        except TypeError:
+            # unhashable parser options, e.g. `tzinfos`
+            return dateutil.parser.parse(value, **kwargs)
+
+        if parsed is None:
+            try:
+                parsed = dateutil.parser.parse(value, **kwargs)
+            except Exception as e:
+                parsed = e
+            if len(self._parses) < self.max_size:
+                self._parses[key] = parsed
+
+        if isinstance(parsed, Exception):
+            raise parsed.with_traceback(None)
+        return parsed
+
+    def update(self, other):
+        """
+        Adds the parses `other` remembers (e.g. a memo filled in a worker process) to the ones this memo does
+        """
+        for key, parsed in other._parses.items():
+            if len(self._parses) >= self.max_size:
+                break
+            self._parses.setdefault(key, parsed)
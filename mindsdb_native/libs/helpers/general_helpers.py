@@ -4,8 +4,10 @@ import json
 import platform
 import re
 import pickle
+import hashlib
 import requests
 import numpy as np
+import pandas as pd
 from pathlib import Path
 import uuid
 from contextlib import contextmanager
@@ -21,6 +23,13 @@ from sklearn.metrics import (
 from mindsdb_native.__about__ import __version__
 from mindsdb_native.config import CONFIG
 from mindsdb_native.libs.data_types.mindsdb_logger import log
+from mindsdb_native.libs.data_types.light_model_metadata import (
+    LightModelMetadata,
+    dump_section,
+    LMD_SECTIONS,
+    get_section_path
+)
+from mindsdb_native.libs.helpers.metadata_writer import write_file_atomically
 from mindsdb_native.libs.constants.mindsdb import *
 
 
@@ -357,8 +366,16 @@ def value_isnan(value):
 
 
 def load_lmd(path):
+    """
+    Reads the light metadata at `path`, either a single pickled dict (legacy format) or the core
+    of a sectioned lmd written by `save_lmd`, in which case sections are read on first access.
+    """
     with open(path, 'rb') as fp:
         lmd = pickle.load(fp)
+    sections = lmd.pop('__mdb_sections', None)
+    versions = lmd.pop('__mdb_section_versions', None)
+    if sections is not None:
+        lmd = LightModelMetadata(lmd, sections, path, versions)
     if 'tss' not in lmd:
         lmd['tss'] = {'is_timeseries': False}
     if 'setup_args' not in lmd:
@@ -366,6 +383,124 @@ def load_lmd(path):
     return lmd
 
 
+def dump_lmd(path, lmd, stored_sections=None):
+    """
+    Serializes `lmd` to be stored at `path`, with the keys in `LMD_SECTIONS` going to a separate file per section
+
+    :param stored_sections: dict of section -> (version, keys) for the sections already stored at `path` that
+    didn't change since, those aren't serialized again. It's updated with the sections serialized by this call.
+    :return: a list of (path, pickled bytes), in the order they should be written
+    """
+    if stored_sections is None:
+        stored_sections = {}
+    section_of = {k: section for section, keys in LMD_SECTIONS.items() for k in keys}
+
+    core = {k: lmd[k] for k in lmd if k not in section_of}
+
+    files = []
+    for section in LMD_SECTIONS:
+        if section not in stored_sections and isinstance(lmd, LightModelMetadata):
+            # Sections never read since loaded are the same as on disk
+            stored = lmd.get_stored_section(section)
+            if stored is not None:
+                stored_sections[section] = stored
+
+        if section not in stored_sections:
+            values = {k: lmd[k] for k in LMD_SECTIONS[section] if k in lmd}
+            version, data = dump_section(values)
+            files.append((get_section_path(path, section), data))
+            stored_sections[section] = (version, list(values))
+
+    # The core goes last, so readers never find it pointing to sections that aren't there yet
+    core['__mdb_sections'] = {section: keys for section, (_, keys) in stored_sections.items()}
+    core['__mdb_section_versions'] = {section: version for section, (version, _) in stored_sections.items()}
+    files.append((path, pickle.dumps(core, protocol=pickle.HIGHEST_PROTOCOL)))
+    return files
+
+
+def save_lmd(path, lmd):
+    """
+    Writes `lmd` to `path`, with the keys in `LMD_SECTIONS` going to a separate file per section
+    """
+    for fn, data in dump_lmd(path, lmd):
+        write_file_atomically(fn, data)
+
+
+def get_data_fingerprint(df):
+    """
+    :return: a hash of the values (in order), column names and dtypes of `df`
+    """
+    sha = hashlib.sha1()
+    sha.update(pickle.dumps([list(df.columns), [str(x) for x in df.dtypes]]))
+    try:
+        row_hashes = pd.util.hash_pandas_object(df, index=False).values
+    except TypeError:
+        # cells that can't be hashed, e.g. lists
+        row_hashes = pd.util.hash_pandas_object(df.astype(str), index=False).values
+    sha.update(row_hashes.tobytes())
+    return sha.hexdigest()
+
+
+def factorize_values(series):
+    """
+    Like `pd.factorize`, but values of different types (e.g. 1, 1.0 and True) and the different kinds
+    of null (None, NaN...) are never merged, so any function gives the same result for all the values of a code.
+
+    :return: the code of every value of `series` and a series with the distinct values (the first one of
+    every code, in order of appearance), such that `distinct.take(codes)` has the values of `series`
+    """
+    values = series.reset_index(drop=True)
+    no_codes = np.arange(len(values)), values
+    if values.dtype.kind not in 'Obiuf':
+        return no_codes
+
+    is_null = values.isna().to_numpy()
+    if values.dtype.kind == 'O' and values[~is_null].map(type).nunique() > 1:
+        codes = np.empty(len(values), dtype=np.intp)
+        code_of = {}
+        first_positions = []
+        for i, value in enumerate(values):
+            try:
+                code = code_of.setdefault((type(value), value), len(first_positions))
+            except TypeError:
+                # unhashable values, e.g. lists, get a code of their own
+                code = len(first_positions)
+            if code == len(first_positions):
+                first_positions.append(i)
+            codes[i] = code
+        return codes, values.iloc[first_positions].reset_index(drop=True)
+
+    try:
+        codes, uniques = pd.factorize(values)
+    except TypeError:
+        return no_codes
+    codes = np.array(codes, dtype=np.intp)
+    distinct = pd.Series(uniques, dtype=values.dtype)
+
+    # pandas gives all nulls the code -1
+    if is_null.any():
+        nulls = values[is_null]
+        null_codes, _ = pd.factorize(nulls.map(type))
+        _, first_positions = np.unique(null_codes, return_index=True)
+        distinct = pd.concat([distinct, nulls.iloc[first_positions]], ignore_index=True)
+        codes[is_null] = len(uniques) + null_codes
+
+    return codes, distinct
+
+
+def apply_to_unique(series, func, **kwargs):
+    """
+    :return: the same as `series.apply(func, **kwargs)`, calling `func` (which mustn't have side effects)
+    only once per distinct value of `series` and mapping the results back to its rows
+    """
+    codes, distinct = factorize_values(series)
+    if len(distinct) == len(series):
+        return series.apply(func, **kwargs)
+
+    results = distinct.apply(func, **kwargs)
+    return pd.Series(results.take(codes).to_numpy(), index=series.index, name=series.name)
+
+
 def load_hmd(path):
     with open(path, 'rb') as fp:
         hmd = pickle.load(fp)
@@ -0,0 +1,105 @@
+import os
+import hashlib
+import threading
+import traceback
+
+from mindsdb_native.libs.data_types.mindsdb_logger import log
+
+
+def write_file_atomically(path, data):
+    """
+    Writes `data` to a temporary file next to `path` and renames it, so readers never see a partially written file
+    """
+    tmp_path = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.get_ident())
+    try:
+        with open(tmp_path, 'wb') as fp:
+            fp.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class MetadataWriter():
+    """
+    Persists model metadata files, given as a list of (path, bytes) to be written in order.
+
+    Files whose content didn't change since this writer last wrote them are skipped. With `background=True`,
+    files are written by a worker thread: while a batch is waiting to be written, newer batches are merged into it,
+    so only the latest content of every file ever hits the disk. Call `flush` to wait for pending writes.
+    """
+    def __init__(self, background=False, logger=log):
+        self.log = logger
+        self._digests = {}
+
+        self._pending = None
+        self._writing = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _write(self, files):
+        for path, data in files:
+            digest = hashlib.sha1(data).digest()
+            if self._digests.get(path) == digest and os.path.exists(path):
+                continue
+            try:
+                write_file_atomically(path, data)
+                self._digests[path] = digest
+            except Exception:
+                self.log.error(traceback.format_exc())
+                self.log.error(f'Could not save mindsdb metadata in the file: {path}')
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                files = list(self._pending.items())
+                self._pending = None
+                self._writing = True
+
+            try:
+                self._write(files)
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def write(self, files):
+        if self._closed:
+            raise Exception('Trying to write metadata with a closed MetadataWriter')
+
+        if self._thread is None:
+            self._write(files)
+            return
+
+        with self._cond:
+            if self._pending is None:
+                self._pending = {}
+            # Files of the newer batch are moved to the end, so their relative order is kept
+            for path, data in files:
+                self._pending.pop(path, None)
+                self._pending[path] = data
+            self._cond.notify_all()
+
+    def flush(self):
+        with self._cond:
+            while self._pending is not None or self._writing:
+                self._cond.wait()
+
+    def close(self):
+        if self._thread is None:
+            self._closed = True
+            return
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._thread = None
@@ -0,0 +1,194 @@
+import os
+import copy
+import threading
+from collections import OrderedDict
+
+from lightwood.api.predictor import Predictor
+from lightwood.api.ensemble import LightwoodEnsemble
+
+from mindsdb_native.config import CONFIG
+
+
+def _get_model_dir(name):
+    return os.path.join(CONFIG.MINDSDB_STORAGE_PATH, name)
+
+
+def get_model_version(name):
+    """
+    :return: a token that changes whenever the model is rewritten on disk, or None if it doesn't exist
+    """
+    try:
+        stat = os.stat(os.path.join(_get_model_dir(name), 'light_model_metadata.pickle'))
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _get_dir_size(path):
+    size = 0
+    for root, _, files in os.walk(path):
+        for fn in files:
+            try:
+                size += os.path.getsize(os.path.join(root, fn))
+            except OSError:
+                pass
+    return size
+
+
+def _load_lightwood_predictor(name, gb_val=''):
+    predictor_path = os.path.join(_get_model_dir(name), 'lightwood_data' + gb_val)
+    try:
+        return Predictor(load_from_path=predictor_path)
+    except Exception:
+        return LightwoodEnsemble(load_from_path=_get_model_dir(name))
+
+
+def _copy_icps(icps):
+    """
+    :return: a deep copy of the conformal predictors in `hmd['icp']`, sharing the lightwood predictors they wrap,
+    so every transaction can set the predictions cached on its ICPs without affecting the others
+    """
+    memo = {}
+    for col, groups in icps.items():
+        if not isinstance(groups, dict):
+            continue
+        for group, icp in groups.items():
+            if group in ['__mdb_groups', '__mdb_group_keys']:
+                continue
+            for adapter in [icp.nc_function.model, icp.nc_function.normalizer]:
+                model = getattr(adapter, 'model', None)
+                if model is not None:
+                    memo[id(model)] = model
+    return copy.deepcopy(icps, memo)
+
+
+def _copy_hmd(hmd):
+    hmd = hmd.copy()
+    if hmd.get('icp') is not None:
+        hmd['icp'] = _copy_icps(hmd['icp'])
+    return hmd
+
+
+class ModelCache():
+    """
+    Process-wide LRU cache of everything `predict` needs to load from disk: the light and heavy metadata
+    (with the conformal predictors already restored) and the lightwood predictors.
+
+    Entries are keyed by model name and checked against the on-disk version of the model on every access,
+    so models rewritten by another process are reloaded. Within this process `learn`, `adjust`,
+    `rename_model` and `delete_model` invalidate the relevant entries explicitly.
+
+    The ICPs are copied in and out of the cache, as predictions set them up with the data they predict. Lightwood
+    predictors are loaded holding a lock per predictor, so loading one doesn't block the users of other models.
+    """
+    def __init__(self, max_models, max_memory):
+        self.max_models = max_models
+        self.max_memory = max_memory
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._load_locks = {}
+
+    @property
+    def enabled(self):
+        return self.max_models > 0
+
+    def _get_entry(self, name):
+        version = get_model_version(name)
+        entry = self._entries.get(name)
+        if entry is not None and entry['version'] != version:
+            del self._entries[name]
+            entry = None
+
+        if entry is None:
+            entry = {
+                'version': version,
+                'lmd': None,
+                'hmd': None,
+                'predictors': {},
+                'size': _get_dir_size(_get_model_dir(name))
+            }
+            self._entries[name] = entry
+
+        self._entries.move_to_end(name)
+        return entry
+
+    def _evict(self):
+        total_size = sum(x['size'] for x in self._entries.values())
+        # Always keep the most recently used model, even if it's larger than the memory cap
+        while len(self._entries) > 1 and (len(self._entries) > self.max_models or total_size > self.max_memory):
+            _, entry = self._entries.popitem(last=False)
+            total_size -= entry['size']
+
+    def get_metadata(self, name):
+        """
+        :return: copies of the cached (lmd, hmd), shallow but for the ICPs, or None if they aren't cached
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._get_entry(name)
+            if entry['lmd'] is None or entry['hmd'] is None:
+                return None
+            lmd, hmd = entry['lmd'], entry['hmd']
+        return lmd.copy(), _copy_hmd(hmd)
+
+    def set_metadata(self, name, lmd, hmd):
+        if not self.enabled:
+            return
+
+        lmd, hmd = lmd.copy(), _copy_hmd(hmd)
+        with self._lock:
+            entry = self._get_entry(name)
+            entry['lmd'] = lmd
+            entry['hmd'] = hmd
+            self._evict()
+
+    def get_predictor(self, name, gb_val=''):
+        """
+        :return: the lightwood predictor saved under `lightwood_data<gb_val>`, loading it from disk only on a cache miss
+        """
+        if not self.enabled:
+            return _load_lightwood_predictor(name, gb_val)
+
+        with self._lock:
+            predictor = self._get_entry(name)['predictors'].get(gb_val)
+            if predictor is not None:
+                return predictor
+            load_lock = self._load_locks.setdefault((name, gb_val), threading.Lock())
+
+        # Concurrent misses on the same predictor load it once, the other models stay available meanwhile
+        with load_lock:
+            with self._lock:
+                entry = self._get_entry(name)
+                predictor = entry['predictors'].get(gb_val)
+                if predictor is not None:
+                    return predictor
+                version = entry['version']
+
+            predictor = _load_lightwood_predictor(name, gb_val)
+
+            with self._lock:
+                entry = self._get_entry(name)
+                # The model may have been rewritten while it was loading
+                if entry['version'] == version:
+                    entry['predictors'][gb_val] = predictor
+                    self._evict()
+            return predictor
+
+    def invalidate(self, name):
+        with self._lock:
+            self._entries.pop(name, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+MODEL_CACHE = ModelCache(max_models=CONFIG.MODEL_CACHE_SIZE, max_memory=CONFIG.MODEL_CACHE_MAX_MEMORY)
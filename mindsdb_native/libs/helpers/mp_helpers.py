@@ -1,6 +1,34 @@
 import os
+import atexit
+import pickle
+import threading
+from contextlib import contextmanager
+
 import psutil
+import numpy as np
+import pandas as pd
 import multiprocessing as mp
+try:
+    from multiprocessing import shared_memory, resource_tracker
+except ImportError:
+    # Python < 3.8
+    shared_memory = None
+
+
+def get_proc_memory_usage(max_per_proc_usage=None, df=None):
+    """
+    :return: the memory, in bytes, we expect a worker process handling `df` to use
+    """
+    if max_per_proc_usage is None or type(max_per_proc_usage) not in (int, float):
+        try:
+            import mindsdb_worker
+            import ray
+            max_per_proc_usage = 0.2 * pow(10,9)
+        except:
+            max_per_proc_usage = 3 * pow(10, 9)
+        if df is not None:
+            max_per_proc_usage += df.memory_usage(index=True, deep=True).sum()
+    return max_per_proc_usage
 
 
 def get_nr_procs(max_processes=None, max_per_proc_usage=None, df=None):
@@ -8,16 +36,162 @@ def get_nr_procs(max_processes=None, max_per_proc_usage=None, df=None):
         return 1
     else:
         available_mem = psutil.virtual_memory().available
-        if max_per_proc_usage is None or type(max_per_proc_usage) not in (int, float):
-            try:
-                import mindsdb_worker
-                import ray
-                max_per_proc_usage = 0.2 * pow(10,9)
-            except:
-                max_per_proc_usage = 3 * pow(10, 9)
-            if df is not None:
-                max_per_proc_usage += df.memory_usage(index=True, deep=True).sum()
+        max_per_proc_usage = get_proc_memory_usage(max_per_proc_usage, df)
         proc_count = int(min(mp.cpu_count(), available_mem // max_per_proc_usage)) - 1
         if isinstance(max_processes, int):
             proc_count = min(proc_count, max_processes)
         return max(proc_count, 1)
+
+
+class SharedColumn():
+    """
+    A column of a data frame that the process creating it puts in shared memory once, so worker processes can read
+    it without it being pickled into (and sent with) every task that uses it.
+
+    Numeric columns are read by the workers in place, without any copy. Other columns are pickled once into the
+    shared memory. Columns with pandas-specific dtypes (e.g. categorical), or all of them on python versions without
+    `multiprocessing.shared_memory`, are pickled along with the tasks as usual.
+
+    The process that created it must `release` it once the workers are done reading it.
+    """
+    def __init__(self, series):
+        self.name = series.name
+        self.length = len(series)
+        self.dtype = None
+        self.nbytes = 0
+        self.shm_name = None
+        self._shm = None
+        self._series = None
+
+        if shared_memory is None or not isinstance(series.dtype, np.dtype):
+            self._series = series.reset_index(drop=True)
+            return
+
+        values = series.to_numpy()
+        if values.dtype.kind in 'biuf':
+            self.dtype = values.dtype.str
+            self.nbytes = values.nbytes
+        else:
+            data = pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+            self.nbytes = len(data)
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(self.nbytes, 1))
+        self.shm_name = self._shm.name
+        if self.dtype is not None:
+            np.ndarray(values.shape, dtype=values.dtype, buffer=self._shm.buf)[:] = values
+        else:
+            self._shm.buf[:self.nbytes] = data
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_shm'] = None
+        return state
+
+    @contextmanager
+    def open(self):
+        """
+        Yields the column as a series (with a default index), which is only valid within the context
+        """
+        if self.shm_name is None:
+            yield self._series
+            return
+
+        shm = shared_memory.SharedMemory(name=self.shm_name)
+        try:
+            if self.dtype is not None:
+                values = np.ndarray((self.length,), dtype=np.dtype(self.dtype), buffer=shm.buf)
+            else:
+                values = pickle.loads(shm.buf[:self.nbytes])
+            yield pd.Series(values, name=self.name, copy=False)
+        finally:
+            values = None
+            try:
+                shm.close()
+            except BufferError:
+                # Something still references the column, the memory is unmapped once it's garbage collected
+                pass
+
+    def release(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+_mp_context = None
+_pool = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+
+def get_mp_context():
+    """
+    :return: the multiprocessing context worker processes are started with. They're started by a server process (or
+    from scratch), never by forking this one, which may have torch/OpenMP thread pools and other threads (e.g. the
+    `MetadataWriter` of learn) running.
+    """
+    global _mp_context
+    if _mp_context is None:
+        if 'forkserver' in mp.get_all_start_methods():
+            _mp_context = mp.get_context('forkserver')
+            # Imported once by the server instead of by every worker
+            _mp_context.set_forkserver_preload(['mindsdb_native'])
+        else:
+            _mp_context = mp.get_context('spawn')
+    return _mp_context
+
+
+def get_pool(nr_procs):
+    """
+    :return: a pool of at least `nr_procs` worker processes, kept alive and reused by the following calls so the
+    phases don't pay for starting processes every time they run. It's only started again for a caller that needs
+    more processes, use `pool_map` to run tasks on fewer of them. `close_pool` shuts it down.
+    """
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size < nr_procs:
+            if _pool is not None:
+                _pool.terminate()
+                _pool.join()
+            if shared_memory is not None:
+                # Workers share the tracker of the shared memory created here, instead of starting their own
+                # ones, which would see memory they attached to as leaked when they exit
+                resource_tracker.ensure_running()
+            _pool = get_mp_context().Pool(processes=nr_procs)
+            _pool_size = nr_procs
+        return _pool
+
+
+def pool_map(func, tasks, nr_procs):
+    """
+    Like `Pool.map`, on the shared pool (see `get_pool`), but with at most `nr_procs` tasks running at a time
+
+    :return: the results of `func` for every task, in the order of `tasks`
+    """
+    pool = get_pool(nr_procs)
+    slots = threading.BoundedSemaphore(nr_procs)
+
+    def release(_):
+        slots.release()
+
+    async_results = []
+    for task in tasks:
+        slots.acquire()
+        async_results.append(pool.apply_async(func, (task,), callback=release, error_callback=release))
+    return [x.get() for x in async_results]
+
+
+def close_pool():
+    """
+    Shuts down the worker processes of the shared pool, if any, a later `get_pool` starts them again
+    """
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is not None:
+            _pool.terminate()
+            _pool.join()
+        _pool = None
+        _pool_size = 0
+
+
+atexit.register(close_pool)
@@ -1,6 +1,8 @@
 import os
+import csv
 
-from mindsdb_datasources import DataSource, FileDS
+import pandas as pd
+from mindsdb_datasources import DataSource, SQLDataSource, FileDS
 from pandas import DataFrame
 
 from mindsdb_native.libs.data_types.mindsdb_logger import log
@@ -21,3 +23,129 @@ def get_ds(from_data):
         if os.path.isfile(from_data) or from_data.startswith('http:') or from_data.startswith('https:'):
             return FileDS(from_data)
     raise ValueError('from_data must be one of: [DataSource, DataFrame, file path, file URL]')
+
+
+# Values that FileDS turns into None when `clean_rows` is set
+_FILE_NULL_VALUES = ['', ' ', '  ', 'NaN', 'nan', 'NA']
+
+
+def _get_file_path(from_data):
+    if isinstance(from_data, FileDS):
+        if from_data.custom_parser is not None or from_data._internal_df is not None:
+            return None, False
+        return from_data.file, from_data.clean_rows
+    elif isinstance(from_data, str):
+        if os.path.isfile(from_data) or from_data.startswith('http:') or from_data.startswith('https:'):
+            return from_data, True
+    return None, False
+
+
+def _iter_csv_chunks(path, chunk_size, clean_rows):
+    extension = os.path.splitext(path.split('?')[0])[1].lower()
+    if extension not in ('.csv', '.tsv', '.txt'):
+        return None
+
+    delimiter = '\t' if extension == '.tsv' else ','
+    if os.path.isfile(path):
+        with open(path, 'r', newline='', encoding='utf-8', errors='replace') as fp:
+            sample = fp.read(64 * 1024)
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters=',\t;|').delimiter
+        except csv.Error:
+            pass
+
+    # Read every value as a string, like FileDS does, so the typing matches a regular predict
+    reader = pd.read_csv(path, sep=delimiter, dtype=object, keep_default_na=False,
+                         na_filter=False, chunksize=chunk_size)
+
+    def iter_chunks():
+        for df in reader:
+            df = df.reset_index(drop=True)
+            if clean_rows:
+                df = df.where(~df.isin(_FILE_NULL_VALUES), None)
+            yield df
+
+    return iter_chunks()
+
+
+def _connect(ds):
+    """
+    :return: a DB-API connection for the SQL datasources that support cursor-based fetching, None otherwise
+    """
+    ds_type = type(ds).__name__
+    if ds_type == 'SQLite3DS':
+        import sqlite3
+        return sqlite3.connect(ds.database)
+    elif ds_type in ('PostgresDS', 'RedshiftDS'):
+        import pg8000
+        return pg8000.connect(database=ds.database, user=ds.user, password=ds.password, host=ds.host, port=ds.port)
+    elif ds_type in ('MySqlDS', 'MariaDS'):
+        import mysql.connector
+        config = dict(host=ds.host, port=ds.port, user=ds.user, password=ds.password, database=ds.database)
+        if getattr(ds, 'ssl', False) is True:
+            config['client_flags'] = [mysql.connector.constants.ClientFlag.SSL]
+            for k in ('ssl_ca', 'ssl_cert', 'ssl_key'):
+                if getattr(ds, k, None) is not None:
+                    config[k] = getattr(ds, k)
+        return mysql.connector.connect(**config)
+    elif ds_type == 'MSSQLDS':
+        import pymssql
+        return pymssql.connect(server=ds.host, host=ds.host, user=ds.user, password=ds.password, database=ds.database, port=ds.port)
+    return None
+
+
+def _iter_sql_chunks(ds, chunk_size):
+    con = _connect(ds)
+    if con is None:
+        return None
+
+    def iter_chunks():
+        try:
+            cursor = con.cursor()
+            cursor.execute(ds._query)
+            columns = [x[0] if isinstance(x[0], str) else x[0].decode('utf-8') for x in cursor.description]
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if len(rows) == 0:
+                    break
+                yield pd.DataFrame([list(row) for row in rows], columns=columns)
+        finally:
+            con.close()
+
+    return iter_chunks()
+
+
+def iter_data_chunks(from_data, chunk_size):
+    '''
+    Reads `from_data` incrementally, `chunk_size` rows at a time
+
+    CSV files and SQL datasources with a DB-API driver (cursor-based fetching) are never fully loaded into memory,
+    other inputs are loaded once and sliced.
+
+    :param from_data: same as for `get_ds`, or a dict / list of dicts
+    :return: a generator of pandas DataFrames
+    '''
+    if isinstance(from_data, dict):
+        from_data = [from_data]
+
+    if isinstance(from_data, list):
+        for i in range(0, len(from_data), chunk_size):
+            yield DataFrame(from_data[i:i + chunk_size])
+        return
+
+    chunks = None
+    path, clean_rows = _get_file_path(from_data)
+    if isinstance(from_data, DataFrame):
+        chunks = (from_data.iloc[i:i + chunk_size] for i in range(0, len(from_data), chunk_size))
+    elif path is not None:
+        chunks = _iter_csv_chunks(path, chunk_size, clean_rows)
+    elif isinstance(from_data, SQLDataSource) and from_data._internal_df is None:
+        chunks = _iter_sql_chunks(from_data, chunk_size)
+
+    if chunks is None:
+        log.warning('Can\'t read this input incrementally, loading it fully into memory')
+        df = get_ds(from_data).df
+        chunks = (df.iloc[i:i + chunk_size].reset_index(drop=True) for i in range(0, len(df), chunk_size))
+
+    for df in chunks:
+        yield df
@@ -1,4 +1,5 @@
 import random
+import numpy as np
 
 from mindsdb_native.external_libs.stats import calculate_sample_size
 
@@ -18,3 +19,41 @@ def sample_data(df, sample_margin_of_error, sample_confidence_level, sample_perc
     population_size = len(df)
     input_data_sample_indexes = random.sample(range(population_size), sample_size)
     return df.iloc[input_data_sample_indexes]
+
+
+def merge_bucketed_histogram(histogram, values, weight=1):
+    """
+    Adds `values` to a numerical histogram, keeping its buckets: values out of its range
+    are counted in the first or last bucket.
+
+    :param histogram: {'x': left edge of every bucket, 'y': counts}
+    :param weight: what every value adds to the count of its bucket, e.g. the rate `histogram` was sampled at
+    :return: the merged histogram
+    """
+    x = np.array(histogram['x'], dtype=float)
+    counts = np.array(histogram['y'])
+    if len(values) > 0 and len(x) > 0:
+        indexes = np.searchsorted(x, np.array(values, dtype=float), side='right') - 1
+        indexes = np.clip(indexes, 0, len(x) - 1)
+        counts = counts + weight * np.bincount(indexes, minlength=len(x))
+    return {
+        'x': list(histogram['x']),
+        'y': counts.tolist()
+    }
+
+
+def merge_counts_histogram(histogram, new_histogram, weight=1):
+    """
+    Adds the counts of `new_histogram` to those of `histogram`, both histograms of distinct values
+    (e.g. categories or words). Values seen for the first time go after the existing ones.
+
+    :param weight: what the counts of `new_histogram` are multiplied by, e.g. the rate `histogram` was sampled at
+    :return: the merged histogram
+    """
+    counts = dict(zip(histogram['x'], histogram['y']))
+    for value, count in zip(new_histogram['x'], new_histogram['y']):
+        counts[value] = counts.get(value, 0) + weight * count
+    return {
+        'x': list(counts.keys()),
+        'y': list(counts.values())
+    }
@@ -12,9 +12,11 @@
 from mindsdb_native.libs.constants.mindsdb import *
 from collections import Counter, defaultdict
 import string
+import math
 import json
 import hashlib
 import numpy as np
+import pandas as pd
 import scipy.stats as st
 import langdetect
 from lightwood.helpers.text import tokenize_text
@@ -23,12 +25,52 @@ from nltk.corpus import stopwords
 
 langdetect.DetectorFactory.seed = 0
 
+# Confidence with which `get_language_dist` decides how the share of cells of unknown language compares to a threshold
+LANGUAGE_DETECTION_CONFIDENCE = 0.999
+
+# Stopwords per language, loaded once per process, see `get_stopwords`
+_stopwords_cache = {}
+
+
+def get_stopwords(language='english'):
+    """
+    Stopwords are read from the local nltk data (see the `NLTK_DATA` environment variable) the first time they're
+    needed, and only downloaded if they aren't there.
+
+    :return: the nltk stopwords of `language`, or none if they can't be loaded (e.g. on hosts without internet access)
+    """
+    if language not in _stopwords_cache:
+        try:
+            words = stopwords.words(language)
+        except LookupError:
+            try:
+                nltk.download('stopwords', quiet=True)
+                words = stopwords.words(language)
+            except Exception as e:
+                from mindsdb_native.libs.data_types.mindsdb_logger import log
+                log.warning(f'Could not load the nltk stopwords, text will be analyzed without them: {e}')
+                words = []
+        _stopwords_cache[language] = frozenset(words)
+    return _stopwords_cache[language]
+
+
+def get_language_dist(data, unknown_share_threshold=None):
+    """
+    :param unknown_share_threshold: if set, the cells are looked at in a random order, and only until the share of
+    the cells of unknown language is known to be above or below this threshold (with `LANGUAGE_DETECTION_CONFIDENCE`),
+    the counts are then scaled to the number of cells in `data`
+
+    :return: the number of cells in every language, the ones of no clear language being counted as 'Unknown'
+    """
+    data = list(data)
+    if unknown_share_threshold is not None:
+        data = [data[i] for i in np.random.RandomState(0).permutation(len(data))]
+    delta = 1 - LANGUAGE_DETECTION_CONFIDENCE
 
-def get_language_dist(data):
     lang_dist = defaultdict(lambda: 0)
     lang_dist['Unknown'] = 0
     lang_probs_cache = dict()
-    for text in data:
+    for nr_seen, text in enumerate(data, start=1):
         text = str(text)
         text = ''.join([c for c in text if not c in string.punctuation])
         if text not in lang_probs_cache:
@@ -44,6 +86,12 @@ def get_language_dist(data):
         else:
             lang_dist['Unknown'] += 1
 
+        if unknown_share_threshold is not None and nr_seen < len(data):
+            # Hoeffding bound, with the allowed error split between all the cells detection could stop at
+            bound = math.sqrt(math.log(2 * nr_seen * (nr_seen + 1) / delta) / (2 * nr_seen))
+            if abs(lang_dist['Unknown'] / nr_seen - unknown_share_threshold) > bound:
+                return {lang: count * len(data) / nr_seen for lang, count in lang_dist.items()}
+
     return dict(lang_dist)
 
 
@@ -61,8 +109,7 @@ def analyze_sentences(data):
     nr_words = 0
     word_dist = defaultdict(int)
     nr_words_dist = defaultdict(int)
-    nltk.download('stopwords')
-    stop_words = set(stopwords.words('english'))
+    stop_words = get_stopwords('english')
     for text in map(str, data):
         text = text.lower()
         tokens = tokenize_text(text)
@@ -146,6 +193,12 @@ def hashtext(cell):
     return hashlib.md5(text.encode('utf8')).hexdigest()
 
 
+# Identifier detection estimates what it can from a random sample of this many values of the column
+IDENTIFIER_SAMPLE_SIZE = 10000
+# Strings only made of the characters of UUIDs
+UUID_RE = r'^[0-9a-fA-F-]*\Z'
+
+
 def _is_foreign_key_name(name):
     for endings in ['id', 'ID', 'Id']:
         for add in ['-','_', ' ']:
@@ -176,110 +229,144 @@ def extract_digits(point):
 
 
 def get_pct_auto_increment(data):
-    int_data = []
-    for point in [extract_digits(x) for x in data]:
-        try:
-            int_data.append(int(point))
-        except Exception:
-            pass
-
-    int_data = sorted(int_data)
-    prev_nr = int_data[0]
-    increase_by_one = 0
-    for nr in int_data[1:]:
-        diff = nr - prev_nr
-        if diff == 1:
-            increase_by_one += 1
-        prev_nr = nr
+    """
+    :return: the share of the values of `data` that are one more than the previous one, once the digits
+    in every value are read as an integer and the integers sorted
+    """
+    if not isinstance(data, pd.Series):
+        data = pd.Series(list(data), dtype=object)
+    if data.dtype.kind in 'iu':
+        # The digits of an integer are its absolute value
+        int_data = np.abs(data.to_numpy())
+    else:
+        digits = data.astype(str).str.replace(r'[^0-9]', '', regex=True)
+        int_data = pd.to_numeric(digits[digits != ''], errors='coerce').dropna().to_numpy()
+    increase_by_one = np.count_nonzero(np.diff(np.sort(int_data)) == 1)
+    return increase_by_one/max(len(data) - 1, 1)
 
-    return increase_by_one/(len(data) - 1)
 
 def get_identifier_description_mp(arg_tup):
     data, column_name, data_type, data_subtype, other_potential_subtypes = arg_tup
     return get_identifier_description(data, column_name, data_type, data_subtype, other_potential_subtypes)
 
+
+def _get_randomness_per_index(str_data):
+    """
+    :param str_data: a series of strings, all of the same length
+    :return: the entropy of the characters at every index through all the strings, scaled to [0, 1]
+    """
+    # If all data points are strings of equal length
+    # then compute entropy per each index through all data
+    #
+    # Example:
+    #
+    #   column
+    # 1 'wqk5'
+    # 2 'wq6z'
+    # 3 'wqv7'
+    # 4 'eq8O'
+    # 5 'eqkO'
+    # 6 'eqyS'
+    # 7 'eqAe'
+    #    ||||
+    #    ||||-------------------- index 3
+    #    |||                      Counter({5: 1, z: 1, 7: 1, O: 2, s: 1, e: 1})
+    #    |||                      S = entropy[1, 1, 1, 2, 1, 1]
+    #    |||                      randomness = S / np.log(6) <----- 6 unique values at this index
+    #    |||
+    #    |||--------------------- index 2
+    #    ||                       Counter({k: 2, 6: 1, v: 1, 8: 1, Y: 1, A: 1})
+    #    ||                       S = entropy[2, 1, 1, 1, 1, 1]
+    #    ||                       randomness = S / np.log(6) <----- 6 unique values at this index
+    #    ||
+    #    ||---------------------- index 1
+    #    |                        Counter({q: 7})
+    #    |                        S = entropy[7]
+    #    |                        randomness = S / np.log(1) <----- 1 unique value at this index
+    #    |
+    #    |----------------------- index 0
+    #                             Counter({w: 3, e: 4})
+    #                             S = entropy[3, 4]
+    #                             randomness = S / np.log(2) <----- 2 unique values at this index
+    #
+    # Scaling entropy by np.log(num_of_unique_values) produces a number in range [0, 1]
+    chars = np.array(str_data.tolist(), dtype=str)
+    length = chars.dtype.itemsize // 4
+    # One row per string, one column per index, with the code points of the characters
+    chars = chars.view(np.uint32).reshape(len(chars), length)
+
+    randomness_per_index = []
+    for i in range(length):
+        _, counts = np.unique(chars[:, i], return_counts=True)
+        S = st.entropy(counts)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            randomness_per_index.append(S / np.log(len(counts)))
+    return randomness_per_index
+
+
 def get_identifier_description(data, column_name, data_type, data_subtype, other_potential_subtypes):
-    data = list(data)
-    unquie_pct = len(set(data))/len(data)
+    """
+    Most checks need the column to be (nearly) unique, so they start by looking at a random sample of it: samples
+    have fewer duplicates than the whole column, so a sample that isn't unique enough rules the column out. Values
+    that disprove a check over the whole column are also looked for in the sample first. The characters entropy
+    of hashes and the mean number of spaces are estimated from the sample.
+    """
+    if not isinstance(data, pd.Series):
+        data = pd.Series(list(data), dtype=object)
+    data = data.reset_index(drop=True)
+    if len(data) == 0:
+        return None
+
+    if len(data) > IDENTIFIER_SAMPLE_SIZE:
+        sample = data.sample(n=IDENTIFIER_SAMPLE_SIZE, random_state=0)
+    else:
+        sample = data
+    sample_str_data = sample.astype(str)
 
-    lenghts = [len(str(x)) for x in data]
-    mean_len = np.mean(lenghts)
-    max_len = np.max(lenghts)
+    is_foreign_key = data_subtype == DATA_SUBTYPES.INT and _is_foreign_key_name(column_name)
+    if sample.nunique(dropna=False)/len(sample) <= 0.98:
+        return 'Foregin key' if is_foreign_key else None
 
-    spaces = [len(str(x).split(' ')) - 1 for x in data]
-    mean_spaces = np.mean(spaces)
+    nr_unique = data.nunique(dropna=False)
+    unquie_pct = nr_unique/len(data)
 
     # Detect auto incrementing index
     if data_subtype == DATA_SUBTYPES.INT:
-        if get_pct_auto_increment(data) > 0.98 and unquie_pct > 0.99:
+        if unquie_pct > 0.99 and get_pct_auto_increment(data) > 0.98:
             return 'Auto-incrementing identifier'
 
+    str_data = None
+
+    def get_str_data():
+        nonlocal str_data
+        if str_data is None:
+            str_data = data.astype(str)
+        return str_data
+
     # Detect hash
-    all_same_length = all(len(str(data[0])) == len(str(x)) for x in data)
-    uuid_charset = set('0123456789abcdefABCDEF-')
-    all_uuid_charset = all(set(str(x)).issubset(uuid_charset) for x in data)
-    is_uuid = all_uuid_charset and all_same_length
-
-    if all_same_length and len(data) == len(set(data)):
-        str_data = [str(x) for x in data]
-        # If all data points are strings of equal length
-        # then compute entropy per each index through all data
-        #
-        # Example:
-        #
-        #   column
-        # 1 'wqk5'
-        # 2 'wq6z'
-        # 3 'wqv7'
-        # 4 'eq8O'
-        # 5 'eqkO'
-        # 6 'eqyS'
-        # 7 'eqAe'
-        #    ||||
-        #    ||||-------------------- index 3
-        #    |||                      Counter({5: 1, z: 1, 7: 1, O: 2, s: 1, e: 1})
-        #    |||                      S = entropy[1, 1, 1, 2, 1, 1]
-        #    |||                      randomness = S / np.log(6) <----- 6 unique values at this index
-        #    |||
-        #    |||--------------------- index 2
-        #    ||                       Counter({k: 2, 6: 1, v: 1, 8: 1, Y: 1, A: 1})
-        #    ||                       S = entropy[2, 1, 1, 1, 1, 1]
-        #    ||                       randomness = S / np.log(6) <----- 6 unique values at this index
-        #    ||
-        #    ||---------------------- index 1
-        #    |                        Counter({q: 7})
-        #    |                        S = entropy[7]
-        #    |                        randomness = S / np.log(1) <----- 1 unique value at this index
-        #    |
-        #    |----------------------- index 0
-        #                             Counter({w: 3, e: 4})
-        #                             S = entropy[3, 4]
-        #                             randomness = S / np.log(2) <----- 2 unique values at this index
-        #
-        # Scaling entropy by np.log(num_of_unique_values) produces a number in range [0, 1]
-        randomness_per_index = []
-        for i, _ in enumerate(str_data[0]):
-            N = len(set(x[i] for x in str_data))
-            S = st.entropy([*Counter(x[i] for x in str_data).values()])
-            randomness_per_index.append(S / np.log(N))
-
-        if np.mean(randomness_per_index) > 0.95:
+    all_same_length = sample_str_data.str.len().nunique() == 1 and get_str_data().str.len().nunique() == 1
+
+    if all_same_length and nr_unique == len(data):
+        if np.mean(_get_randomness_per_index(sample_str_data)) > 0.95:
             return 'Hash-like identifier'
 
     # Detect foreign key
-    if data_subtype == DATA_SUBTYPES.INT:
-        if _is_foreign_key_name(column_name):
-            return 'Foregin key'
+    if is_foreign_key:
+        return 'Foregin key'
 
     if _is_identifier_name(column_name) or data_type == DATA_TYPES.CATEGORICAL:
         if unquie_pct > 0.98:
+            is_uuid = (all_same_length
+                       and sample_str_data.str.match(UUID_RE).all()
+                       and get_str_data().str.match(UUID_RE).all())
             if is_uuid:
                 return 'UUID'
             else:
                 return 'Unknown identifier'
 
     # Everything is unique and it's too short to be rich text
-    if data_type in (DATA_TYPES.CATEGORICAL, DATA_TYPES.TEXT) and unquie_pct > 0.999 and mean_spaces < 1:
-        return 'Unknown identifier'
+    if data_type in (DATA_TYPES.CATEGORICAL, DATA_TYPES.TEXT) and unquie_pct > 0.999:
+        if sample_str_data.str.count(' ').mean() < 1:
+            return 'Unknown identifier'
 
     return None
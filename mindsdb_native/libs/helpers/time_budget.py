@@ -0,0 +1,139 @@
+import time
+
+
+# Rough seconds each data preparation phase takes per cell (row x column) of the input data
+PHASE_COST_PER_CELL = {
+    'DataCleaner': 1e-6,
+    'TypeDeductor': 3e-5,
+    'DataAnalyzer': 3e-5,
+    'DataSplitter': 1e-6,
+    'DataTransformer': 2e-6
+}
+# Split of the time left after data preparation between training and the model analysis
+MODEL_PHASE_SHARES = {
+    'ModelInterface': 3/4,
+    'ModelAnalyzer': 1/4
+}
+# Data preparation is never planned to take more than this share of the budget
+MAX_PREPARATION_SHARE = 1/2
+# Training always gets at least this share of the budget, even if it means going over it
+MIN_TRAINING_SHARE = 1/10
+# Phases never sample the data below this number of rows to fit in their deadline
+MIN_SAMPLE_ROWS = 1000
+
+
+class TimeBudget():
+    """
+    Splits the time budget of a learn (`stop_training_in_x_seconds`) between its phases.
+
+    Phases are first planned from the shape of the data (see `plan`), known once the data is extracted.
+    When a phase starts, it gets a deadline from the time actually left, in proportion to the plan of the
+    phases still to run, so phases that take more or less than planned shift the deadlines of the following ones.
+
+    If the user didn't set a budget it isn't `enforced`: deadlines are still computed against a 12 hours budget,
+    but phases shouldn't degrade their results to meet them.
+    """
+    def __init__(self, total=None, started_at=None, phases=()):
+        self.enforced = total is not None
+        # Stop training after 12 hours unless the user doesn't want us to
+        self.total = total if total is not None else 3600 * 12
+        self.started_at = started_at if started_at is not None else time.time()
+
+        # [phase name, planned seconds, done], in the order phases run
+        self._plan = [[name, 0, False] for name in phases]
+        self._current = None
+
+        # Planned (deadline given at start) and actual seconds of every phase that ran, stored in the lmd
+        self.report = {
+            'total': total,
+            'phases': []
+        }
+
+    def plan(self, nr_rows, nr_columns):
+        """
+        Estimates the cost of the phases still to run, for data of the given shape
+        """
+        cells = nr_rows * nr_columns
+        preparation = [entry for entry in self._plan if not entry[2] and entry[0] in PHASE_COST_PER_CELL]
+        for entry in preparation:
+            entry[1] = cells * PHASE_COST_PER_CELL[entry[0]]
+
+        preparation_time = sum(entry[1] for entry in preparation)
+        max_preparation_time = self.total * MAX_PREPARATION_SHARE
+        if preparation_time > max_preparation_time:
+            for entry in preparation:
+                entry[1] *= max_preparation_time / preparation_time
+            preparation_time = max_preparation_time
+
+        for entry in self._plan:
+            if entry[0] in MODEL_PHASE_SHARES:
+                entry[1] = (self.total - preparation_time) * MODEL_PHASE_SHARES[entry[0]]
+
+    def elapsed(self):
+        return time.time() - self.started_at
+
+    def start_phase(self, name):
+        pending = [entry for entry in self._plan if not entry[2]]
+        entry = next((x for x in pending if x[0] == name), None)
+        if entry is None:
+            self._current = None
+            return
+
+        planned_left = sum(x[1] for x in pending)
+        time_left = max(0, self.total - self.elapsed())
+        allocated = time_left * entry[1] / planned_left if planned_left > 0 else 0
+        if name == 'ModelInterface':
+            allocated = max(allocated, self.total * MIN_TRAINING_SHARE)
+
+        self._current = {
+            'entry': entry,
+            'started_at': time.time(),
+            'deadline': time.time() + allocated
+        }
+        self.report['phases'].append({
+            'name': name,
+            'planned': allocated,
+            'actual': None
+        })
+
+    def finish_phase(self, name):
+        if self._current is None or self._current['entry'][0] != name:
+            return
+        self._current['entry'][2] = True
+        self.report['phases'][-1]['actual'] = time.time() - self._current['started_at']
+        self._current = None
+
+    def skip_phase(self, name):
+        """
+        Marks the next run of phase `name` as done without running it, e.g. when resuming a learn
+        """
+        entry = next((x for x in self._plan if not x[2] and x[0] == name), None)
+        if entry is not None:
+            entry[2] = True
+
+    def time_left(self, name):
+        """
+        :return: seconds until the deadline of phase `name`, if it's the one running, otherwise None
+        """
+        if self._current is None or self._current['entry'][0] != name:
+            return None
+        return self._current['deadline'] - time.time()
+
+    def get_row_limit(self, name, nr_columns):
+        """
+        :return: how many rows phase `name` can process without missing its deadline, or None if there's no limit
+        """
+        time_left = self.time_left(name)
+        if not self.enforced or time_left is None or name not in PHASE_COST_PER_CELL:
+            return None
+        rows = time_left / (PHASE_COST_PER_CELL[name] * max(nr_columns, 1))
+        return max(MIN_SAMPLE_ROWS, int(rows))
+
+    def fit_sample(self, name, df):
+        """
+        :return: `df`, or a random sample of it small enough for phase `name` to meet its deadline
+        """
+        row_limit = self.get_row_limit(name, len(df.columns))
+        if row_limit is None or len(df) <= row_limit:
+            return df
+        return df.sample(n=row_limit, random_state=0)
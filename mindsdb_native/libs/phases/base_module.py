@@ -50,7 +50,8 @@ class BaseModule():
 
         self.log.info('[START] {class_name}'.format(class_name=class_name))
 
-        ret = self.run(**kwargs)
+        with self.transaction.timer(class_name):
+            ret = self.run(**kwargs)
         execution_time = time.time() - start
 
         self.log.info('[END] {class_name}, execution time: {execution_time:.3f} seconds'.format(class_name=class_name, execution_time=execution_time))
@@ -5,13 +5,17 @@ import datetime
 
 import datetime
 import numpy as np
+import pandas as pd
 from scipy.stats import entropy
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.cluster import MiniBatchKMeans
 import imagehash
 from PIL import Image
 
-from mindsdb_native.libs.helpers.general_helpers import get_value_bucket
+from mindsdb_native.libs.helpers.general_helpers import get_value_bucket, factorize_values
+from mindsdb_native.libs.helpers.stats_helpers import merge_bucketed_histogram, merge_counts_histogram
+from mindsdb_native.libs.helpers.column_cache import COLUMN_CACHE, get_column_cache_key
+from mindsdb_native.libs.helpers.date_helpers import ParseMemo
 from sklearn.neighbors import LocalOutlierFactor
 from mindsdb_native.libs.constants.mindsdb import *
 from mindsdb_native.libs.phases.base_module import BaseModule
@@ -40,24 +44,34 @@ def lof_outliers(col_subtype, col_data):
     return outliers
 
 
-def clean_int_and_date_data(col_data, log, lmd, col_name):
-    cleaned_data = []
+def clean_int_and_date_data(col_data, log, lmd, col_name, parse_memo=None):
+    """
+    :return: the numbers in `col_data`, with dates as timestamps, cleaning every distinct value only once
+    """
+    parse_memo = parse_memo if parse_memo is not None else ParseMemo()
+    dateutil_parser_kwargs = lmd.get('dateutil_parser_kwargs_per_column', {}).get(col_name, {})
 
-    for ele in col_data:
+    def clean(ele):
         if str(ele) not in ['', str(None), str(False), str(np.nan), 'NaN', 'nan', 'NA', 'null'] and (not ele or not str(ele).isspace()):
             try:
-                cleaned_data.append(clean_float(ele))
+                return (clean_float(ele),)
             except Exception as e1:
                 try:
-                    cleaned_data.append(
-                        dateutil.parser.parse(
-                            str(ele),
-                            **lmd.get('dateutil_parser_kwargs_per_column', {}).get(col_name, {})
-                        ).timestamp()
-                    )
+                    return (parse_memo.parse(str(ele), **dateutil_parser_kwargs).timestamp(),)
                 except Exception as e2:
                     log.warning(f'Failed to parser numerical value with error chain:\n {e1} -> {e2}\n')
-                    cleaned_data.append(0)
+                    return (0,)
+        # Values that are left out
+        return ()
+
+    if not isinstance(col_data, pd.Series):
+        col_data = pd.Series(list(col_data), dtype=object)
+    codes, distinct = factorize_values(col_data)
+    cleaned_distinct = [clean(ele) for ele in distinct]
+
+    cleaned_data = []
+    for code in codes:
+        cleaned_data.extend(cleaned_distinct[code])
 
     return cleaned_data
 
@@ -229,13 +243,197 @@ def compute_outlier_buckets(outlier_values,
     return outlier_buckets
 
 
+def get_bias_report(histogram, data_type):
+    S, biased_buckets = compute_entropy_biased_buckets(histogram['y'], histogram['x'])
+    bias = {
+        'entropy': S,
+        'description': """Under the assumption of uniformly distributed data (i.e., same probability for Head or Tails on a coin flip) mindsdb tries to detect potential divergences from such case, and it calls this "potential bias". Thus by our data having any potential bias mindsdb means any divergence from all categories having the same probability of being selected."""
+    }
+    if biased_buckets:
+        bias['biased_buckets'] = biased_buckets
+    if S < 0.8:
+        if data_type == DATA_TYPES.CATEGORICAL:
+            warning_str =  "You may to check if some categories occur too often to too little in this columns."
+        else:
+            warning_str = "You may want to check if you see something suspicious on the right-hand-side graph."
+        bias['warning'] = warning_str + " This doesn't necessarily mean there's an issue with your data, it just indicates a higher than usual probability there might be some issue."
+    return bias
+
+
+# Added to the statistics of a column after its warnings are counted
+GUESS_PROBABILITY_KEYS = ['guess_probability', 'balanced_guess_probability', 'tag_hist']
+
+
 class DataAnalyzer(BaseModule):
     """
     The data analyzer phase is responsible for generating the insights we need about the data in order to vectorize it.
     Additionally, also provides the user with some extra meaningful information about his data.
     """
 
-    def run(self, input_data):
+    def _count_warnings(self, col_stats):
+        """
+        Counts the statistics of the column as they are before its guess probabilities are added
+        """
+        col_stats['nr_warnings'] = 0
+        for k, x in col_stats.items():
+            if k in GUESS_PROBABILITY_KEYS:
+                continue
+            if isinstance(x, dict) and 'warning' in x:
+                self.log.warning(x['warning'])
+            col_stats['nr_warnings'] += 1
+
+    def _update_tag_hist(self, tag_hist, col_data, weight=1):
+        """
+        :param weight: what every occurrence of a tag adds to its count
+        """
+        delimiter = self.transaction.lmd.get('tags_delimiter', ',')
+        for item in col_data:
+            for tag in item.split(delimiter):
+                tag_hist[tag.strip()] += weight
+
+    def _set_guess_probability(self, col_stats, data_subtype, nr_values):
+        """
+        :param nr_values: number of non-null values in the (sampled) data the statistics were computed on
+        """
+        if data_subtype == DATA_SUBTYPES.TAGS:
+            col_stats['guess_probability'] = np.mean([(v / nr_values)**2 for v in col_stats['tag_hist'].values()])
+            col_stats['balanced_guess_probability'] = 0.5
+        else:
+            col_stats['guess_probability'] = sum((k / nr_values)**2 for k in col_stats['histogram']['y'])
+            col_stats['balanced_guess_probability'] = 1 / len(col_stats['histogram']['y'])
+
+    def _merge_stats(self, input_data):
+        """
+        Adds the rows of `input_data` to the statistics computed when the model was learned, without going
+        over the data it was learned from: counts are added up and histograms keep their buckets (and so do
+        `percentage_buckets`, which the model analysis refers to). Outliers aren't recomputed.
+
+        Statistics that were computed on a sample of the data get the new rows counted at the rate it was sampled at.
+        """
+        stats_v2 = self.transaction.lmd['stats_v2']
+        data_preparation = self.transaction.lmd['data_preparation']
+
+        old_row_count = data_preparation['total_row_count']
+        new_row_count = len(input_data.data_frame)
+        row_count = old_row_count + new_row_count
+        sample_rate = data_preparation.get('used_row_count', old_row_count) / old_row_count if old_row_count > 0 else 1
+
+        for col_name in self.transaction.lmd['columns']:
+            if col_name in self.transaction.lmd['columns_to_ignore'] or col_name in self.transaction.lmd['empty_columns']:
+                continue
+            self.log.info(f'Updating the statistics of column: {col_name} !')
+            col_stats = stats_v2[col_name]
+            data_type = col_stats['typing']['data_type']
+            data_subtype = col_stats['typing']['data_subtype']
+
+            col_data = input_data.data_frame[col_name].dropna()
+            if data_type == DATA_TYPES.NUMERIC or data_subtype == DATA_SUBTYPES.TIMESTAMP:
+                col_data = clean_int_and_date_data(col_data, self.log, self.transaction.lmd, col_name, self.transaction.parse_memo)
+
+            new_empty = get_column_empty_values_report(input_data.data_frame[col_name])
+            empty_cells = col_stats['empty'].get('empty_cells', 0) + new_empty['empty_cells']
+            col_stats['empty'] = new_empty
+            col_stats['empty']['empty_cells'] = empty_cells
+            col_stats['empty']['empty_percentage'] = 100 * round(empty_cells / row_count, 3)
+            col_stats['empty']['is_empty'] = empty_cells == row_count
+            if empty_cells > 0:
+                col_stats['empty']['warning'] = f'Your column has {empty_cells} values missing'
+            nr_values = row_count - empty_cells
+
+            histogram = col_stats.get('histogram', None)
+            if histogram:
+                if data_type == DATA_TYPES.NUMERIC or data_subtype == DATA_SUBTYPES.TIMESTAMP:
+                    histogram = merge_bucketed_histogram(histogram, col_data, sample_rate)
+                    if len(col_data) > 0 and min(col_data) < 0:
+                        col_stats.pop('positive_domain', None)
+                elif data_subtype != DATA_SUBTYPES.IMAGE:
+                    # Categorical histograms are built from the whole column, the others from the sample
+                    if data_type == DATA_TYPES.CATEGORICAL:
+                        hist_data, weight = input_data.data_frame[col_name], 1
+                    else:
+                        hist_data, weight = col_data, sample_rate
+                    new_histogram, _ = get_histogram(hist_data, data_type=data_type, data_subtype=data_subtype)
+                    histogram = merge_counts_histogram(histogram, new_histogram, weight)
+                col_stats['histogram'] = histogram
+                col_stats['bias'] = get_bias_report(histogram, data_type)
+
+            if data_type == DATA_TYPES.CATEGORICAL and histogram and nr_values > 0:
+                unique = get_uniq_values_report(histogram['x'])
+                unique['unique_percentage'] = 100 * round(unique['unique_values'] / row_count, 8)
+                col_stats['unique'] = unique
+
+                if data_subtype == DATA_SUBTYPES.TAGS:
+                    self._update_tag_hist(col_stats['tag_hist'], col_data, sample_rate)
+                self._set_guess_probability(col_stats, data_subtype, nr_values * sample_rate)
+
+            self._count_warnings(col_stats)
+
+        data_preparation['total_row_count'] = row_count
+        # Keeps the rate the statistics were sampled at for the next merge
+        data_preparation['used_row_count'] = round(row_count * sample_rate)
+
+    def _analyze_column(self, col_name, typing, sample_col, full_col):
+        """
+        :param sample_col: the column in the (sampled) data to analyze
+        :param full_col: the whole column
+        :return: the statistics of the column that only depend on its data and type
+        """
+        col_stats = {}
+        data_type = typing['data_type']
+        data_subtype = typing['data_subtype']
+
+        col_data = sample_col.dropna()
+        if data_type == DATA_TYPES.NUMERIC or data_subtype == DATA_SUBTYPES.TIMESTAMP:
+            col_data = clean_int_and_date_data(col_data, self.log, self.transaction.lmd, col_name, self.transaction.parse_memo)
+
+        col_stats['empty'] = get_column_empty_values_report(full_col)
+
+        if data_type == DATA_TYPES.CATEGORICAL:
+            hist_data = full_col
+            col_stats['unique'] = get_uniq_values_report(full_col)
+        else:
+            hist_data = col_data
+
+        histogram, percentage_buckets = get_histogram(hist_data,
+                                                      data_type=data_type,
+                                                      data_subtype=data_subtype)
+        col_stats['histogram'] = histogram
+        col_stats['percentage_buckets'] = percentage_buckets
+        if histogram:
+            col_stats['bias'] = get_bias_report(histogram, data_type)
+
+            if data_type == DATA_TYPES.NUMERIC:
+                # specify positive numerical domain
+                if col_stats['histogram']['x'][0] >= 0:
+                    col_stats['positive_domain'] = True
+
+            if data_type == DATA_TYPES.NUMERIC and len(col_data) >= 2:
+                outliers = lof_outliers(data_subtype, col_data)
+                col_stats['outliers'] = {
+                    'outlier_values': outliers,
+                    'outlier_buckets': compute_outlier_buckets(
+                        outlier_values=outliers,
+                        hist_x=histogram['x'],
+                        hist_y=histogram['y'],
+                        percentage_buckets=percentage_buckets,
+                        col_stats={'typing': typing}
+                    ),
+                    'description': """Potential outliers can be thought as the "extremes", i.e., data points that are far from the center of mass (mean/median/interquartile range) of the data."""
+                }
+
+        if data_type == DATA_TYPES.CATEGORICAL:
+            if data_subtype == DATA_SUBTYPES.TAGS:
+                col_stats['tag_hist'] = Counter()
+                self._update_tag_hist(col_stats['tag_hist'], col_data)
+            self._set_guess_probability(col_stats, data_subtype, len(col_data))
+
+        return col_stats
+
+    def run(self, input_data, mode='learn'):
+        if mode == 'adjust':
+            self._merge_stats(input_data)
+            return
+
         stats_v2 = self.transaction.lmd['stats_v2']
 
         sample_settings = self.transaction.lmd['sample_settings']
@@ -257,6 +455,12 @@ class DataAnalyzer(BaseModule):
             sample_size = population_size
             sample_df = input_data.data_frame
 
+        budget_sample_df = self.transaction.time_budget.fit_sample('DataAnalyzer', sample_df)
+        if len(budget_sample_df) < len(sample_df):
+            self.transaction.log.warning('Analyzing a smaller sample to stay within stop_training_in_x_seconds')
+            sample_df = budget_sample_df
+            sample_size = len(sample_df)
+
         self.transaction.log.info(f'Analyzing a sample of {sample_size} '
                                   f'from a total population of {population_size}, '
                                   f'this is equivalent to {round(sample_size * 100 / population_size, 1)}% of your data.')
@@ -269,83 +473,25 @@ class DataAnalyzer(BaseModule):
         for col_name in self.transaction.lmd['columns']:
             if col_name in self.transaction.lmd['columns_to_ignore']:
                 continue
-            self.log.info(f'Analyzing column: {col_name} !')
-            data_type = stats_v2[col_name]['typing']['data_type']
-            data_subtype = stats_v2[col_name]['typing']['data_subtype']
-
-            col_data = sample_df[col_name].dropna()
-            if data_type == DATA_TYPES.NUMERIC or data_subtype == DATA_SUBTYPES.TIMESTAMP:
-                col_data = clean_int_and_date_data(col_data, self.log, self.transaction.lmd, col_name)
-
-            stats_v2[col_name]['empty'] = get_column_empty_values_report(input_data.data_frame[col_name])
-
-            if data_type == DATA_TYPES.CATEGORICAL:
-                hist_data = input_data.data_frame[col_name]
-                stats_v2[col_name]['unique'] = get_uniq_values_report(input_data.data_frame[col_name])
+            typing = stats_v2[col_name]['typing']
+
+            # Columns analyzed by a previous learn on the same data reuse its results
+            cache_key = get_column_cache_key(self.transaction.lmd, col_name, input_data.data_frame[col_name],
+                                             sample_size, typing['data_type'], typing['data_subtype'])
+            col_stats = COLUMN_CACHE.get('DataAnalyzer', cache_key)
+            if col_stats is None:
+                self.log.info(f'Analyzing column: {col_name} !')
+                col_stats = self._analyze_column(col_name, typing, sample_df[col_name], input_data.data_frame[col_name])
+                COLUMN_CACHE.set('DataAnalyzer', cache_key, col_stats)
             else:
-                hist_data = col_data
+                self.log.info(f'Reusing the cached analysis of column: {col_name} !')
+            stats_v2[col_name].update({k: v for k, v in col_stats.items() if k not in GUESS_PROBABILITY_KEYS})
+            self._count_warnings(stats_v2[col_name])
+            stats_v2[col_name].update({k: v for k, v in col_stats.items() if k in GUESS_PROBABILITY_KEYS})
 
-            histogram, percentage_buckets = get_histogram(hist_data,
-                                                          data_type=data_type,
-                                                          data_subtype=data_subtype)
-            stats_v2[col_name]['histogram'] = histogram
-            stats_v2[col_name]['percentage_buckets'] = percentage_buckets
-            if histogram:
-                S, biased_buckets = compute_entropy_biased_buckets(histogram['y'], histogram['x'])
-                stats_v2[col_name]['bias'] = {
-                    'entropy': S,
-                    'description': """Under the assumption of uniformly distributed data (i.e., same probability for Head or Tails on a coin flip) mindsdb tries to detect potential divergences from such case, and it calls this "potential bias". Thus by our data having any potential bias mindsdb means any divergence from all categories having the same probability of being selected."""
-                }
-                if biased_buckets:
-                    stats_v2[col_name]['bias']['biased_buckets'] = biased_buckets
-                if S < 0.8:
-                    if data_type == DATA_TYPES.CATEGORICAL:
-                        warning_str =  "You may to check if some categories occur too often to too little in this columns."
-                    else:
-                        warning_str = "You may want to check if you see something suspicious on the right-hand-side graph."
-                    stats_v2[col_name]['bias']['warning'] = warning_str + " This doesn't necessarily mean there's an issue with your data, it just indicates a higher than usual probability there might be some issue."
-
-                if data_type == DATA_TYPES.NUMERIC:
-                    # specify positive numerical domain
-                    if stats_v2[col_name]['histogram']['x'][0] >= 0:
-                        stats_v2[col_name]['positive_domain'] = True
-
-                if data_type == DATA_TYPES.NUMERIC and len(col_data) >= 2:
-                    outliers = lof_outliers(data_subtype, col_data)
-                    stats_v2[col_name]['outliers'] = {
-                        'outlier_values': outliers,
-                        'outlier_buckets': compute_outlier_buckets(
-                            outlier_values=outliers,
-                            hist_x=histogram['x'],
-                            hist_y=histogram['y'],
-                            percentage_buckets=percentage_buckets,
-                            col_stats=stats_v2[col_name]
-                        ),
-                        'description': """Potential outliers can be thought as the "extremes", i.e., data points that are far from the center of mass (mean/median/interquartile range) of the data."""
-                    }
-
-            stats_v2[col_name]['nr_warnings'] = 0
-            for x in stats_v2[col_name].values():
-                if isinstance(x, dict) and 'warning' in x:
-                    self.log.warning(x['warning'])
-                stats_v2[col_name]['nr_warnings'] += 1
-
-            if data_type == DATA_TYPES.CATEGORICAL:
-                if data_subtype == DATA_SUBTYPES.TAGS:
-                    delimiter = self.transaction.lmd.get('tags_delimiter', ',')
-                    stats_v2[col_name]['tag_hist'] = Counter()
-                    for item in col_data:
-                        arr = [x.strip() for x in item.split(delimiter)]
-                        stats_v2[col_name]['tag_hist'].update(arr)
-                    stats_v2[col_name]['guess_probability'] = np.mean([(v / len(col_data))**2 for v in stats_v2[col_name]['tag_hist'].values()])
-                    stats_v2[col_name]['balanced_guess_probability'] = 0.5
-                else:
-                    stats_v2[col_name]['guess_probability'] = sum((k / len(col_data))**2 for k in histogram['y'])
-                    stats_v2[col_name]['balanced_guess_probability'] = 1 / len(histogram['y'])
-
-            if data_type == DATA_TYPES.CATEGORICAL:
+            if typing['data_type'] == DATA_TYPES.CATEGORICAL:
                 if DATA_TYPES.NUMERIC in stats_v2[col_name]['additional_info']['other_potential_types']:
-                    stats_v2[col_name]['typing']['alias'] = DATA_TYPE_ALIASES.NUMERICAL_LOW_GRANULARITY
+                    typing['alias'] = DATA_TYPE_ALIASES.NUMERICAL_LOW_GRANULARITY
 
             self.log.info(f'Finished analyzing column: {col_name} !\n')
 
@@ -9,7 +9,13 @@ from mindsdb_native.libs.helpers.text_helpers import hashtext
 from mindsdb_native.external_libs.stats import calculate_sample_size
 from mindsdb_native.libs.helpers.query_composer import create_history_query
 
-from pandas.api.types import is_numeric_dtype
+from pandas.api.types import (
+    infer_dtype,
+    is_numeric_dtype,
+    is_float_dtype,
+    is_object_dtype,
+    is_datetime64_any_dtype
+)
 import random
 import traceback
 import pandas as pd
@@ -22,9 +28,77 @@ from mindsdb_native.libs.constants.mindsdb import (
 from mindsdb_native.libs.helpers.json_helpers import unnest_df
 
 
+def _normalize_df(df, columns=None):
+    """
+    Missing values in non-numeric columns become None and lists become tuples
+    (lists caused TypeError: uhashable type 'list' in TypeDeductor phase).
+    Numeric and datetime columns are left untouched, so they keep their dtype (and NaN for missing values).
+
+    Only columns that can actually contain lists are checked cell by cell.
+
+    :param columns: the columns to normalize, all of them by default
+    :return: a normalized copy of `df`
+    """
+    # A real copy, the following phases modify the data frame and it must not be the one the user passed
+    df = df.copy()
+    for col in (df.columns if columns is None else columns):
+        values = df[col]
+        if is_numeric_dtype(values) or is_datetime64_any_dtype(values):
+            continue
+
+        changed = False
+        if not is_object_dtype(values):
+            values = values.astype(object)
+            changed = True
+
+        null_mask = values.isna()
+        if null_mask.any():
+            values = values.where(~null_mask, None)
+            changed = True
+
+        if infer_dtype(values, skipna=True) in ('mixed', 'mixed-integer'):
+            values = values.map(lambda cell: tuple(cell) if isinstance(cell, list) else cell)
+            changed = True
+
+        if changed:
+            df[col] = values
+    return df
+
+
+def _replace_infs(df):
+    """
+    Replaces -inf/inf values, in place, with NaN in float columns and with None in object columns
+
+    :return: the number of values replaced
+    """
+    inf_count = 0
+    for col in df.columns:
+        values = df[col]
+        if is_float_dtype(values):
+            inf_mask = np.isinf(values.values)
+            missing_value = np.nan
+        elif is_object_dtype(values):
+            inferred_type = infer_dtype(values, skipna=True)
+            if inferred_type in ('floating', 'mixed-integer-float'):
+                inf_mask = values.isin([np.inf, -np.inf]).values
+            elif inferred_type == 'mixed':
+                inf_mask = values.map(lambda cell: isinstance(cell, float) and np.isinf(cell)).values.astype(bool)
+            else:
+                continue
+            missing_value = None
+        else:
+            continue
+
+        nr_infs = int(inf_mask.sum())
+        if nr_infs > 0:
+            inf_count += nr_infs
+            df[col] = values.where(~inf_mask, missing_value)
+    return inf_count
+
+
 class DataExtractor(BaseModule):
     def _data_from_when_data(self, df):
-        df = df.where((pd.notnull(df)), None)
+        df = _normalize_df(df)
 
         for col in self.transaction.lmd['columns']:
             if col not in df.columns:
@@ -64,12 +138,11 @@ class DataExtractor(BaseModule):
         # if transaction metadata comes with some data as from_data create the data frame
         if 'from_data' in self.transaction.hmd and self.transaction.hmd['from_data'] is not None:
             # make sure we build a dataframe that has all the columns we need
-            df = self.transaction.hmd['from_data']
-            df = df.where((pd.notnull(df)), None)
+            df = _normalize_df(self.transaction.hmd['from_data'].df)
 
         if self.transaction.lmd['type'] == TRANSACTION_PREDICT:
             if self.transaction.hmd['when_data'] is not None:
-                df = self.transaction.hmd['when_data']
+                df = self.transaction.hmd['when_data'].df
             else:
                 df = pd.DataFrame(self.transaction.hmd['when'])
                 df, _ = unnest_df(df)
@@ -112,19 +185,18 @@ class DataExtractor(BaseModule):
                     if df[col].iloc[0] is not None:
                         historical_df[col] = [type(df[col].iloc[0])(x) for x in historical_df[col]]
 
-                df = pd.concat([df,historical_df])
+                df = pd.concat([df, _normalize_df(historical_df)])
 
-        for col, f in self.transaction.lmd.get('apply_to_columns', {}).items():
-            df.loc[:, col] = df[col].apply(f)
+        apply_to_columns = self.transaction.lmd.get('apply_to_columns', {})
+        for col, f in apply_to_columns.items():
+            df[col] = df[col].apply(f)
+        if len(apply_to_columns) > 0:
+            df = _normalize_df(df, columns=list(apply_to_columns))
 
         # Sorting here *should* only be needed at learn time
         if self.transaction.lmd['type'] == TRANSACTION_LEARN:
             df = self._apply_sort_conditions_to_df(df)
 
-        # Mutable lists -> immutable tuples
-        # (lists caused TypeError: uhashable type 'list' in TypeDeductor phase)
-        df = df.applymap(lambda cell: tuple(cell) if isinstance(cell, list) else cell)
-
         groups = df.columns.to_series().groupby(df.dtypes).groups
 
         # @TODO: Maybe move to data cleaner ? Seems kind of out of place here
@@ -158,12 +230,6 @@ class DataExtractor(BaseModule):
                 self.transaction.lmd['data_types'][col] = self.transaction.hmd['from_data'].data_types[col]
                 self.transaction.lmd['data_subtypes'][col] = self.transaction.hmd['from_data'].data_subtypes[col]
 
-    def _count_isna(self, df):
-        count = 0
-        for col in df.columns:
-            count += df[col].isna().sum()
-        return count
-
     def run(self):
         if self.transaction.hmd.get('from_data') is not None:
             self.transaction.lmd['data_source_name'] = self.transaction.hmd['from_data'].name()
@@ -173,10 +239,7 @@ class DataExtractor(BaseModule):
         # --- Dataset gets randomized or sorted (if timeseries) --- #
 
         # --- Replace -inf/inf values with None --- #
-        null_count_1 = self._count_isna(df)
-        df.replace([np.inf, -np.inf], np.nan, inplace=True)
-        null_count_2 = self._count_isna(df)
-        inf_count = (null_count_2 - null_count_1)
+        inf_count = _replace_infs(df)
         if inf_count > 0:
             self.log.warning('Your dataset contains {} -inf/inf values, replacing them with None'.format(inf_count))
         # --- Replace -inf/inf values with None --- #
@@ -1,6 +1,6 @@
 from collections import defaultdict
-from copy import deepcopy
 
+import numpy as np
 import pandas as pd
 
 from mindsdb_native.config import CONFIG
@@ -9,20 +9,53 @@ from mindsdb_native.libs.phases.base_module import BaseModule
 from mindsdb_native.libs.data_types.mindsdb_logger import log
 
 
+NO_GROUP = tuple()
+# Rough number of copies of the training rows a learn holds in memory at its peak
+# (the cleaned data, the splits and the data encoded by lightwood)
+LEARN_DATA_COPIES = 4
+# Nr of rows the size of a row is estimated from
+ROW_SIZE_SAMPLE = 1000
+
+
 class DataSplitter(BaseModule):
+    def _limit_train_rows(self, df, train_indexes, max_train_rows_memory):
+        """
+        Subsamples the training rows so the copies of them learn holds in memory should fit in `max_train_rows_memory`
+        bytes, estimated from the size of a sample of the rows. This is a cap on the training rows, not on the memory
+        used by learn: the data as extracted and analyzed, and the test and validation rows, are kept whole.
+        Timeseries keep the most recent rows of every group, other data a random sample.
+        """
+        size_sample = df.sample(n=min(len(df), ROW_SIZE_SAMPLE), random_state=0)
+        row_size = size_sample.memory_usage(index=True, deep=True).sum() / max(1, len(size_sample))
+        max_rows = max(1, int(max_train_rows_memory / (row_size * LEARN_DATA_COPIES)))
+        nr_rows = len(train_indexes[NO_GROUP])
+        if nr_rows <= max_rows:
+            return
+
+        self.log.warning(f'Training on {max_rows} of the {nr_rows} training rows to stay within max_train_rows_memory')
+        if self.transaction.lmd['tss']['is_timeseries']:
+            groups = [x for x in train_indexes if x != NO_GROUP] or [NO_GROUP]
+            kept = []
+            for group in groups:
+                nr_kept = int(np.ceil(len(train_indexes[group]) * max_rows / nr_rows))
+                train_indexes[group] = train_indexes[group][len(train_indexes[group]) - nr_kept:]
+                kept.extend(train_indexes[group])
+            train_indexes[NO_GROUP] = kept
+        else:
+            positions = np.random.RandomState(0).choice(nr_rows, size=max_rows, replace=False)
+            train_indexes[NO_GROUP] = [train_indexes[NO_GROUP][i] for i in sorted(positions)]
+
     def run(self):
         group_by = self.transaction.lmd['tss']['group_by'] or []
 
-        NO_GROUP = tuple()
-
         all_indexes = defaultdict(list)
 
-        for i, row in self.transaction.input_data.data_frame.iterrows():
-            all_indexes[NO_GROUP].append(i)
+        df = self.transaction.input_data.data_frame
+        all_indexes[NO_GROUP] = list(df.index)
 
         if len(group_by) > 0:
-            for i, row in self.transaction.input_data.data_frame.iterrows():
-                all_indexes[tuple(row[group_by])].append(i)
+            for i, *group in df[group_by].itertuples(name=None):
+                all_indexes[tuple(group)].append(i)
 
         train_indexes = defaultdict(list)
         test_indexes = defaultdict(list)
@@ -78,20 +111,24 @@ class DataSplitter(BaseModule):
                     test_b = length
                     test_indexes[NO_GROUP] = all_indexes[NO_GROUP][test_a:test_b]
 
-            self.transaction.input_data.train_df = self.transaction.input_data.data_frame.loc[train_indexes[NO_GROUP]].copy()
-            self.transaction.input_data.test_df = self.transaction.input_data.data_frame.loc[test_indexes[NO_GROUP]].copy()
-            self.transaction.input_data.validation_df = self.transaction.input_data.data_frame.loc[validation_indexes[NO_GROUP]].copy()
+            max_train_rows_memory = self.transaction.lmd.get('max_train_rows_memory', None)
+            if max_train_rows_memory is not None:
+                self._limit_train_rows(df, train_indexes, max_train_rows_memory)
+
+            # Indexing with a list already copies the rows
+            self.transaction.input_data.train_df = df.loc[train_indexes[NO_GROUP]]
+            self.transaction.input_data.test_df = df.loc[test_indexes[NO_GROUP]]
+            self.transaction.input_data.validation_df = df.loc[validation_indexes[NO_GROUP]]
+            df = None
 
             if self.transaction.lmd['tss']['is_timeseries']:
                 ts_train_row_count = len(self.transaction.input_data.train_df)
                 ts_test_row_count = len(self.transaction.input_data.test_df)
                 ts_val_row_count = len(self.transaction.input_data.validation_df)
 
-                historical_train = deepcopy(self.transaction.input_data.train_df)
-                historical_train['make_predictions'] = [False] * len(historical_train)
-
-                historical_test = deepcopy(self.transaction.input_data.test_df)
-                historical_test['make_predictions'] = [False] * len(historical_test)
+                # `concat` copies the historical rows, so they don't need copies of their own
+                historical_train = self.transaction.input_data.train_df.assign(make_predictions=False)
+                historical_test = self.transaction.input_data.test_df.assign(make_predictions=False)
 
                 self.transaction.input_data.train_df['make_predictions'] = [True] * len(self.transaction.input_data.train_df)
 
@@ -99,7 +136,7 @@ class DataSplitter(BaseModule):
                 self.transaction.input_data.test_df = pd.concat([self.transaction.input_data.test_df,historical_train])
 
                 self.transaction.input_data.validation_df['make_predictions'] = [True] * len(self.transaction.input_data.validation_df)
-                self.transaction.input_data.validation_df = pd.concat([self.transaction.input_data.validation_df,historical_test,deepcopy(historical_train)])
+                self.transaction.input_data.validation_df = pd.concat([self.transaction.input_data.validation_df,historical_test,historical_train])
 
             self.transaction.input_data.data_frame = None
 
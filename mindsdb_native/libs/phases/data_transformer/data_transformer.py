@@ -7,6 +7,7 @@ import pandas as pd
 from mindsdb_native.libs.constants.mindsdb import *
 from mindsdb_native.libs.phases.base_module import BaseModule
 from mindsdb_native.libs.helpers.text_helpers import clean_float
+from mindsdb_native.libs.helpers.general_helpers import apply_to_unique
 from lightwood.helpers.text import tokenize_text
 
 
@@ -24,10 +25,11 @@ def _try_round(x):
         return None
 
 
-def _standardize_date(date_str, dateutil_parser_kwargs):
+def _standardize_date(date_str, dateutil_parser_kwargs, parse_memo=None):
     try:
         # will return a datetime object
-        date = dateutil.parser.parse(date_str, **dateutil_parser_kwargs)
+        parse = parse_memo.parse if parse_memo is not None else dateutil.parser.parse
+        date = parse(date_str, **dateutil_parser_kwargs)
     except Exception:
         try:
             date = datetime.datetime.utcfromtimestamp(date_str)
@@ -37,10 +39,11 @@ def _standardize_date(date_str, dateutil_parser_kwargs):
     return date.strftime('%Y-%m-%d')
 
 
-def _standardize_datetime(date_str, dateutil_parser_kwargs):
+def _standardize_datetime(date_str, dateutil_parser_kwargs, parse_memo=None):
     try:
         # will return a datetime object
-        date = dateutil.parser.parse(date_str, **dateutil_parser_kwargs)
+        parse = parse_memo.parse if parse_memo is not None else dateutil.parser.parse
+        date = parse(date_str, **dateutil_parser_kwargs)
     except Exception:
         try:
             date = datetime.datetime.utcfromtimestamp(date_str)
@@ -87,17 +90,18 @@ def _clean_float_or_none(val):
 
 class DataTransformer(BaseModule):
     def _apply_to_all_data(self, input_data, column, func, transaction_type, **kwargs):
+        # The functions are applied once per distinct value of the column
         if transaction_type == TRANSACTION_LEARN:
-            input_data.train_df[column] = input_data.train_df[column].apply(func, **kwargs)
-            input_data.validation_df[column] = input_data.validation_df[column].apply(func, **kwargs)
-            input_data.test_df[column] = input_data.test_df[column].apply(func, **kwargs)
+            input_data.train_df[column] = apply_to_unique(input_data.train_df[column], func, **kwargs)
+            input_data.validation_df[column] = apply_to_unique(input_data.validation_df[column], func, **kwargs)
+            input_data.test_df[column] = apply_to_unique(input_data.test_df[column], func, **kwargs)
 
             self.transaction.lmd['stats_v2'][column]['histogram']['x'] = [func(x, **kwargs) for x in self.transaction.lmd['stats_v2'][column]['histogram']['x']]
 
             if 'percentage_buckets' in self.transaction.lmd['stats_v2'][column] and self.transaction.lmd['stats_v2'][column]['percentage_buckets'] is not None:
                 self.transaction.lmd['stats_v2'][column]['percentage_buckets'] = [func(x, **kwargs) for x in self.transaction.lmd['stats_v2'][column]['percentage_buckets']]
         else:
-            input_data.data_frame[column] = input_data.data_frame[column].apply(func, **kwargs)
+            input_data.data_frame[column] = apply_to_unique(input_data.data_frame[column], func, **kwargs)
 
     def run(self, input_data):
         transaction_type = self.transaction.lmd['type']
@@ -122,7 +126,8 @@ class DataTransformer(BaseModule):
                     column,
                     fn,
                     transaction_type,
-                    dateutil_parser_kwargs=self.transaction.lmd.get('dateutil_parser_kwargs_per_column', {}).get(column, {})
+                    dateutil_parser_kwargs=self.transaction.lmd.get('dateutil_parser_kwargs_per_column', {}).get(column, {}),
+                    parse_memo=self.transaction.parse_memo
                 )
                 if self.transaction.hmd['model_backend'] == 'lightwood':
                     self._apply_to_all_data(input_data, column, _lightwood_datetime_processing, transaction_type)
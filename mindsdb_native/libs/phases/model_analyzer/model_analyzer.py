@@ -8,18 +8,110 @@ from sklearn.preprocessing import OneHotEncoder
 from nonconformist.icp import IcpRegressor, IcpClassifier
 from nonconformist.nc import RegressorNc, ClassifierNc, MarginErrFunc
 
+from lightwood.api.predictor import Predictor
 from lightwood.mixers.nn import NnMixer
 from mindsdb_native.libs.helpers.general_helpers import pickle_obj, evaluate_accuracy
 from mindsdb_native.libs.constants.mindsdb import *
 from mindsdb_native.libs.phases.base_module import BaseModule
 from mindsdb_native.libs.helpers.conformal_helpers import ConformalClassifierAdapter, ConformalRegressorAdapter
-from mindsdb_native.libs.helpers.conformal_helpers import BoostedAbsErrorErrFunc, SelfawareNormalizer, t_softmax
+from mindsdb_native.libs.helpers.conformal_helpers import BoostedAbsErrorErrFunc, SelfawareNormalizer, t_softmax, recalibrate_icp
 from mindsdb_native.libs.helpers.confidence_helpers import clean_df, set_conf_range
 from mindsdb_native.libs.helpers.accuracy_stats import AccStats
 
 
+def _is_classification(typing_info):
+    return typing_info['data_type'] == DATA_TYPES.CATEGORICAL or \
+           (typing_info['data_type'] == DATA_TYPES.SEQUENTIAL and
+            DATA_TYPES.CATEGORICAL in typing_info['data_type_dist'].keys())
+
+
+def _get_fit_params(lmd, target):
+    fit_params = {
+        'columns_to_ignore': [col for col in lmd['predict_columns'] if col != target],
+        'nr_preds': lmd['tss'].get('nr_predictions', 0)
+    }
+    fit_params['columns_to_ignore'].extend([f'{target}_timestep_{i}' for i in range(1, fit_params['nr_preds'])])
+    return fit_params
+
+
 class ModelAnalyzer(BaseModule):
-    def run(self):
+    def _column_importance_fits_budget(self, input_columns):
+        budget = self.transaction.time_budget
+        time_left = budget.time_left('ModelAnalyzer')
+        if not budget.enforced or time_left is None:
+            return True
+        # Predicting without a column never takes longer than a full prediction, which includes the encoding
+        durations = [x['duration'] for x in self.transaction.timings if x['name'] == 'LightwoodBackend.lightwood_predict']
+        if len(durations) == 0:
+            return True
+        return np.mean(durations) * len(input_columns) <= time_left
+
+    def _recalibrate_icps(self):
+        """
+        Adds the validation data of an adjust to the calibration of the ICPs, see `recalibrate_icp`
+        """
+        if not self.transaction.hmd['icp'].get('__mdb_active', False):
+            return
+
+        if not isinstance(self.transaction.model_backend.predictor, Predictor):
+            self.log.warning('The model was adjusted by adding a predictor to an ensemble, the confidence estimation won\'t be recalibrated')
+            return
+
+        window = self.transaction.lmd.get('icp_calibration_window', ICP_CALIBRATION_WINDOW)
+        is_multi_ts = self.transaction.lmd['tss']['is_timeseries'] and \
+                      self.transaction.lmd['tss']['nr_predictions'] > 1
+
+        self.transaction.model_backend.predictor.config['include_extra_data'] = True
+        normal_predictions = self.transaction.model_backend.predict('validate')
+        val_df = self.transaction.input_data.cached_val_df
+
+        for target in self.transaction.lmd['predict_columns']:
+            icps = self.transaction.hmd['icp'].get(target, None)
+            if not icps:
+                continue
+
+            typing_info = self.transaction.lmd['stats_v2'][target]['typing']
+            is_classification = _is_classification(typing_info)
+            fit_params = _get_fit_params(self.transaction.lmd, target)
+
+            if is_classification:
+                predictions = np.array(normal_predictions[f'{target}_class_distribution'])
+            elif is_multi_ts:
+                predictions = np.array([p[0] for p in normal_predictions[target]])
+            else:
+                predictions = np.array(normal_predictions[target])
+            selfaware_scores = normal_predictions.get(f'{target}_selfaware_scores', None)
+
+            # The ICPs can't be calibrated on classes the label encoder of the learn didn't see
+            known_rows = np.ones(len(val_df), dtype=bool)
+            encoder = self.transaction.hmd['label_encoders'].get(target, None)
+            if is_classification and encoder is not None:
+                known_rows = val_df[target].isin(encoder.categories_[0]).values
+                if not known_rows.all():
+                    self.log.warning(f'{(~known_rows).sum()} rows have values of {target} the model never saw, they won\'t be used to recalibrate its confidence')
+
+            for group in ['__default', *icps.get('__mdb_groups', [])]:
+                mask = known_rows.copy()
+                if group != '__default':
+                    for key, val in zip(icps['__mdb_group_keys'], group):
+                        mask &= (val_df[key] == val).values
+                    group = frozenset(group)
+                if not mask.any():
+                    continue
+
+                icp = icps[group]
+                icp_df, y = clean_df(deepcopy(val_df[mask]), target, self.transaction, is_classification, fit_params)
+                icp.nc_function.model.prediction_cache = predictions[mask]
+                if icp.nc_function.normalizer is not None:
+                    icp.nc_function.normalizer.prediction_cache = np.array(selfaware_scores)[mask] if selfaware_scores is not None else None
+
+                recalibrate_icp(icp, icp_df.reindex(columns=icp.index).values, y, window)
+
+    def run(self, mode='learn'):
+        if mode == 'adjust':
+            self._recalibrate_icps()
+            return
+
         np.seterr(divide='warn', invalid='warn')
         np.random.seed(0)
         """
@@ -40,7 +132,8 @@ class ModelAnalyzer(BaseModule):
         output_columns = self.transaction.lmd['predict_columns']
         input_columns = [col for col in self.transaction.lmd['columns'] if col not in output_columns and col not in self.transaction.lmd['columns_to_ignore']]
 
-        # Make predictions on the validation and test datasets
+        # Make predictions on the validation and test datasets, with the extra data the confidence estimation needs
+        # (training predicts without it, so these aren't served by its memoized predictions)
         self.transaction.model_backend.predictor.config['include_extra_data'] = True
         normal_predictions = self.transaction.model_backend.predict('validate')
         normal_predictions_test = self.transaction.model_backend.predict('test')
@@ -59,9 +152,7 @@ class ModelAnalyzer(BaseModule):
                            (data_type == DATA_TYPES.SEQUENTIAL and
                             DATA_TYPES.NUMERIC in typing_info['data_type_dist'].keys())
 
-            is_classification = data_type == DATA_TYPES.CATEGORICAL or \
-                                (data_type == DATA_TYPES.SEQUENTIAL and
-                                 DATA_TYPES.CATEGORICAL in typing_info['data_type_dist'].keys())
+            is_classification = _is_classification(typing_info)
 
             is_multi_ts = self.transaction.lmd['tss']['is_timeseries'] and \
                           self.transaction.lmd['tss']['nr_predictions'] > 1
@@ -69,11 +160,7 @@ class ModelAnalyzer(BaseModule):
             is_selfaware = isinstance(self.transaction.model_backend.predictor._mixer, NnMixer) and \
                            self.transaction.model_backend.predictor._mixer.is_selfaware
 
-            fit_params = {
-                'columns_to_ignore': [col for col in output_columns if col != target],
-                'nr_preds': self.transaction.lmd['tss'].get('nr_predictions', 0)
-            }
-            fit_params['columns_to_ignore'].extend([f'{target}_timestep_{i}' for i in range(1, fit_params['nr_preds'])])
+            fit_params = _get_fit_params(self.transaction.lmd, target)
 
             if is_classification:
                 if data_subtype != DATA_SUBTYPES.TAGS:
@@ -133,6 +220,9 @@ class ModelAnalyzer(BaseModule):
                     # create an ICP for each possible group
                     group_info = self.transaction.input_data.train_df[self.transaction.lmd['tss']['group_by']].to_dict('list')
                     all_group_combinations = list(product(*[set(x) for x in group_info.values()]))
+                    # largest groups first, they are the ones kept if we run out of time calibrating
+                    group_sizes = self.transaction.input_data.train_df.groupby(list(group_info.keys())).size().to_dict()
+                    all_group_combinations.sort(key=lambda combination: group_sizes.get(combination if len(combination) > 1 else combination[0], 0), reverse=True)
                     self.transaction.hmd['icp'][target]['__mdb_groups'] = all_group_combinations
                     self.transaction.hmd['icp'][target]['__mdb_group_keys'] = [x for x in group_info.keys()]
 
@@ -169,7 +259,16 @@ class ModelAnalyzer(BaseModule):
                     else:
                         icps_df[f'__predicted_{target}'] = normal_predictions[target]
 
-                    for group in icps['__mdb_groups']:
+                    for i, group in enumerate(icps['__mdb_groups']):
+                        time_left = self.transaction.time_budget.time_left('ModelAnalyzer')
+                        if self.transaction.time_budget.enforced and time_left is not None and time_left <= 0:
+                            # groups without an ICP get their bounds from the default ICP
+                            self.log.warning(f'Not enough time left to calibrate the ICPs of {len(icps["__mdb_groups"]) - i} groups, their confidence will be estimated by the default ICP')
+                            for uncalibrated_group in icps['__mdb_groups'][i:]:
+                                del icps[frozenset(uncalibrated_group)]
+                            icps['__mdb_groups'] = icps['__mdb_groups'][:i]
+                            break
+
                         icp_df = icps_df
 
                         if is_selfaware:
@@ -226,9 +325,10 @@ class ModelAnalyzer(BaseModule):
 
         empty_input_predictions = {}
         empty_input_accuracy = {}
-        empty_input_predictions_test = {}
 
-        if not self.transaction.lmd['disable_column_importance']:
+        if not self.transaction.lmd['disable_column_importance'] and not self._column_importance_fits_budget(input_columns):
+            self.transaction.log.warning('Not enough time left to compute the column importances within stop_training_in_x_seconds, skipping them')
+        elif not self.transaction.lmd['disable_column_importance']:
             ignorable_input_columns = [x for x in input_columns if self.transaction.lmd['stats_v2'][x]['typing']['data_type'] != DATA_TYPES.FILE_PATH
                             and (not self.transaction.lmd['tss']['is_timeseries'] or
                                  (x not in self.transaction.lmd['tss']['order_by'] and
@@ -236,9 +336,10 @@ class ModelAnalyzer(BaseModule):
                                    x not in self.transaction.lmd['tss']['group_by']) and
                                   x not in self.transaction.lmd['tss']['historical_columns']))]
 
+            with self.transaction.timer('ModelAnalyzer.column_importance'):
+                empty_input_predictions = self.transaction.model_backend.predict_ablations('validate', ignorable_input_columns)
+
             for col in ignorable_input_columns:
-                empty_input_predictions[col] = self.transaction.model_backend.predict('validate', ignore_columns=[col])
-                empty_input_predictions_test[col] = self.transaction.model_backend.predict('test', ignore_columns=[col])
                 empty_input_accuracy[col] = evaluate_accuracy(
                     empty_input_predictions[col],
                     validation_df,
@@ -1,5 +1,7 @@
 import dateutil
 import copy
+import queue
+import shutil
 import datetime
 import traceback
 from pathlib import Path
@@ -7,6 +9,8 @@ import multiprocessing as mp
 from functools import partial
 import time
 
+import psutil
+import torch
 import numpy as np
 import pandas as pd
 import lightwood
@@ -17,7 +21,23 @@ from lightwood.api.predictor import Predictor
 from mindsdb_native.libs.constants.mindsdb import *
 from mindsdb_native.config import *
 from mindsdb_native.libs.helpers.general_helpers import evaluate_accuracy
-from mindsdb_native.libs.helpers.mp_helpers import get_nr_procs
+from mindsdb_native.libs.helpers.mp_helpers import get_nr_procs, get_proc_memory_usage, get_mp_context
+from mindsdb_native.libs.helpers.model_cache import MODEL_CACHE
+from mindsdb_native.libs.helpers.date_helpers import ParseMemo
+from mindsdb_native.libs.data_types.mindsdb_logger import log
+from mindsdb_native.libs.data_types.transaction_data import TransactionData
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+
+# Limits of the training `adjust` does when it finetunes a predictor, see `LightwoodBackend._finetune_predictor`
+FINETUNE_MAX_EPOCHS = 100
+FINETUNE_PATIENCE = 5
+# The first rungs of the successive halving mixer search never train on fewer rows than this
+SUCCESSIVE_HALVING_MIN_ROWS = 200
 
 
 def _make_pred(row):
@@ -103,6 +123,139 @@ def _ts_infer_next_row(df, ob, last_index):
     return df.append(last_row)
 
 
+def _limit_threads(nr_threads):
+    """
+    Limits the threads used by torch, and by the BLAS/OpenMP libraries already loaded, in this process
+    """
+    torch.set_num_threads(nr_threads)
+    if threadpool_limits is not None:
+        threadpool_limits(limits=nr_threads)
+
+
+# Heavy metadata that worker processes don't need, or that can't be pickled to them
+WORKER_HMD_EXCLUDED = ['from_data', 'when_data', 'breakpoint', 'icp', 'sample_function', 'predictions', 'model_backend']
+
+
+def _get_worker_transaction(transaction):
+    """
+    :return: a shallow copy of `transaction` with only what `LightwoodBackend` needs, to be pickled to worker processes
+    """
+    worker_transaction = copy.copy(transaction)
+    worker_transaction.session = None
+    worker_transaction.log = None
+    worker_transaction.metadata_writer = None
+    worker_transaction.model_backend = None
+    worker_transaction.prediction_memo = {}
+    worker_transaction.parse_memo = ParseMemo()
+    worker_transaction.timings = []
+    # Workers only predict the validation data of the input
+    worker_transaction.input_data = TransactionData()
+    worker_transaction.input_data.validation_df = transaction.input_data.validation_df
+    worker_transaction.output_data = None
+    worker_transaction.lmd = dict(transaction.lmd)
+    worker_transaction.hmd = {k: v for k, v in transaction.hmd.items() if k not in WORKER_HMD_EXCLUDED}
+    return worker_transaction
+
+
+def _values_equal(a, b):
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+
+def _merge_changes(target, original, changed):
+    """
+    Applies to the dict `target` the changes made to `original` in `changed`, going into nested dicts,
+    so the changes different workers made to different keys of the same dict are all kept
+    """
+    for k, value in changed.items():
+        original_value = original.get(k, None)
+        if isinstance(value, dict) and isinstance(target.get(k, None), dict) and (k not in original or isinstance(original_value, dict)):
+            _merge_changes(target[k], original_value if k in original else {}, value)
+        elif k not in original or not _values_equal(original_value, value):
+            target[k] = value
+
+    for k in original:
+        if k not in changed:
+            target.pop(k, None)
+
+
+def _process_worker(transaction, backend_state, method, key, kwargs, nr_threads, return_metadata, result_queue):
+    try:
+        _limit_threads(nr_threads)
+        transaction.log = log
+        backend = LightwoodBackend(transaction)
+        backend.__dict__.update(backend_state)
+        result = getattr(backend, method)(**kwargs)
+        metadata = (transaction.lmd, transaction.hmd) if return_metadata else None
+        result_queue.put((key, result, metadata, None))
+    except Exception:
+        result_queue.put((key, None, None, traceback.format_exc()))
+
+
+def _run_in_processes(backend, method, kwargs_by_key, nr_procs, can_start=None, backend_state=None, return_metadata=False):
+    """
+    Calls `backend.<method>(**kwargs)` for every key and kwargs of `kwargs_by_key` in worker processes, at most
+    `nr_procs` at a time, starting them in order and splitting the CPU threads between them. Every worker gets a copy
+    of the transaction (see `_get_worker_transaction`), of `kwargs` and of `backend_state` (attributes set on its
+    `LightwoodBackend`), pickled to it. Keys whose arguments can't be pickled are run in this process instead.
+
+    :param can_start: optional callable that gets the next key and returns False to delay starting it until another process ends
+    :param return_metadata: whether workers send back their lmd and hmd, as they were after running `method`
+    :return: a dict of key -> (result, (lmd, hmd) or None, None) or (None, None, traceback of the error)
+    """
+    ctx = get_mp_context()
+    transaction = _get_worker_transaction(backend.transaction)
+    backend_state = dict({'nn_mixer_only': backend.nn_mixer_only}, **(backend_state or {}))
+    nr_threads = max(1, mp.cpu_count() // nr_procs)
+
+    result_queue = ctx.Queue()
+    to_start = list(kwargs_by_key)
+    running = {}
+    results = {}
+    try:
+        while to_start or running:
+            while to_start and len(running) < nr_procs and (len(running) == 0 or can_start is None or can_start(to_start[0])):
+                key = to_start.pop(0)
+                # Not a daemon, `method` might start processes of its own
+                process = ctx.Process(target=_process_worker, args=(
+                    transaction, backend_state, method, key, kwargs_by_key[key], nr_threads, return_metadata, result_queue
+                ))
+                try:
+                    process.start()
+                except Exception:
+                    backend.transaction.log.warning(f'Could not start a worker process, running it in this one:\n{traceback.format_exc()}')
+                    try:
+                        results[key] = (getattr(backend, method)(**kwargs_by_key[key]), None, None)
+                    except Exception:
+                        results[key] = (None, None, traceback.format_exc())
+                    continue
+                running[key] = process
+
+            if not running:
+                continue
+
+            try:
+                key, result, metadata, error = result_queue.get(timeout=1)
+            except queue.Empty:
+                # Workers that exit cleanly always put a result, the others crashed
+                for key, process in list(running.items()):
+                    if not process.is_alive() and process.exitcode != 0:
+                        del running[key]
+                        results[key] = (None, None, f'Worker process exited with code {process.exitcode}')
+                continue
+
+            running.pop(key).join()
+            results[key] = (result, metadata, error)
+    finally:
+        for process in running.values():
+            process.terminate()
+            process.join()
+
+    return results
+
+
 class LightwoodBackend:
     def __init__(self, transaction):
         self.transaction = transaction
@@ -378,13 +531,18 @@ class LightwoodBackend:
                 value_pct = round(value * 100, 2)
                 self.transaction.log.debug(f'We\'ve reached training epoch nr {epoch} with an accuracy of {value_pct}% on the testing dataset')
 
-    def train(self):
+    def _prepare_train_data(self):
+        """
+        :return: the train and test data as dicts of `split_models_on` group -> data frame, and the secondary
+        types of the timeseries columns
+        """
         if self.transaction.lmd['use_gpu'] is not None:
             lightwood.config.config.CONFIG.USE_CUDA = self.transaction.lmd['use_gpu']
 
         if self.transaction.lmd['quick_learn']:
-            self.transaction.input_data.train_df = pd.concat([copy.deepcopy(self.transaction.input_data.train_df),copy.deepcopy(self.transaction.input_data.test_df)]).reset_index()
-            self.transaction.input_data.test_df = copy.deepcopy(self.transaction.input_data.validation_df).reset_index()
+            # `concat` and `reset_index` return new frames, the splits aren't modified
+            self.transaction.input_data.train_df = pd.concat([self.transaction.input_data.train_df,self.transaction.input_data.test_df]).reset_index()
+            self.transaction.input_data.test_df = self.transaction.input_data.validation_df.reset_index()
 
         secondary_type_dict = {}
         if self.transaction.lmd['tss']['is_timeseries']:
@@ -408,194 +566,557 @@ class LightwoodBackend:
         self.transaction.input_data.cached_train_df = train_df
         self.transaction.input_data.cached_test_df = test_df
 
-        for gb_val in train_df_gb_map:
-            train_df = train_df_gb_map[gb_val]
-            test_df = test_df_gb_map[gb_val]
+        return train_df_gb_map, test_df_gb_map, secondary_type_dict
 
-            lightwood_config = self._create_lightwood_config(secondary_type_dict)
+    def train(self):
+        self._train_prepared(*self._prepare_train_data())
 
-            lightwood_train_ds = lightwood.api.data_source.DataSource(
-                train_df,
-                config=lightwood_config
-            )
-            lightwood_test_ds = lightwood_train_ds.make_child(test_df)
+    def _train_prepared(self, train_df_gb_map, test_df_gb_map, secondary_type_dict):
+        # Learn plans the training time along with the other phases, see `TimeBudget`
+        training_time = self.transaction.time_budget.time_left('ModelInterface')
+        if training_time is None:
+            training_time = self._get_unplanned_training_time()
+        training_time = max(0, training_time)
 
-            Path(CONFIG.MINDSDB_STORAGE_PATH).joinpath(self.transaction.lmd['name']).mkdir(mode=0o777, exist_ok=True, parents=True)
+        Path(CONFIG.MINDSDB_STORAGE_PATH).joinpath(self.transaction.lmd['name']).mkdir(mode=0o777, exist_ok=True, parents=True)
 
-            logging.getLogger().setLevel(logging.DEBUG)
+        logging.getLogger().setLevel(logging.DEBUG)
 
-            reasonable_training_time = train_df.shape[0] * train_df.shape[1] / 20
+        if len(train_df_gb_map) > 1:
+            self._train_groups(train_df_gb_map, test_df_gb_map, secondary_type_dict, training_time)
+        else:
+            for gb_val in train_df_gb_map:
+                self._train_group(gb_val, train_df_gb_map[gb_val], test_df_gb_map[gb_val], secondary_type_dict, training_time)
+
+    def _get_unplanned_training_time(self):
+        """
+        :return: seconds to train for, in transactions whose phases aren't planned by a `TimeBudget` (i.e. adjust)
+        """
+        stop_training_after = self.transaction.lmd['stop_training_in_x_seconds']
+        if stop_training_after is None:
+            # Stop training after 12 hours unless the user doesn't want us to
+            stop_training_after = 3600 * 12
+
+        took_thus_far = int(time.time() - self.transaction.lmd['learn_started_at'])
+        remaining_time = int(max(0, stop_training_after - took_thus_far))
+        if took_thus_far*2 > stop_training_after:
+            new_remaining_time = stop_training_after
+            self.transaction.log.warning(f'You asked your predictor to stop training too quickly, the data preparation phase alone took {took_thus_far}. We\'d be left with only {remaining_time} to train the underlying machine learning models and analyze them. Will instead try to spend {new_remaining_time} seconds doing so')
+            remaining_time = new_remaining_time
+
+        # We don't know how long the model analysis will last, so let's allocate 1/4th of the remaining time for training to it
+        data_analysis_takes = 1/4
+
+        training_time = remaining_time*(1-data_analysis_takes)
+        return training_time
+
+    def _train_group(self, gb_val, train_df, test_df, secondary_type_dict, training_time, parallel_mixers=True):
+        """
+        Trains the candidate mixers on the data of a group (the whole data unless `split_models_on` is used),
+        and saves the best predictor to `lightwood_data<gb_val>`
+
+        :param training_time: seconds the mixers can spend training
+        :param parallel_mixers: whether the mixers can be trained in separate processes
+        """
+        lightwood_config = self._create_lightwood_config(secondary_type_dict)
+
+        lightwood_train_ds = lightwood.api.data_source.DataSource(
+            train_df,
+            config=lightwood_config
+        )
+        lightwood_test_ds = lightwood_train_ds.make_child(test_df)
+
+        reasonable_training_time = train_df.shape[0] * train_df.shape[1] / 20
+
+        predictors_and_accuracies = []
+
+        if self.transaction.lmd.get('use_mixers', None) is not None:
+            mixer_classes = self.transaction.lmd['use_mixers']
+        elif self.nn_mixer_only:
+            mixer_classes = [lightwood.mixers.NnMixer]
+        else:
+            mixer_classes = [lightwood.mixers.LightGBMMixer, lightwood.mixers.NnMixer]
+
+        final_mixer_classes = []
+        for mixer_class in mixer_classes:
+            if isinstance(mixer_class, str):
+                for mx_cls in lightwood.mixers.BaseMixer.__subclasses__():
+                    if mx_cls.__name__ == mixer_class:
+                        mixer_class = mx_cls
+                        break
+                else:
+                    raise ValueError(f'Mixer "{mixer_class}" doesn\'t exist')
+            if mixer_class is not None:
+                final_mixer_classes.append(mixer_class)
 
-            predictors_and_accuracies = []
+        if len(final_mixer_classes) == 0:
+            raise Exception(f'No valid mixers')
 
-            if self.transaction.lmd.get('use_mixers', None) is not None:
-                mixer_classes = self.transaction.lmd['use_mixers']
-            elif self.nn_mixer_only:
-                mixer_classes = [lightwood.mixers.NnMixer]
-            else:
-                mixer_classes = [lightwood.mixers.LightGBMMixer, lightwood.mixers.NnMixer]
-
-            final_mixer_classes = []
-            for mixer_class in mixer_classes:
-                if isinstance(mixer_class, str):
-                    for mx_cls in lightwood.mixers.BaseMixer.__subclasses__():
-                        if mx_cls.__name__ == mixer_class:
-                            mixer_class = mx_cls
-                            break
+        if self.transaction.lmd.get('successive_halving', False) and len(final_mixer_classes) > 1:
+            predictors_and_accuracies = self._successive_halving(
+                gb_val, final_mixer_classes, training_time, lightwood_config,
+                train_df, lightwood_train_ds, lightwood_test_ds
+            )
+            self.predictor = predictors_and_accuracies[0][1]
+            save_path = os.path.join(CONFIG.MINDSDB_STORAGE_PATH, self.transaction.lmd['name'], 'lightwood_data' + gb_val)
+            self.predictor.save(path_to=save_path)
+            return
+
+        nr_procs = 1
+        if parallel_mixers:
+            nr_procs = min(len(final_mixer_classes), get_nr_procs(
+                self.transaction.lmd.get('max_processes', None),
+                self.transaction.lmd.get('max_per_proc_usage', None),
+                train_df
+            ))
+        train_in_parallel = nr_procs > 1 and not lightwood.config.config.CONFIG.USE_CUDA
+
+        mixer_kwargs = []
+        for mixer_class in final_mixer_classes:
+            mixer_kwargs.append(dict(
+                lightwood_config=lightwood_config,
+                mixer_class=mixer_class,
+                nr_mixers=len(final_mixer_classes),
+                # Mixers trained at the same time can each use the whole time budget
+                stop_training_after_seconds=training_time if train_in_parallel else training_time/len(final_mixer_classes),
+                train_df=train_df,
+                lightwood_train_ds=lightwood_train_ds,
+                lightwood_test_ds=lightwood_test_ds
+            ))
+
+        if train_in_parallel:
+            predictors_and_accuracies = self._train_mixers_in_parallel(mixer_kwargs, nr_procs, gb_val)
+        else:
+            for kwargs in mixer_kwargs:
+                try:
+                    predictors_and_accuracies.append((kwargs['mixer_class'], *self._train_mixer(**kwargs)))
+                except Exception:
+                    if self.transaction.lmd['debug']:
+                        raise
                     else:
-                        raise ValueError(f'Mixer "{mixer_class}" doesn\'t exist')
-                if mixer_class is not None:
-                    final_mixer_classes.append(mixer_class)
+                        self.transaction.log.error(traceback.format_exc())
+                        self.transaction.log.error('Exception while running {}'.format(kwargs['mixer_class'].__name__))
 
-            if len(final_mixer_classes) == 0:
-                raise Exception(f'No valid mixers')
+        if len(predictors_and_accuracies) == 0:
+            raise Exception('All models had an error while training')
 
-            # @TODO Might be better to turn this into a function
-            stop_training_after = self.transaction.lmd['stop_training_in_x_seconds']
-            if stop_training_after is None:
-                # Stop training after 12 hours unless the user doesn't want us to
-                stop_training_after = 3600 * 12
+        _, best_predictor, best_accuracy = max(predictors_and_accuracies, key=lambda x: x[2])
 
-            took_thus_far = int(time.time() - self.transaction.lmd['learn_started_at'])
-            remaining_time = int(max(0, stop_training_after - took_thus_far))
-            if took_thus_far*2 > stop_training_after:
-                new_remaining_time = stop_training_after
-                self.transaction.log.warning(f'You asked your predictor to stop training too quickly, the data preparation phase alone took {took_thus_far}. We\'d be left with only {remaining_time} to train the underlying machine learning models and analyze them. Will instead try to spend {new_remaining_time} seconds doing so')
-                remaining_time = new_remaining_time
+        # Find predictor with NnMixer
+        for mixer_class, predictor, accuracy in predictors_and_accuracies:
+            if lightwood.mixers.NnMixer is not None and mixer_class == lightwood.mixers.NnMixer:
+                nn_mixer_predictor, nn_mixer_predictor_accuracy = predictor, accuracy
+                break
+        else:
+            nn_mixer_predictor, nn_mixer_predictor_accuracy = None, None
 
-            # We don't know how long the model analysis will last, so let's allocate 1/4th of the remaining time for training to it
-            data_analysis_takes = 1/4
+        self.predictor = best_predictor
 
-            training_time_per_mixer = (remaining_time*(1-data_analysis_takes))/len(mixer_classes)
-            # @TODO Might be better to turn this into a function
+        # If difference between accuracies of best predictor and NnMixer predictor
+        # is small, then use NnMixer predictor
+        if nn_mixer_predictor is not None:
+            SMALL_ACCURACY_DIFFERENCE = 0.01
+            if (best_accuracy - nn_mixer_predictor_accuracy) < SMALL_ACCURACY_DIFFERENCE:
+                self.predictor = nn_mixer_predictor
 
-            for mixer_class in final_mixer_classes:
-                lightwood_config['mixer']['kwargs'] = {}
-                lightwood_config['mixer']['class'] = mixer_class
+        # Predictors trained in parallel are loaded from disk, and only the one we keep
+        if isinstance(self.predictor, str):
+            self.predictor = Predictor(load_from_path=self.predictor)
+        for _, predictor, _ in predictors_and_accuracies:
+            if isinstance(predictor, str):
+                shutil.rmtree(predictor, ignore_errors=True)
 
-                if lightwood_config['mixer']['class'] == lightwood.mixers.NnMixer:
-                    # Evaluate less often for larger datasets and vice-versa
-                    eval_every_x_epochs = int(round(1 * pow(10, 6) * (1 / len(train_df))))
-                    # Within some limits
-                    if eval_every_x_epochs > 200:
-                        eval_every_x_epochs = 200
-                    if eval_every_x_epochs < 3:
-                        eval_every_x_epochs = 3
+        save_path = os.path.join(CONFIG.MINDSDB_STORAGE_PATH, self.transaction.lmd['name'], 'lightwood_data' + gb_val)
+        self.predictor.save(path_to=save_path)
 
-                    lightwood_config['mixer']['kwargs']['callback_on_iter'] = self.callback_on_iter
-                    lightwood_config['mixer']['kwargs']['eval_every_x_epochs'] = eval_every_x_epochs / len(final_mixer_classes)
+    def _train_mixer(self, lightwood_config, mixer_class, nr_mixers, stop_training_after_seconds,
+                     train_df, lightwood_train_ds, lightwood_test_ds):
+        """
+        Trains a lightwood predictor with `mixer_class` and evaluates it on the validation data
 
-                lightwood_config['mixer']['kwargs']['stop_training_after_seconds'] = training_time_per_mixer
+        :return: the predictor and its validation accuracy
+        """
+        mixer_config = dict(lightwood_config['mixer'])
+        mixer_config['class'] = mixer_class
+        mixer_config['kwargs'] = {}
 
-                self.predictor = lightwood.Predictor(lightwood_config.copy())
+        if mixer_class == lightwood.mixers.NnMixer:
+            # Evaluate less often for larger datasets and vice-versa
+            eval_every_x_epochs = int(round(1 * pow(10, 6) * (1 / len(train_df))))
+            # Within some limits
+            if eval_every_x_epochs > 200:
+                eval_every_x_epochs = 200
+            if eval_every_x_epochs < 3:
+                eval_every_x_epochs = 3
 
-                try:
-                    self.predictor.learn(
-                        from_data=lightwood_train_ds,
-                        test_data=lightwood_test_ds
-                    )
-                except Exception:
-                    if self.transaction.lmd['debug']:
-                        raise
-                    else:
-                        self.transaction.log.error(traceback.format_exc())
-                        self.transaction.log.error('Exception while running {}'.format(mixer_class.__name__))
-                        continue
+            mixer_config['kwargs']['callback_on_iter'] = self.callback_on_iter
+            mixer_config['kwargs']['eval_every_x_epochs'] = eval_every_x_epochs / nr_mixers
 
-                self.transaction.log.info('[{}] Training accuracy of: {}'.format(
-                    mixer_class.__name__,
-                    self.predictor.train_accuracy
-                ))
+        mixer_config['kwargs']['stop_training_after_seconds'] = stop_training_after_seconds
 
-                validation_predictions = self.predict('validate')
+        config = lightwood_config.copy()
+        config['mixer'] = mixer_config
+        self.predictor = lightwood.Predictor(config)
 
-                validation_df = self.transaction.input_data.validation_df
+        self.predictor.learn(
+            from_data=lightwood_train_ds,
+            test_data=lightwood_test_ds
+        )
 
-                if self.transaction.lmd['tss']['is_timeseries']:
-                    validation_df = self.transaction.input_data.validation_df[self.transaction.input_data.validation_df['make_predictions'] == True]
-                    ts_window = self.transaction.lmd['tss'].get('window', 0)
-                else:
-                    ts_window = None
-
-                validation_accuracy = evaluate_accuracy(
-                    validation_predictions,
-                    validation_df,
-                    self.transaction.lmd['stats_v2'],
-                    self.transaction.lmd['predict_columns'],
-                    backend=self,
-                    ts_window=ts_window
-                )
+        self.transaction.log.info('[{}] Training accuracy of: {}'.format(
+            mixer_class.__name__,
+            self.predictor.train_accuracy
+        ))
 
-                predictors_and_accuracies.append((
-                    self.predictor,
-                    validation_accuracy
-                ))
+        validation_predictions = self.predict('validate')
 
-            if len(predictors_and_accuracies) == 0:
-                raise Exception('All models had an error while training')
+        validation_df = self.transaction.input_data.validation_df
 
-            best_predictor, best_accuracy = max(predictors_and_accuracies, key=lambda x: x[1])
+        if self.transaction.lmd['tss']['is_timeseries']:
+            validation_df = self.transaction.input_data.validation_df[self.transaction.input_data.validation_df['make_predictions'] == True]
+            ts_window = self.transaction.lmd['tss'].get('window', 0)
+        else:
+            ts_window = None
+
+        validation_accuracy = evaluate_accuracy(
+            validation_predictions,
+            validation_df,
+            self.transaction.lmd['stats_v2'],
+            self.transaction.lmd['predict_columns'],
+            backend=self,
+            ts_window=ts_window
+        )
+
+        return self.predictor, validation_accuracy
+
+    def _successive_halving(self, gb_val, mixer_classes, training_time, lightwood_config,
+                            train_df, lightwood_train_ds, lightwood_test_ds):
+        """
+        Searches for the best mixer by successive halving: every candidate is trained on a sample of the training
+        data, and the better half (by validation accuracy) goes on to the next rung, trained on twice the data,
+        until the mixer left is trained on all of it. Rungs get equal shares of `training_time`.
+
+        :return: a list with the (mixer class, predictor, validation accuracy) of the best mixer
+        """
+        nr_rungs = int(np.ceil(np.log2(len(mixer_classes)))) + 1
+        # Rungs train on growing heads of the same shuffled data
+        shuffled_df = train_df.sample(frac=1, random_state=0)
+
+        rungs = []
+        self.transaction.lmd.setdefault('successive_halving_rungs', {})[gb_val] = rungs
+
+        candidates = list(mixer_classes)
+        for rung in range(nr_rungs):
+            last_rung = rung == nr_rungs - 1 or len(candidates) == 1
+            nr_rows = int(len(train_df) * pow(2, rung - (nr_rungs - 1)))
+            if last_rung or max(nr_rows, SUCCESSIVE_HALVING_MIN_ROWS) >= len(train_df):
+                rung_df, rung_ds = train_df, lightwood_train_ds
+            else:
+                rung_df = shuffled_df.iloc[:max(nr_rows, SUCCESSIVE_HALVING_MIN_ROWS)]
+                rung_ds = lightwood_train_ds.make_child(rung_df)
+
+            self.transaction.log.info(f'Successive halving rung {rung}: training {len(candidates)} models on {len(rung_df)} rows')
+            results = []
+            for mixer_class in candidates:
+                try:
+                    predictor, accuracy = self._train_mixer(
+                        lightwood_config=lightwood_config,
+                        mixer_class=mixer_class,
+                        nr_mixers=len(candidates),
+                        stop_training_after_seconds=training_time / nr_rungs / len(candidates),
+                        train_df=rung_df,
+                        lightwood_train_ds=rung_ds,
+                        lightwood_test_ds=lightwood_test_ds
+                    )
+                    results.append((mixer_class, predictor, accuracy))
+                except Exception:
+                    self._handle_mixer_error(mixer_class, traceback.format_exc())
+
+            if len(results) == 0:
+                raise Exception('All models had an error while training')
 
-            # Find predictor with NnMixer
-            for predictor, accuracy in predictors_and_accuracies:
-                if lightwood.mixers.NnMixer is not None and isinstance(predictor._mixer, lightwood.mixers.NnMixer):
-                    nn_mixer_predictor, nn_mixer_predictor_accuracy = predictor, accuracy
-                    break
+            results.sort(key=lambda x: x[2], reverse=True)
+            rungs.append({
+                'nr_rows': len(rung_df),
+                'accuracies': {mixer_class.__name__: accuracy for mixer_class, _, accuracy in results}
+            })
+
+            if last_rung:
+                for _, predictor, _ in results[1:]:
+                    self._forget_predictions(predictor)
+                return results[:1]
+
+            # Survivors are trained again on more data in the next rung
+            for _, predictor, _ in results:
+                self._forget_predictions(predictor)
+            candidates = [mixer_class for mixer_class, _, _ in results[:int(np.ceil(len(results) / 2))]]
+
+    def _forget_predictions(self, predictor):
+        """
+        Drops the memoized predictions of `predictor`, which keep it alive
+        """
+        memo = self.transaction.prediction_memo
+        for key in [k for k, v in memo.items() if v['objects'][0] is predictor]:
+            del memo[key]
+
+    def _train_and_save_mixer(self, save_path, **kwargs):
+        """
+        Runs `_train_mixer` with `kwargs` and saves the predictor to `save_path`
+
+        :return: the validation accuracy of the predictor
+        """
+        predictor, validation_accuracy = self._train_mixer(**kwargs)
+        predictor.save(path_to=save_path)
+        return validation_accuracy
+
+    def _train_mixers_in_parallel(self, mixer_kwargs, nr_procs, gb_val):
+        """
+        Runs `_train_mixer` for every element of `mixer_kwargs` in worker processes, at most `nr_procs` at a time.
+        Workers save their predictor to disk.
+
+        :return: a list of (mixer class, path of the saved predictor, validation accuracy) for the mixers that trained
+        """
+        save_path = os.path.join(
+            CONFIG.MINDSDB_STORAGE_PATH,
+            self.transaction.lmd['name'],
+            'lightwood_data' + gb_val + '_candidate_{}'
+        )
+        kwargs_by_key = {index: dict(kwargs, save_path=save_path.format(index)) for index, kwargs in enumerate(mixer_kwargs)}
+
+        self.transaction.log.info(f'Training {len(mixer_kwargs)} models using {nr_procs} processes')
+        results = _run_in_processes(self, '_train_and_save_mixer', kwargs_by_key, nr_procs)
+
+        predictors_and_accuracies = []
+        for index, (validation_accuracy, _, error) in sorted(results.items()):
+            mixer_class = mixer_kwargs[index]['mixer_class']
+            if error is not None:
+                self._handle_mixer_error(mixer_class, error)
             else:
-                nn_mixer_predictor, nn_mixer_predictor_accuracy = None, None
+                predictors_and_accuracies.append((mixer_class, save_path.format(index), validation_accuracy))
 
-            self.predictor = best_predictor
+        return predictors_and_accuracies
 
-            # If difference between accuracies of best predictor and NnMixer predictor
-            # is small, then use NnMixer predictor
-            if nn_mixer_predictor is not None:
-                SMALL_ACCURACY_DIFFERENCE = 0.01
-                if (best_accuracy - nn_mixer_predictor_accuracy) < SMALL_ACCURACY_DIFFERENCE:
-                    self.predictor = nn_mixer_predictor
+    def _train_groups(self, train_df_gb_map, test_df_gb_map, secondary_type_dict, training_time):
+        """
+        Trains the model of every `split_models_on` group, running several groups at once when there are
+        enough cores and memory. Each group gets a share of the training time proportional to its size.
+        """
+        max_per_proc_usage = self.transaction.lmd.get('max_per_proc_usage', None)
 
-            save_path = os.path.join(CONFIG.MINDSDB_STORAGE_PATH, self.transaction.lmd['name'], 'lightwood_data' + gb_val)
-            self.predictor.save(path_to=save_path)
+        # Largest groups first, so a long training doesn't start last and delay the whole learn
+        gb_vals = sorted(train_df_gb_map, key=lambda x: len(train_df_gb_map[x]), reverse=True)
 
-    def predict(self, mode='predict', ignore_columns=None, all_mixers=False):
-        if ignore_columns is None:
-            ignore_columns = []
+        if lightwood.config.config.CONFIG.USE_CUDA:
+            nr_procs = 1
+        else:
+            nr_procs = min(len(gb_vals), get_nr_procs(
+                self.transaction.lmd.get('max_processes', None),
+                max_per_proc_usage,
+                train_df_gb_map[gb_vals[0]]
+            ))
+
+        total_rows = max(1, sum(len(df) for df in train_df_gb_map.values()))
+        group_kwargs = {}
+        for gb_val in gb_vals:
+            group_kwargs[gb_val] = dict(
+                gb_val=gb_val,
+                train_df=train_df_gb_map[gb_val],
+                test_df=test_df_gb_map[gb_val],
+                secondary_type_dict=secondary_type_dict,
+                # The groups share `nr_procs` processes for `training_time` seconds
+                training_time=min(training_time, training_time * nr_procs * len(train_df_gb_map[gb_val]) / total_rows),
+                parallel_mixers=nr_procs == 1
+            )
 
-        if self.transaction.lmd['use_gpu'] is not None:
-            lightwood.config.config.CONFIG.USE_CUDA = self.transaction.lmd['use_gpu']
+        if nr_procs == 1:
+            for gb_val in gb_vals:
+                self._train_group(**group_kwargs[gb_val])
+            return
+
+        def can_start(gb_val):
+            # Processes are only added while there's memory left for them
+            needed = get_proc_memory_usage(max_per_proc_usage, train_df_gb_map[gb_val])
+            return psutil.virtual_memory().available > needed
+
+        # The metadata as the workers get it, to tell apart the changes each of them made
+        original_lmd = copy.deepcopy(dict(self.transaction.lmd))
+        original_hmd = copy.deepcopy({k: v for k, v in self.transaction.hmd.items() if k not in WORKER_HMD_EXCLUDED})
+
+        self.transaction.log.info(f'Training the models of {len(gb_vals)} groups using {nr_procs} processes')
+        results = _run_in_processes(self, '_train_group', group_kwargs, nr_procs, can_start, return_metadata=True)
+
+        for gb_val in gb_vals:
+            _, metadata, error = results[gb_val]
+            if error is not None:
+                raise Exception(f'Error while training the model for group "{gb_val}":\n{error}')
+            if metadata is not None:
+                lmd, hmd = metadata
+                _merge_changes(self.transaction.lmd, original_lmd, lmd)
+                _merge_changes(self.transaction.hmd, original_hmd, hmd)
+
+        # Every group's predictor is on disk, `predict` loads them
+        self.predictor = None
+
+    def _handle_mixer_error(self, mixer_class, error):
+        if self.transaction.lmd['debug']:
+            raise Exception(f'Exception while running {mixer_class.__name__}:\n{error}')
+        self.transaction.log.error(error)
+        self.transaction.log.error('Exception while running {}'.format(mixer_class.__name__))
 
+    def _get_mode_df(self, mode):
         if mode == 'predict':
-            df = self.transaction.input_data.data_frame
+            return self.transaction.input_data.data_frame
         elif mode == 'validate':
-            df = self.transaction.input_data.validation_df
+            return self.transaction.input_data.validation_df
         elif mode == 'test':
-            df = self.transaction.input_data.test_df
+            return self.transaction.input_data.test_df
         elif mode == 'predict_on_train_data':
-            df = self.transaction.input_data.train_df
+            return self.transaction.input_data.train_df
         else:
             raise Exception(f'Unknown mode specified: "{mode}"')
 
+    def _get_predict_data(self, mode):
+        """
+        :return: the data to predict on for `mode`, as a dict of `split_models_on` group -> data frame,
+        and the mapping from the rows of the concatenated groups to the original rows (timeseries only)
+        """
+        df = self._get_mode_df(mode)
+
         df_gb_map = None
+        timeseries_row_mapping = None
         if self.transaction.lmd['tss']['is_timeseries']:
-            df, _, timeseries_row_mapping, df_gb_map = self._ts_reshape(df, mode='predict')
+            with self.transaction.timer('LightwoodBackend.reshape'):
+                df, _, timeseries_row_mapping, df_gb_map = self._ts_reshape(df, mode='predict')
 
         if df_gb_map is None:
             df_gb_map = {'': df}
 
+        return df_gb_map, timeseries_row_mapping
+
+    def _load_predictor(self, gb_val):
+        if self.predictor is None:
+            with self.transaction.timer('LightwoodBackend.load_predictor'):
+                self.predictor = MODEL_CACHE.get_predictor(self.transaction.lmd['name'], gb_val)
+
+    def _format_group_predictions(self, predictions):
+        """
+        :param predictions: the output of the lightwood predictor for a group
+        :return: a list of dicts of formatted predictions, to be merged by `_merge_predictions`
+        """
+        format_started_at = time.time()
         formated_predictions_arr = []
-        for gb_val in df_gb_map:
-            formated_predictions = {}
-            df = df_gb_map[gb_val]
+        formated_predictions = {}
+
+        if self.transaction.lmd['quick_predict']:
+            for k in predictions:
+                formated_predictions[k] = predictions[k]['predictions']
+                if self.transaction.lmd['output_class_distribution'] and predictions[k].get('class_distribution', False):
+                    formated_predictions[f'{k}_class_distribution'] = predictions[k]['class_distribution']
+                    self.transaction.lmd['stats_v2'][k]['lightwood_class_map'] = predictions[k]['class_labels']
+                formated_predictions_arr.append(formated_predictions)
+            self.transaction.add_timing('LightwoodBackend.format', format_started_at)
+            return formated_predictions_arr
+
+        for k in predictions:
+            if '_timestep_' in k:
+                continue
 
-            if self.predictor is None:
-                predictor_path = os.path.join(CONFIG.MINDSDB_STORAGE_PATH, self.transaction.lmd['name'], 'lightwood_data' + gb_val)
+            formated_predictions[k] = predictions[k]['predictions']
+            if self.transaction.lmd['output_class_distribution']:
                 try:
-                    self.predictor = lightwood.Predictor(load_from_path=predictor_path)
-                except Exception as e:
-                    try:
-                        ensemble_path = os.path.join(CONFIG.MINDSDB_STORAGE_PATH, self.transaction.lmd['name'])
-                        self.predictor = LightwoodEnsemble(load_from_path=ensemble_path)
-                    except Exception as e:
-                        raise(e)
+                    formated_predictions[f'{k}_class_distribution'] = predictions[k]['class_distribution']
+                    self.transaction.lmd['stats_v2'][k]['lightwood_class_map'] = predictions[k]['class_labels']
+                except KeyError:
+                    pass
+
+            if self.nr_predictions > 1:
+                formated_predictions[k] = [[x] for x in formated_predictions[k]]
+                for timestep_index in range(1,self.nr_predictions):
+                    for i in range(len(formated_predictions[k])):
+                        formated_predictions[k][i].append(predictions[f'{k}_timestep_{timestep_index}']['predictions'][i])
+
+            model_confidence_dict = {}
+            for confidence_name in ['selfaware_confidences', 'loss_confidences']:
+                if confidence_name in predictions[k]:
+                    if k not in model_confidence_dict:
+                        model_confidence_dict[k] = []
+
+                    for i in range(len(predictions[k][confidence_name])):
+                        if len(model_confidence_dict[k]) <= i:
+                            model_confidence_dict[k].append([])
+                        conf = predictions[k][confidence_name][i]
+                        # @TODO We should make sure lightwood never returns confidences above or bellow 0 and 1
+                        if conf < 0:
+                            conf = 0
+                        if conf > 1:
+                            conf = 1
+                        model_confidence_dict[k][i].append(conf)
+
+            if 'selfaware_confidences' in predictions[k]:
+                formated_predictions[f'{k}_selfaware_scores'] = [c[0] for c in model_confidence_dict[k]]
+
+            for k in model_confidence_dict:
+                model_confidence_dict[k] = [np.mean(x) for x in model_confidence_dict[k]]
+
+            for k in model_confidence_dict:
+                formated_predictions[f'{k}_model_confidence'] = model_confidence_dict[k]
+        formated_predictions_arr.append(formated_predictions)
+        self.transaction.add_timing('LightwoodBackend.format', format_started_at)
+        return formated_predictions_arr
+
+    def _merge_predictions(self, formated_predictions_arr, timeseries_row_mapping):
+        format_started_at = time.time()
+        formated_predictions = {}
+        for k in formated_predictions_arr[0]:
+            formated_predictions[k] = []
+            for ele in formated_predictions_arr:
+                formated_predictions[k].extend(ele[k])
+
+        if self.transaction.lmd['tss']['is_timeseries']:
+            for k in list(formated_predictions.keys()):
+                ordered_values = [None] * len(formated_predictions[k])
+                for i, value in enumerate(formated_predictions[k]):
+                    if timeseries_row_mapping[i] is not None:
+                        ordered_values[timeseries_row_mapping[i]] = value
+                formated_predictions[k] = ordered_values
+        self.transaction.add_timing('LightwoodBackend.format', format_started_at)
+
+        return formated_predictions
+
+    def _get_memo_key(self, mode, ignore_columns):
+        """
+        :return: the key of `transaction.prediction_memo` for this prediction, or None if it can't be memoized
+        """
+        # The data to predict on changes between calls only in the `predict` mode
+        if mode == 'predict' or self.predictor is None:
+            return None
+        include_extra_data = getattr(self.predictor, 'config', {}).get('include_extra_data', False)
+        return (id(self.predictor), id(self._get_mode_df(mode)), mode, tuple(ignore_columns), include_extra_data)
+
+    def predict(self, mode='predict', ignore_columns=None, all_mixers=False):
+        if ignore_columns is None:
+            ignore_columns = []
+
+        if self.transaction.lmd['use_gpu'] is not None:
+            lightwood.config.config.CONFIG.USE_CUDA = self.transaction.lmd['use_gpu']
+
+        # The same model is evaluated on the same data by training and by the model analysis
+        memo_key = self._get_memo_key(mode, ignore_columns)
+        memo = self.transaction.prediction_memo.get(memo_key)
+        if memo is not None:
+            # Restore the side effects of the prediction too
+            for col, class_map in memo['class_maps'].items():
+                self.transaction.lmd['stats_v2'][col]['lightwood_class_map'] = class_map
+            if mode == 'validate':
+                self.transaction.input_data.cached_val_df = memo['run_df']
+            return dict(memo['predictions'])
+
+        df_gb_map, timeseries_row_mapping = self._get_predict_data(mode)
+
+        formated_predictions_arr = []
+        for gb_val in df_gb_map:
+            df = df_gb_map[gb_val]
+            self._load_predictor(gb_val)
 
             # not the most efficient but least prone to bug and should be fast enough
             if len(ignore_columns) > 0:
@@ -605,7 +1126,9 @@ class LightwoodBackend:
             else:
                 run_df = df
 
-            predictions = self.predictor.predict(when_data=run_df)
+            # encoding + mixer
+            with self.transaction.timer('LightwoodBackend.lightwood_predict'):
+                predictions = self.predictor.predict(when_data=run_df)
 
             # cache run_df to avoid duplicate reshaping in analysis phase
             # also used in streaming mode to retrieve newly added rows per group
@@ -614,77 +1137,212 @@ class LightwoodBackend:
             elif mode == 'predict':
                 self.transaction.input_data.cached_pred_df = run_df
 
-            if self.transaction.lmd['quick_predict']:
-                for k in predictions:
-                    formated_predictions[k] = predictions[k]['predictions']
-                    if self.transaction.lmd['output_class_distribution'] and predictions[k].get('class_distribution', False):
-                        formated_predictions[f'{k}_class_distribution'] = predictions[k]['class_distribution']
-                        self.transaction.lmd['stats_v2'][k]['lightwood_class_map'] = predictions[k]['class_labels']
-                    formated_predictions_arr.append(formated_predictions)
-                continue
+            formated_predictions_arr.extend(self._format_group_predictions(predictions))
+
+        formated_predictions = self._merge_predictions(formated_predictions_arr, timeseries_row_mapping)
+
+        if memo_key is not None:
+            self.transaction.prediction_memo[memo_key] = {
+                # Keeps the objects whose ids are in the key alive, so the ids aren't reused
+                'objects': (self.predictor, self._get_mode_df(mode)),
+                'predictions': dict(formated_predictions),
+                'run_df': run_df,
+                'class_maps': {
+                    col: self.transaction.lmd['stats_v2'][col]['lightwood_class_map']
+                    for col in self.transaction.lmd['predict_columns']
+                    if 'lightwood_class_map' in self.transaction.lmd['stats_v2'].get(col, {})
+                }
+            }
 
-            for k in predictions:
-                if '_timestep_' in k:
-                    continue
+        return formated_predictions
 
-                formated_predictions[k] = predictions[k]['predictions']
-                if self.transaction.lmd['output_class_distribution']:
-                    try:
-                        formated_predictions[f'{k}_class_distribution'] = predictions[k]['class_distribution']
-                        self.transaction.lmd['stats_v2'][k]['lightwood_class_map'] = predictions[k]['class_labels']
-                    except KeyError:
-                        pass
+    def _encode_once(self, df):
+        """
+        :return: a lightwood DataSource for `df` with every column already encoded
+        """
+        ds = lightwood.api.data_source.DataSource(df, self.predictor.config, prepare_encoders=False)
+        ds.eval()
+        ds.encoders = self.predictor._mixer.encoders
+        ds.transformer = self.predictor._mixer.transformer
+        # Encodings are reused by every ablation, even if caching is disabled for training
+        ds.enable_cache = True
+        for col_name in ds.input_feature_names + ds.output_feature_names:
+            ds.get_encoded_column_data(col_name)
+        return ds
+
+    def _predict_ablated(self, ds, ignore_column):
+        """
+        Runs the mixer on a copy of the encoded `ds` where `ignore_column` is null, re-encoding only that column
+        and the ones that depend on it
+        """
+        ablated_ds = copy.copy(ds)
+        ablated_ds.data_frame = ds.data_frame.assign(**{ignore_column: [None] * len(ds.data_frame)})
+        ablated_ds.encoded_cache = dict(ds.encoded_cache)
+        ablated_ds.transformed_cache = None
+
+        col_config = ablated_ds.get_column_config(ignore_column)
+        if 'depends_on_column' in col_config:
+            del ablated_ds.encoded_cache[ignore_column]
+        else:
+            # Every row of the column is null, encode one and repeat it
+            null_encoding = ablated_ds.get_encoded_column_data(ignore_column, custom_data={ignore_column: [None]})
+            if isinstance(null_encoding, torch.Tensor):
+                ablated_ds.encoded_cache[ignore_column] = null_encoding.repeat(
+                    len(ds.data_frame),
+                    *[1] * (len(null_encoding.shape) - 1)
+                )
+            else:
+                del ablated_ds.encoded_cache[ignore_column]
 
-                if self.nr_predictions > 1:
-                    formated_predictions[k] = [[x] for x in formated_predictions[k]]
-                    for timestep_index in range(1,self.nr_predictions):
-                        for i in range(len(formated_predictions[k])):
-                            formated_predictions[k][i].append(predictions[f'{k}_timestep_{timestep_index}']['predictions'][i])
-
-                model_confidence_dict = {}
-                for confidence_name in ['selfaware_confidences', 'loss_confidences']:
-                    if confidence_name in predictions[k]:
-                        if k not in model_confidence_dict:
-                            model_confidence_dict[k] = []
-
-                        for i in range(len(predictions[k][confidence_name])):
-                            if len(model_confidence_dict[k]) <= i:
-                                model_confidence_dict[k].append([])
-                            conf = predictions[k][confidence_name][i]
-                            # @TODO We should make sure lightwood never returns confidences above or bellow 0 and 1
-                            if conf < 0:
-                                conf = 0
-                            if conf > 1:
-                                conf = 1
-                            model_confidence_dict[k][i].append(conf)
-
-                if 'selfaware_confidences' in predictions[k]:
-                    formated_predictions[f'{k}_selfaware_scores'] = [c[0] for c in model_confidence_dict[k]]
-
-                for k in model_confidence_dict:
-                    model_confidence_dict[k] = [np.mean(x) for x in model_confidence_dict[k]]
-
-                for k in model_confidence_dict:
-                    formated_predictions[f'{k}_model_confidence'] = model_confidence_dict[k]
-            formated_predictions_arr.append(formated_predictions)
+        for feature in ds.config['input_features'] + ds.config['output_features']:
+            if ignore_column in feature.get('depends_on_column', []):
+                ablated_ds.encoded_cache.pop(feature['name'], None)
 
-        formated_predictions = {}
-        for k in formated_predictions_arr[0]:
-            formated_predictions[k] = []
-            for ele in formated_predictions_arr:
-                formated_predictions[k].extend(ele[k])
+        return self.predictor._mixer.predict(
+            ablated_ds,
+            include_extra_data=self.predictor.config.get('include_extra_data', False)
+        )
 
-        if self.transaction.lmd['tss']['is_timeseries']:
-            for k in list(formated_predictions.keys()):
-                ordered_values = [None] * len(formated_predictions[k])
-                for i, value in enumerate(formated_predictions[k]):
-                    if timeseries_row_mapping[i] is not None:
-                        ordered_values[timeseries_row_mapping[i]] = value
-                formated_predictions[k] = ordered_values
+    def _predict_ablated_column(self, col, encoded_ds_map, timeseries_row_mapping):
+        """
+        :return: the predictions of `predict_ablations` without `col`
+        """
+        formated_predictions_arr = []
+        for ds in encoded_ds_map.values():
+            if col in ds.input_feature_names:
+                predictions = self._predict_ablated(ds, col)
+            else:
+                predictions = self.predictor._mixer.predict(
+                    ds,
+                    include_extra_data=self.predictor.config.get('include_extra_data', False)
+                )
+            formated_predictions_arr.extend(self._format_group_predictions(predictions))
+        return self._merge_predictions(formated_predictions_arr, timeseries_row_mapping)
 
-        return formated_predictions
+    def predict_ablations(self, mode, ignore_columns):
+        """
+        Equivalent to calling `predict(mode, ignore_columns=[col])` for every col in `ignore_columns`, but the data
+        is reshaped and encoded only once, and the ablations run in parallel processes when possible.
+
+        :return: a dict of column -> predictions without that column
+        """
+        if self.transaction.lmd['use_gpu'] is not None:
+            lightwood.config.config.CONFIG.USE_CUDA = self.transaction.lmd['use_gpu']
+
+        df_gb_map, timeseries_row_mapping = self._get_predict_data(mode)
+
+        encoded_ds_map = {}
+        for gb_val in df_gb_map:
+            self._load_predictor(gb_val)
+            if not hasattr(self.predictor, '_mixer'):
+                # e.g. ensembles, which need the data of every member encoded separately
+                return {col: self.predict(mode, ignore_columns=[col]) for col in ignore_columns}
+            with self.transaction.timer('LightwoodBackend.encode'):
+                encoded_ds_map[gb_val] = self._encode_once(df_gb_map[gb_val])
+
+        nr_procs = 1
+        if not lightwood.config.config.CONFIG.USE_CUDA:
+            nr_procs = min(len(ignore_columns), get_nr_procs(
+                self.transaction.lmd.get('max_processes', None),
+                self.transaction.lmd.get('max_per_proc_usage', None),
+                df_gb_map[next(iter(df_gb_map))]
+            ))
+
+        if nr_procs <= 1:
+            with self.transaction.timer('LightwoodBackend.mixer_predict'):
+                return {
+                    col: self._predict_ablated_column(col, encoded_ds_map, timeseries_row_mapping)
+                    for col in ignore_columns
+                }
+
+        kwargs_by_key = {
+            col: {'col': col, 'encoded_ds_map': encoded_ds_map, 'timeseries_row_mapping': timeseries_row_mapping}
+            for col in ignore_columns
+        }
+        with self.transaction.timer('LightwoodBackend.mixer_predict'):
+            results = _run_in_processes(
+                self,
+                '_predict_ablated_column',
+                kwargs_by_key,
+                nr_procs,
+                backend_state={'predictor': self.predictor}
+            )
+
+        ablated_predictions = {}
+        for col in ignore_columns:
+            predictions, _, error = results[col]
+            if error is not None:
+                raise Exception(f'Error while predicting without column "{col}":\n{error}')
+            ablated_predictions[col] = predictions
+        return ablated_predictions
+
+    def _finetune_predictor(self, predictor, train_df, test_df, training_time):
+        """
+        Continues training the network of a NnMixer predictor on new data, starting from its current weights,
+        and keeps the weights with the lowest error on `test_df` (which may be the ones it started from).
+        Training stops after `training_time` seconds, FINETUNE_MAX_EPOCHS epochs or FINETUNE_PATIENCE epochs
+        without improvement, so its cost depends on the size of the new data only.
+        """
+        mixer = predictor._mixer
+        # Not persisted when the predictor is saved
+        mixer._nonpersistent = {'sampler': None, 'callback': None}
+
+        # The encoders and transformer stay the ones the predictor was trained with
+        train_ds = lightwood.api.data_source.DataSource(
+            train_df,
+            config=predictor.config,
+            prepare_encoders=False,
+            initialize_transformer=False
+        )
+        train_ds.encoders = mixer.encoders
+        train_ds.transformer = mixer.transformer
+        # tiny adjusts may not have test data, the error is then measured on the training data
+        test_ds = train_ds.make_child(test_df if len(test_df) > 0 else train_df)
+        train_ds.train()
+
+        started_at = time.time()
+        best_error = mixer._error(test_ds)
+        best_model = mixer._get_model_copy()
+        improved = False
+        epochs_without_improvement = 0
+        for epoch, training_error in enumerate(mixer._iter_fit(train_ds, max_epochs=FINETUNE_MAX_EPOCHS)):
+            test_error = mixer._error(test_ds)
+            self.transaction.log.debug(f'Finetuning epoch {epoch}, training error: {training_error}, test error: {test_error}')
+            if test_error < best_error:
+                best_error = test_error
+                best_model = mixer._get_model_copy()
+                improved = True
+                epochs_without_improvement = 0
+            else:
+                epochs_without_improvement += 1
+
+            if epochs_without_improvement >= FINETUNE_PATIENCE or time.time() - started_at > training_time:
+                break
+
+        if not improved:
+            self.transaction.log.warning('Finetuning didn\'t improve the error on the new data, keeping the previous weights')
+        mixer._update_model(best_model)
 
     def finetune(self):
+        train_df_gb_map, test_df_gb_map, secondary_type_dict = self._prepare_train_data()
+
+        load_path = os.path.join(CONFIG.MINDSDB_STORAGE_PATH, self.transaction.lmd['name'])
+        predictor = None
+        if list(train_df_gb_map.keys()) == ['']:
+            try:
+                predictor = Predictor(load_from_path=os.path.join(load_path, 'lightwood_data'))
+            except Exception:
+                # models that were already adjusted are ensembles
+                predictor = None
+
+        if predictor is not None and isinstance(predictor._mixer, lightwood.mixers.NnMixer):
+            training_time = max(0, self._get_unplanned_training_time())
+            self._finetune_predictor(predictor, train_df_gb_map[''], test_df_gb_map[''], training_time)
+            self.predictor = predictor
+            self.predictor.save(path_to=os.path.join(load_path, 'lightwood_data'))
+            return
+
+        # Other mixers can't continue training, a new predictor is trained on the new data and added to an ensemble
         ensemble = None
         try:
             load_path = os.path.join(CONFIG.MINDSDB_STORAGE_PATH, self.transaction.lmd['name'])
@@ -696,7 +1354,7 @@ class LightwoodBackend:
         if ensemble is None:
             raise(Exception("Adjust can only be called on an already trained Predictor!"))
 
-        self.train()  # this generates a new predictor object
+        self._train_prepared(train_df_gb_map, test_df_gb_map, secondary_type_dict)  # this generates a new predictor object
 
         # update and save the ensemble
         ensemble.append(self.predictor)
@@ -21,3 +21,6 @@ class ModelInterface(BaseModule):
             self.transaction.hmd['predictions'] = self.transaction.model_backend.predict()
         elif mode == 'finetune':
             self.transaction.model_backend.finetune()
+        elif mode == 'load':
+            # The predictor was already trained and saved, e.g. by a learn being resumed
+            self.transaction.model_backend._load_predictor('')
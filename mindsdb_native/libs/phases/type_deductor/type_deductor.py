@@ -1,7 +1,9 @@
+import os
 import random
 import dateutil
 import string
 import numpy as np
+import pandas as pd
 import imghdr
 import sndhdr
 from copy import deepcopy
@@ -24,12 +26,14 @@ from mindsdb_native.libs.constants.mindsdb import (
 from mindsdb_native.libs.helpers.text_helpers import (
     word_tokenize,
     cast_string_to_python_type,
+    get_identifier_description,
     get_identifier_description_mp
 )
 from mindsdb_native.libs.phases.base_module import BaseModule
 from mindsdb_native.libs.helpers.stats_helpers import sample_data
-from mindsdb_native.libs.helpers.mp_helpers import get_nr_procs
-from mindsdb_native.libs.helpers.date_helpers import DATE_ORDER_KWARGS
+from mindsdb_native.libs.helpers.mp_helpers import get_nr_procs, pool_map, SharedColumn
+from mindsdb_native.libs.helpers.column_cache import COLUMN_CACHE, get_column_cache_key
+from mindsdb_native.libs.helpers.date_helpers import DATE_ORDER_KWARGS, ParseMemo
 
 # DATE_FMTS = [
 #     '%Y-%m-%d',
@@ -84,10 +88,77 @@ def get_number_subtype(string):
         return None
 
 
-def count_data_types_in_column(data, lmd, col_name):
-    type_counts = Counter()
-    subtype_counts = Counter()
+# Types are only deduced in worker processes for data with at least this many cells (rows x columns to analyze)
+MIN_CELLS_FOR_PROCESSES = pow(10, 5)
+# The keys of the lmd the type deduction reads, the only ones sent to the worker processes
+TYPE_DEDUCTION_LMD_KEYS = [
+    'data_types',
+    'data_subtypes',
+    'force_categorical_encoding',
+    'tags_delimiter',
+    'dateutil_parser_kwargs_per_column'
+]
+
+# Strings `get_number_subtype` certainly parses as floats (unless they're numeric, then they're ints)
+FLOAT_RE = r'^[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?$'
+# Python won't parse ints with more digits than this from strings, see `sys.set_int_max_str_digits`
+MAX_INT_DIGITS = 4300
+# ISO 8601 dates and datetimes, with the `strptime` formats they always parse with
+ISO_DATE_PREFIX_RE = r'^[0-9]{4}-[0-9]{2}-[0-9]{2}'
+ISO_DATE_FORMATS = [
+    (r'^[0-9]{4}-[0-9]{2}-[0-9]{2}$', '%Y-%m-%d'),
+    (r'^[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}$', '%Y-%m-%d %H:%M'),
+    (r'^[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}$', '%Y-%m-%dT%H:%M'),
+    (r'^[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2}$', '%Y-%m-%d %H:%M:%S'),
+    (r'^[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}$', '%Y-%m-%dT%H:%M:%S'),
+    (r'^[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2}\.[0-9]{1,6}$', '%Y-%m-%d %H:%M:%S.%f'),
+    (r'^[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}\.[0-9]{1,6}$', '%Y-%m-%dT%H:%M:%S.%f')
+]
+
+
+def vectorized_type_check(strings, check_dates=True):
+    """
+    Types in bulk the cells of a column that the type checkers of `count_data_types_in_column` would certainly
+    type as numbers or (if `check_dates`) dates, without going through the checkers one cell at a time.
+
+    :param strings: a series with the cells of the column as strings
+    :return: series with the type and subtype of every cell, None for the cells that have to go through the checkers
+    """
+    types = pd.Series([None] * len(strings), index=strings.index, dtype=object)
+    subtypes = pd.Series([None] * len(strings), index=strings.index, dtype=object)
+
+    is_numeric = strings.str.isnumeric()
+    is_int = strings.str.isdecimal() & (strings.str.len() <= MAX_INT_DIGITS)
+    types[is_int] = DATA_TYPES.NUMERIC
+    subtypes[is_int] = DATA_SUBTYPES.INT
+
+    not_numeric = strings[~is_numeric]
+    is_float = not_numeric.index[not_numeric.str.match(FLOAT_RE)]
+    types[is_float] = DATA_TYPES.NUMERIC
+    subtypes[is_float] = DATA_SUBTYPES.FLOAT
+
+    if check_dates:
+        rest = strings[types.isna()]
+        rest = rest[rest.str.match(ISO_DATE_PREFIX_RE)]
+        for regex, fmt in ISO_DATE_FORMATS:
+            candidates = rest[rest.str.match(regex)]
+            if len(candidates) == 0:
+                continue
+            dates = pd.to_datetime(candidates, format=fmt, errors='coerce')
+            # Cells that are paths of existing files are typed by the file checker first
+            exists = {x: os.path.exists(x) for x in candidates.unique()}
+            is_date = dates.notna() & ~candidates.map(exists).astype(bool)
+            dates = dates[is_date]
+            is_day = (dates.dt.hour == 0) & (dates.dt.minute == 0) & (dates.dt.second == 0) & (candidates[is_date].str.len() <= 16)
+            types[dates.index] = DATA_TYPES.DATE
+            subtypes[dates.index] = is_day.map({True: DATA_SUBTYPES.DATE, False: DATA_SUBTYPES.TIMESTAMP})
+
+    return types, subtypes
+
+
+def count_data_types_in_column(data, lmd, col_name, parse_memo=None):
     additional_info = {}
+    parse_memo = parse_memo if parse_memo is not None else ParseMemo()
 
     def type_check_numeric(element):
         type_guess, subtype_guess = None, None
@@ -130,7 +201,7 @@ def count_data_types_in_column(data, lmd, col_name):
     def type_check_date(element):
         type_guess, subtype_guess = None, None
         try:
-            dt = dateutil.parser.parse(element, **lmd.get('dateutil_parser_kwargs_per_column', {}).get(col_name, {}))
+            dt = parse_memo.parse(element, **lmd.get('dateutil_parser_kwargs_per_column', {}).get(col_name, {}))
 
             # Not accurate 100% for a single datetime str,
             # but should work in aggregate
@@ -148,26 +219,65 @@ def count_data_types_in_column(data, lmd, col_name):
                      type_check_sequence,
                      type_check_file,
                      type_check_date]
-    for element in data:
-        for type_checker in type_checkers:
-            type_guess, subtype_guess = type_checker(element)
-            if type_guess is not None:
-                break
+
+    data = pd.Series(data, dtype=object).reset_index(drop=True)
+    types, subtypes = vectorized_type_check(
+        data.astype(str),
+        # The fast paths only know how dates parse without parser options
+        check_dates=len(lmd.get('dateutil_parser_kwargs_per_column', {}).get(col_name, {})) == 0
+    )
+
+    types = types.to_numpy(dtype=object, copy=True)
+    subtypes = subtypes.to_numpy(dtype=object, copy=True)
+
+    # The cells that couldn't be typed in bulk, in order, going through the checkers once per distinct value
+    checked = {}
+    for i in np.flatnonzero(pd.isna(types)):
+        element = data.iat[i]
+        try:
+            key = (type(element), element)
+            result = checked.get(key)
+        except TypeError:
+            key, result = None, None
+
+        if result is None:
+            previous_separator = additional_info.pop('separator', None)
+            for type_checker in type_checkers:
+                type_guess, subtype_guess = type_checker(element)
+                if type_guess is not None:
+                    break
+            else:
+                type_guess, subtype_guess = 'Unknown', 'Unknown'
+
+            separator = additional_info.get('separator', None)
+            if separator is None and previous_separator is not None:
+                additional_info['separator'] = previous_separator
+            result = (type_guess, subtype_guess, separator)
+            if key is not None:
+                checked[key] = result
         else:
-            type_guess, subtype_guess = 'Unknown', 'Unknown'
-                
-        type_counts[type_guess] += 1
-        subtype_counts[subtype_guess] += 1
+            type_guess, subtype_guess, separator = result
+            # The sequence checker sets the separator of the last array
+            if separator is not None:
+                additional_info['separator'] = separator
+
+        types[i] = type_guess
+        subtypes[i] = subtype_guess
+
+    # Counted in the order of the cells, so the counters list (and break ties between) types as before
+    type_counts = Counter(types)
+    subtype_counts = Counter(subtypes)
 
     return type_counts, subtype_counts, additional_info
 
 
-def get_column_data_type(arg_tup, lmd):
+def get_column_data_type(arg_tup, lmd, parse_memo=None):
     """
     Provided the column data, define its data type and data subtype.
 
     :param data: an iterable containing a sample of the data frame
     :param full_data: an iterable containing the whole column of a data frame
+    :param parse_memo: the `ParseMemo` of the transaction, if any
 
     :return: type and type distribution, we can later use type_distribution to determine data quality
     NOTE: type distribution is the count that this column has for belonging cells to each DATA_TYPE
@@ -201,7 +311,7 @@ def get_column_data_type(arg_tup, lmd):
         subtype_dist[DATA_SUBTYPES.MULTIPLE] = len(data)
         return curr_data_type, curr_data_subtype, type_dist, subtype_dist, additional_info, warn, info
 
-    type_dist, subtype_dist, new_additional_info = count_data_types_in_column(data, lmd, col_name)
+    type_dist, subtype_dist, new_additional_info = count_data_types_in_column(data, lmd, col_name, parse_memo)
 
     if new_additional_info:
         additional_info.update(new_additional_info)
@@ -263,7 +373,8 @@ def get_column_data_type(arg_tup, lmd):
 
     # If curr_data_type is still None, then it's text or category
     if curr_data_type is None:
-        lang_dist = get_language_dist(data)
+        # Only whether most cells are of unknown language matters
+        lang_dist = get_language_dist(data, unknown_share_threshold=0.5)
 
         # Normalize lang probabilities
         for lang in lang_dist:
@@ -303,11 +414,78 @@ def get_column_data_type(arg_tup, lmd):
     return curr_data_type, curr_data_subtype, type_dist, subtype_dist, additional_info, warn, info
 
 
+def _deduce_column_type(task):
+    """
+    Worker process side of `get_column_data_type`, see `TypeDeductor._run_in_processes`
+
+    :return: the result of `get_column_data_type` and the `ParseMemo` of the dates it parsed
+    """
+    sample_column, full_column, col_name, lmd = task
+    parse_memo = ParseMemo()
+    with sample_column.open() as data, full_column.open() as full_data:
+        result = get_column_data_type((data, full_data, col_name), lmd, parse_memo)
+        # Nothing may reference the shared memory once it's closed
+        del data, full_data
+    return result, parse_memo
+
+
+def _describe_identifier(task):
+    """
+    Worker process side of `get_identifier_description`, see `TypeDeductor._run_in_processes`
+    """
+    full_column, col_name, data_type, data_subtype, other_potential_subtypes = task
+    with full_column.open() as data:
+        result = get_identifier_description(data, col_name, data_type, data_subtype, other_potential_subtypes)
+        del data
+    return result
+
+
 class TypeDeductor(BaseModule):
     """
     The type deduction phase is responsible for inferring data types
     from cleaned data
     """
+    def _run_in_processes(self, nr_procs, input_data, sample_df, columns_to_analyze, results):
+        """
+        Deduces the types of `columns_to_analyze` (filling `results`) and detects the identifiers among them in the
+        worker processes of the shared pool, one column per task and at most `nr_procs` at a time, with the columns
+        passed through shared memory. Results are collected in the order of the columns, so they don't depend on the
+        number of processes. The dates the workers parse are added to the `parse_memo` of the transaction.
+
+        :return: the identifier description of every column
+        """
+        lmd = {k: self.transaction.lmd[k] for k in TYPE_DEDUCTION_LMD_KEYS if k in self.transaction.lmd}
+
+        full_columns = {}
+        try:
+            sample_columns = {}
+            try:
+                for x in columns_to_analyze:
+                    sample_columns[x] = SharedColumn(sample_df[x].dropna())
+                    full_columns[x] = SharedColumn(input_data.data_frame[x])
+                answer_arr = pool_map(_deduce_column_type, [
+                    (sample_columns[x], full_columns[x], x, lmd) for x in columns_to_analyze
+                ], nr_procs)
+            finally:
+                for column in sample_columns.values():
+                    column.release()
+
+            for i, col_name in enumerate(columns_to_analyze):
+                column_type, parse_memo = answer_arr[i]
+                results[col_name] = {'column_type': column_type}
+                self.transaction.parse_memo.update(parse_memo)
+
+            return pool_map(_describe_identifier, [
+                (full_columns[x],
+                    x,
+                    results[x]['column_type'][0],
+                    results[x]['column_type'][1],
+                    results[x]['column_type'][4]) for x in columns_to_analyze
+            ], nr_procs)
+        finally:
+            for column in full_columns.values():
+                column.release()
+
     def run(self, input_data):
         stats_v2 = defaultdict(dict)
         self.transaction.lmd['stats_v2'] = stats_v2
@@ -332,25 +510,53 @@ class TypeDeductor(BaseModule):
         else:
             sample_df = input_data.data_frame
 
+        budget_sample_df = self.transaction.time_budget.fit_sample('TypeDeductor', sample_df)
+        if len(budget_sample_df) < len(sample_df):
+            self.transaction.log.warning(f'Deducting the column types from a sample of {len(budget_sample_df)} rows to stay within stop_training_in_x_seconds')
+            sample_df = budget_sample_df
+
+        # Columns analyzed by a previous learn on the same data reuse its results
+        columns = list(sample_df.columns.values)
+        cache_keys = {}
+        results = {}
+        for col_name in columns:
+            cache_keys[col_name] = get_column_cache_key(self.transaction.lmd, col_name,
+                                                        input_data.data_frame[col_name], len(sample_df))
+            result = COLUMN_CACHE.get('TypeDeductor', cache_keys[col_name])
+            if result is not None:
+                results[col_name] = result
+        if len(results) > 0:
+            self.log.info(f'Reusing the cached types of {len(results)} columns')
+        columns_to_analyze = [x for x in columns if x not in results]
+
         nr_procs = get_nr_procs(self.transaction.lmd.get('max_processes', None),
                                 self.transaction.lmd.get('max_per_proc_usage', None),
                                 sample_df)
-        if nr_procs > 1 and False:
+        nr_cells = len(input_data.data_frame) * len(columns_to_analyze)
+        if nr_procs > 1 and len(columns_to_analyze) > 1 and nr_cells >= MIN_CELLS_FOR_PROCESSES:
+            nr_procs = min(nr_procs, len(columns_to_analyze))
             self.transaction.log.info(f'Using {nr_procs} processes to deduct types.')
-            pool = mp.Pool(processes=nr_procs)
-            # Make type `object` so that dataframe cells can be python lists
-            answer_arr = pool.map(partial(get_column_data_type, lmd=self.transaction.lmd), [
-                (sample_df[x].dropna(), input_data.data_frame[x], x) for x in sample_df.columns.values
-            ])
-            pool.close()
-            pool.join()
+            answer_arr = self._run_in_processes(nr_procs, input_data, sample_df, columns_to_analyze, results)
         else:
             answer_arr = []
-            for x in sample_df.columns.values:
-                answer_arr.append(get_column_data_type([sample_df[x].dropna(), input_data.data_frame[x], x], lmd=self.transaction.lmd))
+            for x in columns_to_analyze:
+                answer_arr.append(get_column_data_type([sample_df[x].dropna(), input_data.data_frame[x], x],
+                                                       lmd=self.transaction.lmd,
+                                                       parse_memo=self.transaction.parse_memo))
+            for i, col_name in enumerate(columns_to_analyze):
+                results[col_name] = {'column_type': answer_arr[i]}
+
+            answer_arr = []
+            for x in columns_to_analyze:
+                answer = get_identifier_description_mp([input_data.data_frame[x], x, results[x]['column_type'][0], results[x]['column_type'][1], results[x]['column_type'][4]])
+                answer_arr.append(answer)
 
-        for i, col_name in enumerate(sample_df.columns.values):
-            (data_type, data_subtype, data_type_dist, data_subtype_dist, additional_info, warn, info) = answer_arr[i]
+        for i, col_name in enumerate(columns_to_analyze):
+            results[col_name]['identifier'] = answer_arr[i]
+            COLUMN_CACHE.set('TypeDeductor', cache_keys[col_name], results[col_name])
+
+        for col_name in columns:
+            (data_type, data_subtype, data_type_dist, data_subtype_dist, additional_info, warn, info) = results[col_name]['column_type']
 
             for msg in warn:
                 self.log.warning(msg)
@@ -369,26 +575,9 @@ class TypeDeductor(BaseModule):
 
             stats_v2[col_name]['additional_info'] = additional_info
 
-        if nr_procs > 1:
-            pool = mp.Pool(processes=nr_procs)
-            answer_arr = pool.map(get_identifier_description_mp, [
-                (input_data.data_frame[x],
-                    x,
-                    stats_v2[x]['typing']['data_type'],
-                    stats_v2[x]['typing']['data_subtype'],
-                    stats_v2[x]['additional_info']) for x in sample_df.columns.values
-            ])
-            pool.close()
-            pool.join()
-        else:
-            answer_arr = []
-            for x in sample_df.columns.values:
-                answer = get_identifier_description_mp([input_data.data_frame[x], x, stats_v2[x]['typing']['data_type'], stats_v2[x]['typing']['data_subtype'], stats_v2[x]['additional_info']])
-                answer_arr.append(answer)
-
-        for i, col_name in enumerate(sample_df.columns.values):
+        for col_name in columns:
             # work with the full data
-            stats_v2[col_name]['identifier'] = answer_arr[i]
+            stats_v2[col_name]['identifier'] = results[col_name]['identifier']
 
             if stats_v2[col_name]['identifier'] is not None:
                 if col_name not in self.transaction.lmd['force_column_usage']:
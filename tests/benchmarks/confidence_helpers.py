@@ -0,0 +1,39 @@
+"""
+Times the vectorized ICP bound and significance selection against the per-sample loops they replaced.
+
+Run from the tests directory:
+```cd tests & python -m benchmarks.confidence_helpers```
+"""
+import time
+
+from mindsdb_native.libs.helpers.confidence_helpers import (
+    get_numerical_conf_range,
+    get_categorical_conf,
+    CATEGORICAL_CONF_CANDIDATES
+)
+from unit_tests.libs.helpers.test_confidence_helpers import (
+    _loop_numerical_conf_range,
+    _loop_categorical_conf,
+    _random_numerical_confs,
+    _random_categorical_confs
+)
+
+
+def run(n_rows=20000):
+    stats = {'y': {'train_std_dev': {'__default': 1}}}
+    numerical_confs = _random_numerical_confs(n_rows)
+    categorical_confs = _random_categorical_confs(n_rows)
+
+    for name, f in [
+        ('numerical (loop)', lambda: _loop_numerical_conf_range(numerical_confs, 1)),
+        ('numerical (vectorized)', lambda: get_numerical_conf_range(numerical_confs, 'y', stats)),
+        ('categorical (loop)', lambda: _loop_categorical_conf(categorical_confs, CATEGORICAL_CONF_CANDIDATES)),
+        ('categorical (vectorized)', lambda: get_categorical_conf(categorical_confs, CATEGORICAL_CONF_CANDIDATES))
+    ]:
+        start = time.time()
+        f()
+        print(f'{name}: {time.time() - start:.4f} seconds for {n_rows} rows')
+
+
+if __name__ == '__main__':
+    run()
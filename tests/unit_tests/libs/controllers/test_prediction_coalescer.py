@@ -0,0 +1,182 @@
+import time
+import asyncio
+import threading
+import unittest
+
+from mindsdb_native.libs.controllers.prediction_coalescer import PredictionCoalescer
+
+
+class FakeTransaction:
+    def __init__(self):
+        self.lmd = {'columns': ['x', 'y'], 'predict_columns': ['y']}
+        self.timings = [{'name': 'ModelInterface', 'duration': 0.01}]
+
+
+class FakeOutput:
+    def __init__(self, data):
+        self._data = data
+        self._transaction = FakeTransaction()
+        self._input_confidence = None
+        self._extra_insights = None
+        self._class_distribution_map = {}
+        self._important_cols = ['x']
+        self._explanations = [{'y': {'predicted_value': row_y}} for row_y in data['y']]
+
+    def __len__(self):
+        return len(self._data['y'])
+
+
+class FakePredictor:
+    name = 'fake_predictor'
+
+    def __init__(self, predict_time=0.01):
+        self.calls = []
+        self.predict_time = predict_time
+        self.nr_running = 0
+        self.max_running = 0
+        self._running_lock = threading.Lock()
+
+    def predict(self, when_data, use_gpu=None, advanced_args=None, backend=None):
+        with self._running_lock:
+            self.calls.append(when_data)
+            self.nr_running += 1
+            self.max_running = max(self.max_running, self.nr_running)
+        time.sleep(self.predict_time)
+        with self._running_lock:
+            self.nr_running -= 1
+        output = FakeOutput({
+            'x': [row['x'] for row in when_data],
+            'y': [row['x'] * 2 for row in when_data]
+        })
+        output._input_confidence = {'y': {'x': 1.0}}
+        return output
+
+
+class TestPredictionCoalescer(unittest.TestCase):
+    def _run(self, coro):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            loop.close()
+
+    def _get_coalescer(self, predict_time=0.01, **kwargs):
+        predictor = FakePredictor(predict_time)
+        coalescer = PredictionCoalescer(predictor, **kwargs)
+
+        async def model_is_timeseries():
+            return False
+        coalescer._model_is_timeseries = model_is_timeseries
+        return predictor, coalescer
+
+    def test_concurrent_requests_are_merged(self):
+        predictor, coalescer = self._get_coalescer(max_batch_size=100, max_wait=0.05)
+
+        async def run():
+            return await asyncio.gather(
+                coalescer.predict({'x': 1}),
+                coalescer.predict([{'x': 2}, {'x': 3}]),
+                coalescer.predict({'x': 4})
+            )
+
+        outputs = self._run(run())
+
+        assert len(predictor.calls) == 1
+        assert [list(o._data['y']) for o in outputs] == [[2], [4, 6], [8]]
+        assert len(outputs[1]) == 2
+
+        # Each caller keeps the timings and the explanations already computed for its own rows
+        assert outputs[1].timings == [{'name': 'ModelInterface', 'duration': 0.01}]
+        assert outputs[1].explain_all() == [{'y': {'predicted_value': 4}}, {'y': {'predicted_value': 6}}]
+        assert outputs[2]._important_cols == ['x']
+        assert len(coalescer._tasks) == 0
+
+        assert len(coalescer.batch_stats) == 1
+        assert coalescer.batch_stats[0]['nr_requests'] == 3
+        assert coalescer.batch_stats[0]['nr_rows'] == 4
+
+    def test_batches_are_split_by_size_and_arguments(self):
+        predictor, coalescer = self._get_coalescer(max_batch_size=2, max_wait=0.05)
+
+        async def run():
+            return await asyncio.gather(
+                coalescer.predict({'x': 1}),
+                coalescer.predict({'x': 2}),
+                coalescer.predict({'x': 3}),
+                coalescer.predict({'x': 4}, advanced_args={'anomaly_detection': False})
+            )
+
+        outputs = self._run(run())
+
+        assert len(predictor.calls) == 3
+        assert [o._data['y'][0] for o in outputs] == [2, 4, 6, 8]
+        assert sorted(s['nr_rows'] for s in coalescer.batch_stats) == [1, 1, 2]
+
+    def test_batches_with_different_arguments_run_concurrently(self):
+        predictor, coalescer = self._get_coalescer(predict_time=0.2, max_batch_size=100, max_wait=0.01)
+
+        async def run():
+            return await asyncio.gather(
+                coalescer.predict({'x': 1}),
+                coalescer.predict({'x': 2}, advanced_args={'anomaly_detection': False})
+            )
+
+        self._run(run())
+        assert len(predictor.calls) == 2
+        assert predictor.max_running == 2
+
+    def test_input_confidence_is_only_kept_by_whole_batches(self):
+        predictor, coalescer = self._get_coalescer(max_batch_size=100, max_wait=0.05)
+
+        async def run():
+            merged = await asyncio.gather(
+                coalescer.predict({'x': 1}),
+                coalescer.predict({'x': 2})
+            )
+            alone = await coalescer.predict({'x': 3})
+            return merged, alone
+
+        merged, alone = self._run(run())
+        # It's computed over the rows of every caller in the batch
+        assert all(o._input_confidence is None for o in merged)
+        assert alone._input_confidence == {'y': {'x': 1.0}}
+
+    def test_errors_are_propagated(self):
+        predictor, coalescer = self._get_coalescer(max_batch_size=100, max_wait=0.01)
+
+        def predict(*args, **kwargs):
+            raise ValueError('broken model')
+        predictor.predict = predict
+
+        async def run():
+            return await asyncio.gather(
+                coalescer.predict({'x': 1}),
+                coalescer.predict({'x': 2}),
+                return_exceptions=True
+            )
+
+        results = self._run(run())
+        assert all(isinstance(r, ValueError) for r in results)
+
+    def test_model_type_is_loaded_outside_the_event_loop(self):
+        predictor = FakePredictor()
+        coalescer = PredictionCoalescer(predictor, max_batch_size=100, max_wait=0.01)
+
+        loaded_in = []
+
+        def load_is_timeseries():
+            loaded_in.append(threading.current_thread())
+            return False
+        coalescer._load_is_timeseries = load_is_timeseries
+
+        async def run():
+            first = await coalescer.predict({'x': 1})
+            second = await coalescer.predict({'x': 2})
+            return first, second
+
+        outputs = self._run(run())
+
+        assert [o._data['y'][0] for o in outputs] == [2, 4]
+        # Loaded once per model version, in a worker thread
+        assert len(loaded_in) == 1
+        assert loaded_in[0] is not threading.main_thread()
@@ -18,8 +18,11 @@ from lightwood.config.config import CONFIG as LIGHTWOOD_CONFIG
 
 from mindsdb_native import F
 from mindsdb_datasources import FileDS
-from mindsdb_native.libs.controllers.predictor import Predictor
+from mindsdb_native.libs.controllers.predictor import Predictor, _get_prediction_chunks, _merge_prediction_chunks
 from mindsdb_native.libs.helpers.stats_helpers import sample_data
+from mindsdb_native.libs.helpers.general_helpers import load_lmd
+from mindsdb_native.libs.data_types.transaction_output_data import PredictTransactionOutputData
+from mindsdb_native.config import CONFIG
 from mindsdb_native.libs.constants.mindsdb import DATA_TYPES, DATA_SUBTYPES
 
 from unit_tests.utils import (
@@ -65,6 +68,218 @@ class TestPredictor(unittest.TestCase):
 
         assert len(str(result[0])) > 20
 
+        # Bulk accessors should agree with the per-row explanations, computed on an output that has cached nothing
+        result = mdb.predict(when_data=input_dataframe)
+        explanations = result.explain_all()
+        assert len(explanations) == len(input_dataframe)
+
+        fresh_result = PredictTransactionOutputData(result._transaction, result._data)
+        fresh_result._input_confidence = result._input_confidence
+        fresh_result._extra_insights = result._extra_insights
+        for i, explanation in enumerate(explanations):
+            assert fresh_result[i].explain() == explanation
+
+        df = result.to_pandas()
+        assert len(df) == len(input_dataframe)
+        assert 'numeric_y_confidence' in df.columns
+        assert result.to_numpy().shape == df.shape
+
+        # Phase and stage timings
+        timing_names = set(x['name'] for x in result.timings)
+        for name in ['DataExtractor', 'DataTransformer', 'ModelInterface', 'LightwoodBackend.lightwood_predict', 'ICP.predict', 'ICP.bounds']:
+            assert name in timing_names
+        assert all(x['duration'] >= 0 for x in result.timings)
+
+        lmd = load_lmd(os.path.join(CONFIG.MINDSDB_STORAGE_PATH, 'test_explain_prediction', 'light_model_metadata.pickle'))
+        learn_timing_names = set(x['name'] for x in lmd['timings'])
+        for name in ['DataExtractor', 'TypeDeductor', 'DataAnalyzer', 'ModelInterface', 'ModelAnalyzer']:
+            assert name in learn_timing_names
+
+    def test_chunked_prediction(self):
+        df = pd.DataFrame({'g': ['a', 'b', None, 'a', 'c', 'b', None], 'x': list(range(7))})
+        positions, chunks = zip(*_get_prediction_chunks(df, 2, ['g']))
+        assert sorted(pd.concat(chunks)['x']) == list(range(7))
+        for chunk_positions, chunk in zip(positions, chunks):
+            assert list(chunk['x']) == sorted(chunk['x'])
+            assert list(chunk_positions) == list(chunk['x'])
+        for group in ['a', 'b', 'c']:
+            assert sum(group in list(chunk['g']) for chunk in chunks) == 1
+        assert sum(chunk['g'].isnull().any() for chunk in chunks) == 1
+
+        # Chunks regroup the rows, merging them puts the rows back in the order of the input
+        df = pd.DataFrame({'g': ['a', 'b', 'a', 'c'], 'x': list(range(4))})
+        chunk_outputs = [(chunk_positions, chunk.to_dict('list')) for chunk_positions, chunk in _get_prediction_chunks(df, 2, ['g'])]
+        assert [list(data['x']) for _, data in chunk_outputs] == [[0, 2], [1, 3]]
+        assert _merge_prediction_chunks(chunk_outputs, len(df)) == df.to_dict('list')
+
+        mdb = Predictor(name='test_chunked_prediction')
+
+        n_points = 100
+        input_dataframe = pd.DataFrame({
+            'numeric_x': list(range(n_points)),
+            'categorical_x': [int(x % 2 == 0) for x in range(n_points)],
+        }, index=list(range(n_points)))
+        input_dataframe['numeric_y'] = input_dataframe.numeric_x + 2*input_dataframe.categorical_x
+
+        mdb.learn(
+            from_data=input_dataframe,
+            to_predict='numeric_y',
+            stop_training_in_x_seconds=1,
+            use_gpu=False
+        )
+
+        when_data = input_dataframe.drop(columns=['numeric_y'])
+        sequential = mdb.predict(when_data=when_data)
+        chunked = mdb.predict(when_data=when_data, advanced_args={'n_jobs': 2, 'chunk_size': 30})
+
+        assert len(chunked) == len(sequential)
+        assert list(chunked._data['numeric_y']) == list(sequential._data['numeric_y'])
+        assert list(chunked._data['numeric_y_confidence_range']) == list(sequential._data['numeric_y_confidence_range'])
+
+    def test_parallel_mixer_training(self):
+        mdb = Predictor(name='test_parallel_mixer_training')
+
+        n_points = 100
+        input_dataframe = pd.DataFrame({
+            'numeric_x': list(range(n_points)),
+            'categorical_x': [int(x % 2 == 0) for x in range(n_points)],
+        }, index=list(range(n_points)))
+        input_dataframe['numeric_y'] = input_dataframe.numeric_x + 2*input_dataframe.categorical_x
+
+        mdb.learn(
+            from_data=input_dataframe,
+            to_predict='numeric_y',
+            stop_training_in_x_seconds=2,
+            use_gpu=False,
+            advanced_args={'use_mixers': ['LightGBMMixer', 'NnMixer'], 'max_processes': 2}
+        )
+
+        model_dir = os.path.join(CONFIG.MINDSDB_STORAGE_PATH, 'test_parallel_mixer_training')
+        assert 'lightwood_data' in os.listdir(model_dir)
+        assert not any('_candidate_' in x for x in os.listdir(model_dir))
+
+        result = mdb.predict(when_data=input_dataframe.drop(columns=['numeric_y']))
+        assert len(result) == n_points
+
+    def test_successive_halving(self):
+        mdb = Predictor(name='test_successive_halving')
+
+        n_points = 400
+        input_dataframe = pd.DataFrame({
+            'numeric_x': list(range(n_points)),
+            'categorical_x': [int(x % 2 == 0) for x in range(n_points)],
+        }, index=list(range(n_points)))
+        input_dataframe['numeric_y'] = input_dataframe.numeric_x + 2*input_dataframe.categorical_x
+
+        mdb.learn(
+            from_data=input_dataframe,
+            to_predict='numeric_y',
+            stop_training_in_x_seconds=4,
+            use_gpu=False,
+            advanced_args={'use_mixers': ['LightGBMMixer', 'NnMixer'], 'successive_halving': True}
+        )
+
+        rungs = mdb.transaction.lmd['successive_halving_rungs']['']
+        assert len(rungs) == 2
+        assert set(rungs[0]['accuracies']) == {'LightGBMMixer', 'NnMixer'}
+        assert len(rungs[1]['accuracies']) == 1
+        assert rungs[0]['nr_rows'] < rungs[1]['nr_rows']
+
+        result = mdb.predict(when_data=input_dataframe.drop(columns=['numeric_y']))
+        assert len(result) == n_points
+
+    def test_column_importance_ablations(self):
+        mdb = Predictor(name='test_column_importance_ablations')
+
+        n_points = 100
+        input_dataframe = pd.DataFrame({
+            'numeric_x': list(range(n_points)),
+            'categorical_x': [int(x % 2 == 0) for x in range(n_points)],
+            'text_x': [random.choice(SMALL_VOCAB) for _ in range(n_points)]
+        }, index=list(range(n_points)))
+        input_dataframe['numeric_y'] = input_dataframe.numeric_x + 2*input_dataframe.categorical_x
+
+        mdb.learn(
+            from_data=input_dataframe,
+            to_predict='numeric_y',
+            stop_training_in_x_seconds=1,
+            use_gpu=False,
+            advanced_args={'debug': True}
+        )
+
+        columns = ['numeric_x', 'categorical_x', 'text_x']
+        lmd = load_lmd(os.path.join(CONFIG.MINDSDB_STORAGE_PATH, 'test_column_importance_ablations', 'light_model_metadata.pickle'))
+        assert set(lmd['column_importances']) == set(columns)
+
+        backend = mdb.transaction.model_backend
+        ablated = backend.predict_ablations('validate', columns)
+        for col in columns:
+            expected = backend.predict('validate', ignore_columns=[col])
+            assert np.allclose(ablated[col]['numeric_y'], expected['numeric_y'])
+
+        # Repeated predictions on the transaction's data are memoized
+        def nr_lightwood_predictions():
+            return len([x for x in mdb.transaction.timings if x['name'] == 'LightwoodBackend.lightwood_predict'])
+
+        first = backend.predict('test')
+        nr_predictions = nr_lightwood_predictions()
+        assert backend.predict('test') == first
+        assert nr_lightwood_predictions() == nr_predictions
+
+    def test_resume_learn(self):
+        mdb = Predictor(name='test_resume_learn')
+
+        n_points = 100
+        input_dataframe = pd.DataFrame({
+            'numeric_x': list(range(n_points)),
+            'categorical_x': [int(x % 2 == 0) for x in range(n_points)],
+        }, index=list(range(n_points)))
+        input_dataframe['numeric_y'] = input_dataframe.numeric_x + 2*input_dataframe.categorical_x
+
+        class Interrupted(Exception):
+            pass
+
+        def interrupt():
+            raise Interrupted()
+
+        learn_kwargs = dict(to_predict='numeric_y', stop_training_in_x_seconds=1, use_gpu=False)
+
+        mdb.breakpoint = {'ModelAnalyzer': interrupt}
+        with self.assertRaises(Interrupted):
+            mdb.learn(from_data=input_dataframe, **learn_kwargs)
+        mdb.breakpoint = None
+
+        model_dir = os.path.join(CONFIG.MINDSDB_STORAGE_PATH, 'test_resume_learn')
+        lmd = load_lmd(os.path.join(model_dir, 'light_model_metadata.pickle'))
+        assert lmd['current_phase'] == 'Error'
+        assert len(os.listdir(os.path.join(model_dir, 'checkpoints'))) > 0
+
+        # Only the data extraction and the phases that didn't finish run again
+        mdb.learn(from_data=input_dataframe, resume=True, **learn_kwargs)
+        phases = set(x['name'] for x in mdb.transaction.timings)
+        assert 'TypeDeductor' not in phases
+        assert 'ModelInterface' not in phases
+        assert 'ModelAnalyzer' in phases
+
+        lmd = load_lmd(os.path.join(model_dir, 'light_model_metadata.pickle'))
+        assert lmd['current_phase'] == 'Trained'
+        assert not os.path.exists(os.path.join(model_dir, 'checkpoints'))
+
+        result = mdb.predict(when_data=input_dataframe.drop(columns=['numeric_y']))
+        assert len(result) == n_points
+
+        # A learn on different data can't be resumed
+        mdb.learn(from_data=input_dataframe.iloc[:90], resume=True, **learn_kwargs)
+        assert 'TypeDeductor' in set(x['name'] for x in mdb.transaction.timings)
+
+        # Nor can a learn with different arguments
+        mdb.breakpoint = {'ModelAnalyzer': interrupt}
+        with self.assertRaises(Interrupted):
+            mdb.learn(from_data=input_dataframe, **learn_kwargs)
+        mdb.breakpoint = None
+        mdb.learn(from_data=input_dataframe, resume=True, advanced_args={'deduplicate_data': False}, **learn_kwargs)
+        assert 'TypeDeductor' in set(x['name'] for x in mdb.transaction.timings)
+
     def test_multilabel_prediction(self):
         train_file_name = os.path.join(self.tmp_dir, 'train_data.csv')
         test_file_name = os.path.join(self.tmp_dir, 'test_data.csv')
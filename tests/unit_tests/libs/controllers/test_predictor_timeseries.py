@@ -15,6 +15,7 @@ from sklearn.linear_model import LinearRegression
 from sklearn.metrics import r2_score, f1_score, accuracy_score
 
 from mindsdb_native.libs.controllers.predictor import Predictor
+from mindsdb_native.config import CONFIG
 from mindsdb_native import F
 
 from mindsdb_datasources import FileDS
@@ -312,6 +313,11 @@ class TestPredictorTimeseries(unittest.TestCase):
             advanced_args={'debug': True, 'split_models_on': ['5_valued_group_by'], 'quick_learn': True}
         )
 
+        # One model per group, trained concurrently
+        model_files = os.listdir(os.path.join(CONFIG.MINDSDB_STORAGE_PATH, 'test_split_models'))
+        assert len([x for x in model_files if x.startswith('lightwood_data_')]) == 5
+        assert not any('_candidate_' in x for x in model_files)
+
         results = mdb.predict(when_data=test_file_name, use_gpu=False)
 
         for i, row in enumerate(results):
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from mindsdb_native.config import CONFIG
+from mindsdb_native.libs.controllers.transaction import Transaction, PHASE_METADATA_CHANGES
+from mindsdb_native.libs.helpers.general_helpers import load_lmd
+
+
+class CountingTransaction(Transaction):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dumped = []
+
+    def _dump_hmd(self):
+        self.dumped.append('hmd')
+        return b'hmd'
+
+    def _dump_icp(self):
+        self.dumped.append('icp')
+        return b'icp'
+
+
+class TestTransaction(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(CONFIG, 'MINDSDB_STORAGE_PATH', tempfile.mkdtemp())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _get_transaction(self):
+        lmd = {'name': 'test_transaction', 'stats_v2': {'x': 1}, 'column_importances': {'x': 1}}
+        hmd = {'name': 'test_transaction', 'icp': {'__mdb_active': True}}
+        return CountingTransaction(session=None, light_transaction_metadata=lmd, heavy_transaction_metadata=hmd)
+
+    def _load_lmd(self):
+        return load_lmd(os.path.join(CONFIG.MINDSDB_STORAGE_PATH, 'test_transaction', 'light_model_metadata.pickle'))
+
+    def test_only_changed_metadata_is_serialized(self):
+        transaction = self._get_transaction()
+        assert transaction.metadata_writer is None
+
+        transaction.save_metadata()
+        assert transaction.dumped == ['hmd', 'icp']
+
+        transaction.dirty_metadata |= PHASE_METADATA_CHANGES['DataCleaner']
+        transaction.save_metadata()
+        assert transaction.dumped == ['hmd', 'icp']
+
+        transaction.lmd['stats_v2']['x'] = 2
+        transaction.dirty_metadata |= PHASE_METADATA_CHANGES['DataAnalyzer']
+        transaction.save_metadata()
+        assert transaction.dumped == ['hmd', 'icp']
+        assert self._load_lmd()['stats_v2'] == {'x': 2}
+
+        # ModelAnalyzer can change all of it
+        transaction.dirty_metadata |= PHASE_METADATA_CHANGES.get('ModelAnalyzer', {'hmd', 'icp'})
+        transaction.save_metadata()
+        assert transaction.dumped == ['hmd', 'icp', 'hmd', 'icp']
+
+    def test_core_written_after_its_sections(self):
+        transaction = self._get_transaction()
+
+        # The core written alone is never left pointing to sections missing from disk
+        transaction.set_current_phase('Training')
+        lmd = self._load_lmd()
+        assert lmd['current_phase'] == 'Training'
+        assert lmd['stats_v2'] == {'x': 1}
+        assert lmd['column_importances'] == {'x': 1}
@@ -0,0 +1,43 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from mindsdb_native.libs.constants.mindsdb import DATA_TYPES
+from mindsdb_native.libs.data_types import transaction_output_data
+from mindsdb_native.libs.data_types.transaction_output_data import PredictTransactionOutputData
+
+
+def _get_output(n_rows):
+    lmd = {
+        'columns': ['x', 'z', 'y'],
+        'predict_columns': ['y'],
+        'column_importances': None,
+        'tss': {'is_timeseries': False, 'nr_predictions': 1},
+        'stats_v2': {'y': {'typing': {'data_type': DATA_TYPES.NUMERIC}}}
+    }
+    data = {
+        'x': [None if i % 3 == 0 else i for i in range(n_rows)],
+        'z': [None if i % 2 == 0 else str(i) for i in range(n_rows)],
+        'y': [float(i) for i in range(n_rows)],
+        'y_confidence': [0.5] * n_rows,
+        'y_confidence_range': [[i - 1, i + 1] for i in range(n_rows)]
+    }
+    return PredictTransactionOutputData(SimpleNamespace(lmd=lmd, timings=[]), data)
+
+
+class TestPredictTransactionOutputData(unittest.TestCase):
+    def test_row_explanations_only_read_their_row(self):
+        n_rows = 50
+        output = _get_output(n_rows)
+
+        with mock.patch.object(transaction_output_data, '_get_missing_mask',
+                               wraps=transaction_output_data._get_missing_mask) as get_missing_mask:
+            explanations = [row.explanation for row in output]
+
+        # Lazy explanations never build the missing masks of the whole columns
+        assert get_missing_mask.call_count == 2 * n_rows
+        assert all(len(call[0][0]) == 1 for call in get_missing_mask.call_args_list)
+
+        assert explanations == _get_output(n_rows).explain_all()
+        assert explanations[0]['y']['important_missing_information'] == ['x', 'z']
+        assert explanations[1]['y']['important_missing_information'] == []
@@ -0,0 +1,77 @@
+import os
+import time
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from mindsdb_native.config import CONFIG
+from mindsdb_native.libs.helpers.column_cache import ColumnCache, get_column_cache_key
+
+
+LMD = {
+    'dateutil_parser_kwargs_per_column': {},
+    'tags_delimiter': ',',
+    'force_categorical_encoding': [],
+    'data_types': {},
+    'data_subtypes': {}
+}
+
+
+class TestColumnCache(unittest.TestCase):
+    def setUp(self):
+        self.storage_path = tempfile.mkdtemp()
+        self.patcher = mock.patch.object(CONFIG, 'MINDSDB_STORAGE_PATH', self.storage_path)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_keys(self):
+        col = pd.Series(['2020-01-02', '2020-03-04'], name='x')
+        key = get_column_cache_key(LMD, 'x', col, 2)
+
+        assert get_column_cache_key(LMD, 'x', col.copy(), 2) == key
+        assert get_column_cache_key(LMD, 'x', col[::-1].reset_index(drop=True), 2) != key
+        assert get_column_cache_key(LMD, 'x', col, 1) != key
+        assert get_column_cache_key(dict(LMD, dateutil_parser_kwargs_per_column={'x': {'dayfirst': True}}), 'x', col, 2) != key
+        assert get_column_cache_key(dict(LMD, force_categorical_encoding=['x']), 'x', col, 2) != key
+        # Options of other columns don't matter
+        assert get_column_cache_key(dict(LMD, force_categorical_encoding=['y']), 'x', col, 2) == key
+
+    def test_lru_eviction(self):
+        cache = ColumnCache(max_size=pow(10, 9))
+        assert cache.get('TypeDeductor', 'a') is None
+        cache.set('TypeDeductor', 'a', {'x': 1})
+        assert cache.get('TypeDeductor', 'a') == {'x': 1}
+        assert cache.get('DataAnalyzer', 'a') is None
+
+        entry_size = os.path.getsize(cache._get_path('TypeDeductor', 'a'))
+        cache.max_size = 2 * entry_size
+        time.sleep(0.01)
+        cache.set('TypeDeductor', 'b', {'x': 2})
+        time.sleep(0.01)
+        # Reading an entry makes it the most recently used one
+        cache.get('TypeDeductor', 'a')
+        time.sleep(0.01)
+        cache.set('TypeDeductor', 'c', {'x': 3})
+
+        assert cache.get('TypeDeductor', 'b') is None
+        assert cache.get('TypeDeductor', 'a') == {'x': 1}
+        assert cache.get('TypeDeductor', 'c') == {'x': 3}
+
+        cache.clear()
+        assert cache.get('TypeDeductor', 'a') is None
+
+    def test_path(self):
+        # The cache stays within the storage path, unless configured otherwise
+        assert ColumnCache(max_size=1).path == os.path.join(self.storage_path, '.column_cache')
+        with mock.patch.object(CONFIG, 'COLUMN_CACHE_PATH', '/tmp/column_cache'):
+            assert ColumnCache(max_size=1).path == '/tmp/column_cache'
+
+    def test_disabled(self):
+        cache = ColumnCache(max_size=0)
+        cache.set('TypeDeductor', 'a', {'x': 1})
+        assert cache.get('TypeDeductor', 'a') is None
+        assert not os.path.exists(cache.path)
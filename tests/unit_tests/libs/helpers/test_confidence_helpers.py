@@ -0,0 +1,139 @@
+import unittest
+
+import numpy as np
+from sklearn.tree import DecisionTreeClassifier
+from nonconformist.base import ClassifierAdapter
+from nonconformist.icp import IcpClassifier
+from nonconformist.nc import ClassifierNc
+
+from mindsdb_native.libs.constants.mindsdb import DATA_TYPES, DATA_SUBTYPES
+from mindsdb_native.libs.helpers.confidence_helpers import (
+    get_numerical_conf_range,
+    get_categorical_conf,
+    set_conf_range,
+    get_all_categorical_ranges,
+    CATEGORICAL_CONF_CANDIDATES
+)
+
+
+def _loop_numerical_conf_range(all_confs, tolerance):
+    """ Per-sample, per-level reference implementation of the bound selection """
+    significances = []
+    conf_ranges = []
+    for sample_idx in range(all_confs.shape[0]):
+        sample = all_confs[sample_idx, :, :]
+        for idx in range(sample.shape[1]):
+            significance = (99 - idx) / 100
+            diff = sample[1, idx] - sample[0, idx]
+            if diff <= tolerance:
+                significances.append(significance)
+                conf_ranges.append(list(sample[:, idx]))
+                break
+        else:
+            significances.append(0.9991)
+            bounds = sample[:, 0]
+            sigma = (bounds[1] - bounds[0]) / 4
+            conf_ranges.append([bounds[0] - sigma, bounds[1] + sigma])
+    return significances, np.array(conf_ranges)
+
+
+def _loop_categorical_conf(all_confs, conf_candidates):
+    """ Per-sample, per-candidate reference implementation of the significance selection """
+    significances = []
+    for sample_idx in range(all_confs.shape[0]):
+        sample = all_confs[sample_idx, :, :]
+        for idx in range(sample.shape[1]):
+            if np.sum(sample[:, idx]) == 1:
+                significances.append((99 - conf_candidates[idx]) / 100)
+                break
+        else:
+            significances.append(0.005)
+    return significances
+
+
+def _random_numerical_confs(n_rows, seed=0):
+    rng = np.random.RandomState(seed)
+    center = rng.normal(size=(n_rows, 1))
+    # bounds get narrower as the significance level grows, like the ones given by an ICP
+    half_widths = np.sort(rng.exponential(scale=2, size=(n_rows, 99)), axis=1)[:, ::-1]
+    return np.stack([center - half_widths, center + half_widths], axis=1)
+
+
+def _random_categorical_confs(n_rows, n_classes=4, seed=0):
+    rng = np.random.RandomState(seed)
+    pvals = rng.uniform(size=(n_rows, n_classes))
+    return pvals[:, :, np.newaxis] > (np.array(CATEGORICAL_CONF_CANDIDATES) / 100)
+
+
+class _FakeRegressionICP:
+    def __init__(self, all_ranges):
+        self.all_ranges = all_ranges
+
+    def predict(self, x):
+        return self.all_ranges.copy()
+
+
+class _FakeFrame:
+    def __init__(self, n_rows):
+        self.values = np.zeros((n_rows, 1))
+        self.shape = self.values.shape
+
+
+class TestConfidenceHelpers(unittest.TestCase):
+    def test_numerical_conf_range(self):
+        all_confs = _random_numerical_confs(500)
+        for std_dev in [0.01, 1, 3, 100]:
+            stats = {'y': {'train_std_dev': {'__default': std_dev}}}
+
+            significances, ranges = get_numerical_conf_range(all_confs, 'y', stats)
+            expected_significances, expected_ranges = _loop_numerical_conf_range(all_confs, std_dev)
+
+            assert significances == expected_significances
+            assert np.array_equal(ranges, expected_ranges)
+
+    def test_numerical_conf_range_positive_domain(self):
+        all_confs = _random_numerical_confs(100)
+        stats = {'y': {'train_std_dev': {'__default': 1}, 'positive_domain': True}}
+        _, ranges = get_numerical_conf_range(all_confs, 'y', stats)
+        assert (ranges >= 0).all()
+
+    def test_categorical_conf(self):
+        all_confs = _random_categorical_confs(500)
+        significances = get_categorical_conf(all_confs, CATEGORICAL_CONF_CANDIDATES)
+        assert significances == _loop_categorical_conf(all_confs, CATEGORICAL_CONF_CANDIDATES)
+
+    def test_set_conf_range(self):
+        typing_info = {'data_type': DATA_TYPES.NUMERIC, 'data_subtype': DATA_SUBTYPES.FLOAT}
+        all_ranges = _random_numerical_confs(300)
+
+        for std_dev in [0.01, 0.5, 1, 100]:
+            lmd = {'stats_v2': {'y': {'train_std_dev': {'__default': std_dev}, 'typing': typing_info}}}
+            confidence, ranges = set_conf_range(_FakeFrame(300), _FakeRegressionICP(all_ranges), 'y', typing_info, lmd)
+
+            expected_confidence, expected_ranges = 0.9901, all_ranges[:, :, 0]
+            for tol in [1, 2, 3]:
+                spreads = [np.mean(all_ranges[:, 1, s] - all_ranges[:, 0, s]) for s in range(99)]
+                matches = [s for s in range(99) if spreads[s] <= std_dev * tol]
+                if matches:
+                    expected_confidence = (99 - matches[0]) / 100
+                    expected_ranges = all_ranges[:, :, matches[0]]
+                    break
+
+            assert confidence == expected_confidence
+            assert np.array_equal(ranges, expected_ranges)
+
+    def test_all_categorical_ranges(self):
+        rng = np.random.RandomState(0)
+        X = rng.normal(size=(600, 3))
+        y = (X[:, 0] > 0).astype(int) + (X[:, 1] > 0.5).astype(int)
+
+        # without smoothing the p-values are deterministic, so both paths must give the very same label sets
+        icp = IcpClassifier(ClassifierNc(ClassifierAdapter(DecisionTreeClassifier(max_depth=3, random_state=0))), smoothing=False)
+        icp.fit(X[:300], y[:300])
+        icp.calibrate(X[300:500], y[300:500])
+
+        all_ranges = get_all_categorical_ranges(icp, X[500:], CATEGORICAL_CONF_CANDIDATES)
+        expected_ranges = np.stack([icp.predict(X[500:], significance=s / 100) for s in CATEGORICAL_CONF_CANDIDATES], axis=2)
+
+        assert all_ranges.shape == expected_ranges.shape
+        assert np.array_equal(all_ranges, expected_ranges)
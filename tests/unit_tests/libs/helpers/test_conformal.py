@@ -1,5 +1,6 @@
 import unittest
 import pandas as pd
+import numpy as np
 from copy import deepcopy
 from mindsdb_native import Predictor
 from sklearn.model_selection import train_test_split
@@ -77,3 +78,36 @@ class TestConformal(unittest.TestCase):
 
             for x in r:
                 assert 0 <= x['confidence'] <= 1
+
+    def test_adjust_recalibration(self):
+        """
+        Adjusting merges the new rows into the statistics and the calibration of the ICP,
+        which keeps at most `icp_calibration_window` nonconformity scores.
+        """
+        X, y = load_boston(return_X_y=True)
+        target = 'medv'
+        df = self._df_from_xy(X, y, target)
+        learn_df, adjust_df = df[:300], df[300:]
+
+        p = Predictor('test_conformal_adjust')
+        p.learn(
+            from_data=learn_df,
+            to_predict=target,
+            stop_training_in_x_seconds=1,
+            advanced_args={'debug': True, 'icp_calibration_window': 40, 'use_mixers': ['NnMixer']}
+        )
+        row_count = p.transaction.lmd['data_preparation']['total_row_count']
+
+        p.adjust(from_data=adjust_df)
+        lmd = p.transaction.lmd
+        assert lmd['data_preparation']['total_row_count'] == row_count + len(adjust_df)
+        # numerical histograms count the rows at the rate the analysis sampled them at
+        assert np.isclose(sum(lmd['stats_v2']['c0']['histogram']['y']), lmd['data_preparation']['used_row_count'])
+
+        icp = p.transaction.hmd['icp'][target]['__default']
+        assert len(icp.mdb_cal_history) == 40
+        assert len(icp.cal_scores[0]) == 40
+
+        r = p.predict(when_data=adjust_df)
+        for x in [x.explanation[target] for x in r]:
+            assert x['confidence_interval'][0] <= x['predicted_value'] <= x['confidence_interval'][1]
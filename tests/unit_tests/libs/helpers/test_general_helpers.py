@@ -1,7 +1,13 @@
+import os
+import pickle
+import tempfile
 import unittest
+import numpy as np
 import pandas as pd
 from mindsdb_native.libs.constants.mindsdb import DATA_TYPES, DATA_SUBTYPES
-from mindsdb_native.libs.helpers.general_helpers import (evaluate_accuracy)
+from mindsdb_native.libs.data_types.light_model_metadata import LightModelMetadata
+from mindsdb_native.libs.helpers.general_helpers import (evaluate_accuracy, load_lmd, save_lmd, dump_lmd,
+                                                          apply_to_unique, factorize_values)
 
 
 class TestEvaluateAccuracy(unittest.TestCase):
@@ -125,3 +131,136 @@ class TestEvaluateAccuracy(unittest.TestCase):
                                          output_columns)
 
             assert round(accuracy, 2) == 0.75
+
+
+class TestLightMetadataStorage(unittest.TestCase):
+    def _make_lmd(self, n_columns):
+        stats_v2 = {}
+        for i in range(n_columns):
+            stats_v2[f'col_{i}'] = {
+                'typing': {'data_type': DATA_TYPES.NUMERIC, 'data_subtype': DATA_SUBTYPES.FLOAT},
+                'histogram': {'x': list(range(100)), 'y': list(range(100))},
+                'outliers': list(range(200))
+            }
+        return {
+            'name': 'test_model',
+            'columns': list(stats_v2),
+            'predict_columns': ['col_0'],
+            'tss': {'is_timeseries': False},
+            'setup_args': None,
+            'stats_v2': stats_v2,
+            'column_importances': {col: 1 for col in stats_v2},
+            'accuracy_samples': {'col_0': list(range(10000))},
+            'confusion_matrices': {}
+        }
+
+    def test_sectioned_roundtrip(self):
+        path = os.path.join(tempfile.mkdtemp(), 'light_model_metadata.pickle')
+        lmd = self._make_lmd(10)
+        save_lmd(path, lmd)
+
+        loaded = load_lmd(path)
+        assert isinstance(loaded, LightModelMetadata)
+        assert loaded.loaded_sections == set()
+        assert loaded['predict_columns'] == ['col_0']
+        assert 'stats_v2' in loaded
+        assert loaded.loaded_sections == set()
+
+        assert loaded['stats_v2'] == lmd['stats_v2']
+        assert loaded.loaded_sections == {'stats'}
+
+        copy = loaded.copy()
+        copy['name'] = 'other'
+        assert loaded['name'] == 'test_model'
+        assert copy['column_importances'] == lmd['column_importances']
+        assert loaded.loaded_sections == {'stats', 'analysis'}
+
+        assert dict(loaded) == lmd
+        assert pickle.loads(pickle.dumps(loaded)) == lmd
+
+    def test_dump_core_only(self):
+        path = os.path.join(tempfile.mkdtemp(), 'light_model_metadata.pickle')
+        lmd = self._make_lmd(10)
+        save_lmd(path, lmd)
+
+        loaded = load_lmd(path)
+        loaded['current_phase'] = 'Training'
+        files = dump_lmd(path, loaded)
+        assert [fn for fn, _ in files] == [path]
+        assert loaded.loaded_sections == set()
+
+        with open(path, 'wb') as fp:
+            fp.write(files[0][1])
+        reloaded = load_lmd(path)
+        assert reloaded['current_phase'] == 'Training'
+        assert reloaded['stats_v2'] == lmd['stats_v2']
+
+    def test_stored_sections(self):
+        path = os.path.join(tempfile.mkdtemp(), 'light_model_metadata.pickle')
+        lmd = self._make_lmd(10)
+
+        # Sections not written yet are always written before the core
+        stored_sections = {}
+        files = dump_lmd(path, lmd, stored_sections)
+        assert [fn for fn, _ in files][-1] == path
+        assert len(files) == 3
+        assert set(stored_sections) == {'stats', 'analysis'}
+
+        lmd['current_phase'] = 'Training'
+        files = dump_lmd(path, lmd, stored_sections)
+        assert [fn for fn, _ in files] == [path]
+
+    def test_section_version(self):
+        path = os.path.join(tempfile.mkdtemp(), 'light_model_metadata.pickle')
+        lmd = self._make_lmd(10)
+        save_lmd(path, lmd)
+        loaded = load_lmd(path)
+
+        # The model is learned again before the sections of the old core are read
+        lmd['stats_v2']['col_0']['outliers'] = []
+        save_lmd(path, lmd)
+        with self.assertRaises(Exception):
+            loaded['stats_v2']
+
+        assert load_lmd(path)['stats_v2'] == lmd['stats_v2']
+
+    def test_legacy_format(self):
+        path = os.path.join(tempfile.mkdtemp(), 'light_model_metadata.pickle')
+        lmd = self._make_lmd(10)
+        del lmd['tss']
+        with open(path, 'wb') as fp:
+            pickle.dump(lmd, fp)
+
+        loaded = load_lmd(path)
+        assert loaded['tss'] == {'is_timeseries': False}
+        assert loaded['stats_v2'] == lmd['stats_v2']
+
+
+class TestApplyToUnique(unittest.TestCase):
+    def test_same_as_apply(self):
+        calls = []
+
+        def to_str(x):
+            calls.append(x)
+            return x if x is None else str(x)
+
+        for series in [
+            pd.Series(['a', 'b', 'a', None, np.nan, 'a', None], index=[6, 5, 4, 3, 2, 1, 0]),
+            pd.Series([1.5, np.nan, 1.5, 2.0]),
+            pd.Series([1, True, 1.0, '1', None, 1], dtype=object),
+            pd.Series([[1], [1], 'x'], dtype=object)
+        ]:
+            expected = series.apply(to_str)
+            calls.clear()
+            result = apply_to_unique(series, to_str)
+            assert result.dtype == expected.dtype
+            assert list(result.index) == list(expected.index)
+            assert [repr(x) for x in result] == [repr(x) for x in expected]
+
+            codes, distinct = factorize_values(series)
+            assert [repr(x) for x in distinct.take(codes)] == [repr(x) for x in series]
+            assert len(calls) == len(distinct)
+
+        # 1, True and 1.0 aren't merged, but repeated values are
+        codes, distinct = factorize_values(pd.Series([1, True, 1.0, '1', None, 1], dtype=object))
+        assert list(codes) == [0, 1, 2, 3, 4, 0]
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+from mindsdb_native.libs.helpers.metadata_writer import MetadataWriter
+
+
+class TestMetadataWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path_a = os.path.join(self.tmp_dir, 'a.pickle')
+        self.path_b = os.path.join(self.tmp_dir, 'b.pickle')
+
+    def _read(self, path):
+        with open(path, 'rb') as fp:
+            return fp.read()
+
+    def test_skips_unchanged_files(self):
+        writer = MetadataWriter()
+        writer.write([(self.path_a, b'a1'), (self.path_b, b'b1')])
+        mtime = os.stat(self.path_a).st_mtime_ns
+        os.remove(self.path_b)
+
+        writer.write([(self.path_a, b'a1'), (self.path_b, b'b1')])
+        # Unchanged, but rewritten if it's no longer on disk
+        assert os.stat(self.path_a).st_mtime_ns == mtime
+        assert self._read(self.path_b) == b'b1'
+
+        writer.write([(self.path_a, b'a2')])
+        assert self._read(self.path_a) == b'a2'
+        assert all(not x.endswith('.tmp') for x in os.listdir(self.tmp_dir))
+
+    def test_background_writes(self):
+        writer = MetadataWriter(background=True)
+        for i in range(50):
+            writer.write([(self.path_a, str(i).encode()), (self.path_b, b'b')])
+        writer.write([(self.path_a, b'last')])
+        writer.flush()
+
+        assert self._read(self.path_a) == b'last'
+        assert self._read(self.path_b) == b'b'
+
+        writer.close()
+        self.assertRaises(Exception, writer.write, [(self.path_a, b'closed')])
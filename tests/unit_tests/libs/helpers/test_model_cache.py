@@ -0,0 +1,142 @@
+import os
+import time
+import pickle
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from mindsdb_native.config import CONFIG
+from mindsdb_native.libs.helpers.model_cache import ModelCache
+
+
+def _make_icp(model):
+    adapter = SimpleNamespace(model=model, prediction_cache=None)
+    normalizer = SimpleNamespace(model=model, prediction_cache=None)
+    return SimpleNamespace(nc_function=SimpleNamespace(model=adapter, normalizer=normalizer))
+
+
+class TestModelCache(unittest.TestCase):
+    def setUp(self):
+        self.storage_path = tempfile.mkdtemp()
+        self.patcher = mock.patch.object(CONFIG, 'MINDSDB_STORAGE_PATH', self.storage_path)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def _save_model(self, name, payload=b''):
+        os.makedirs(os.path.join(self.storage_path, name), exist_ok=True)
+        with open(os.path.join(self.storage_path, name, 'light_model_metadata.pickle'), 'wb') as fp:
+            pickle.dump({'name': name, 'payload': payload}, fp)
+
+    def test_metadata_roundtrip(self):
+        cache = ModelCache(max_models=2, max_memory=pow(10, 9))
+        self._save_model('a')
+
+        assert cache.get_metadata('a') is None
+        cache.set_metadata('a', {'name': 'a'}, {'name': 'a'})
+        lmd, hmd = cache.get_metadata('a')
+        assert lmd == {'name': 'a'}
+
+        # Callers get copies, overwriting top-level keys doesn't leak into the cache
+        lmd['name'] = 'b'
+        assert cache.get_metadata('a')[0]['name'] == 'a'
+
+    def test_lru_eviction(self):
+        cache = ModelCache(max_models=2, max_memory=pow(10, 9))
+        for name in ['a', 'b', 'c']:
+            self._save_model(name)
+
+        cache.set_metadata('a', {}, {})
+        cache.set_metadata('b', {}, {})
+        cache.get_metadata('a')
+        cache.set_metadata('c', {}, {})
+
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert 'c' in cache
+
+    def test_memory_cap(self):
+        cache = ModelCache(max_models=10, max_memory=1500)
+        self._save_model('a', payload=b'0' * 1000)
+        self._save_model('b', payload=b'0' * 1000)
+
+        cache.set_metadata('a', {}, {})
+        cache.set_metadata('b', {}, {})
+
+        assert len(cache) == 1
+        assert 'b' in cache
+
+    def test_invalidation(self):
+        cache = ModelCache(max_models=2, max_memory=pow(10, 9))
+        self._save_model('a')
+        cache.set_metadata('a', {}, {})
+
+        cache.invalidate('a')
+        assert cache.get_metadata('a') is None
+
+        # Rewriting the model on disk (e.g. from another process) also invalidates it
+        cache.set_metadata('a', {}, {})
+        time.sleep(0.01)
+        self._save_model('a', payload=b'new version')
+        assert cache.get_metadata('a') is None
+
+    def test_disabled(self):
+        cache = ModelCache(max_models=0, max_memory=pow(10, 9))
+        self._save_model('a')
+        cache.set_metadata('a', {}, {})
+        assert cache.get_metadata('a') is None
+
+    def test_icps_not_shared(self):
+        cache = ModelCache(max_models=2, max_memory=pow(10, 9))
+        self._save_model('a')
+        model = object()
+        icp = _make_icp(model)
+        cache.set_metadata('a', {}, {'icp': {'__mdb_active': True, 'y': {'__default': icp, '__mdb_groups': []}}})
+
+        _, hmd_1 = cache.get_metadata('a')
+        _, hmd_2 = cache.get_metadata('a')
+        icp_1 = hmd_1['icp']['y']['__default']
+        icp_2 = hmd_2['icp']['y']['__default']
+
+        # Each transaction caches its own predictions, but the predictor isn't copied
+        icp_1.nc_function.model.prediction_cache = [1]
+        assert icp_2.nc_function.model.prediction_cache is None
+        assert icp.nc_function.model.prediction_cache is None
+        assert icp_1.nc_function.model.model is model
+        assert icp_2.nc_function.normalizer.model is model
+
+    def test_concurrent_predictor_loads(self):
+        cache = ModelCache(max_models=2, max_memory=pow(10, 9))
+        self._save_model('a')
+        self._save_model('b')
+
+        loading_a = threading.Event()
+        release_a = threading.Event()
+        loads = []
+
+        def load(name, gb_val=''):
+            loads.append(name)
+            if name == 'a':
+                loading_a.set()
+                release_a.wait(5)
+            return f'predictor {name}'
+
+        with mock.patch('mindsdb_native.libs.helpers.model_cache._load_lightwood_predictor', side_effect=load):
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(cache.get_predictor('a'))) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            assert loading_a.wait(5)
+
+            # Loading a model doesn't block the others
+            assert cache.get_predictor('b') == 'predictor b'
+
+            release_a.set()
+            for thread in threads:
+                thread.join()
+
+        assert results == ['predictor a'] * 2
+        assert loads.count('a') == 1
@@ -0,0 +1,46 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import pandas as pd
+from mindsdb_datasources import FileDS, SQLite3DS
+
+from mindsdb_native.libs.helpers.multi_data_source import iter_data_chunks
+
+
+class TestIterDataChunks(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def test_csv_chunks_match_file_ds(self):
+        path = os.path.join(self.tmp_dir, 'data.csv')
+        with open(path, 'w') as fp:
+            fp.write('a;b;c\n1;x;NA\n2;;3.5\n3;nan;4\n4;y;5\n5;z;\n')
+
+        chunks = list(iter_data_chunks(path, 2))
+        assert [len(x) for x in chunks] == [2, 2, 1]
+
+        df = pd.concat(chunks).reset_index(drop=True)
+        expected = FileDS(path).df
+        assert list(df.columns) == list(expected.columns)
+        assert df.fillna('null').values.tolist() == expected.fillna('null').values.tolist()
+
+    def test_sql_chunks(self):
+        path = os.path.join(self.tmp_dir, 'data.db')
+        con = sqlite3.connect(path)
+        con.execute('CREATE TABLE data (a INTEGER, b TEXT)')
+        con.executemany('INSERT INTO data VALUES (?, ?)', [(i, str(i)) for i in range(7)])
+        con.commit()
+        con.close()
+
+        chunks = list(iter_data_chunks(SQLite3DS('SELECT * FROM data', path), 3))
+        assert [len(x) for x in chunks] == [3, 3, 1]
+        assert list(pd.concat(chunks)['a']) == list(range(7))
+
+    def test_in_memory_chunks(self):
+        chunks = list(iter_data_chunks([{'a': i} for i in range(5)], 2))
+        assert [len(x) for x in chunks] == [2, 2, 1]
+
+        chunks = list(iter_data_chunks(pd.DataFrame({'a': range(5)}), 3))
+        assert [list(x['a']) for x in chunks] == [[0, 1, 2], [3, 4]]
@@ -0,0 +1,26 @@
+import unittest
+
+from mindsdb_native.libs.helpers.stats_helpers import merge_bucketed_histogram, merge_counts_histogram
+
+
+class TestStatsHelpers(unittest.TestCase):
+    def test_merge_bucketed_histogram(self):
+        histogram = {'x': [0, 10, 20], 'y': [1, 2, 3]}
+        merged = merge_bucketed_histogram(histogram, [-5, 0, 9.5, 10, 25, 100])
+        assert merged == {'x': [0, 10, 20], 'y': [4, 3, 5]}
+        # the original histogram is left untouched
+        assert histogram == {'x': [0, 10, 20], 'y': [1, 2, 3]}
+
+        assert merge_bucketed_histogram(histogram, []) == histogram
+
+        # values added to a histogram of a sample count at the rate it was sampled at
+        merged = merge_bucketed_histogram(histogram, [0, 0, 25], weight=0.5)
+        assert merged == {'x': [0, 10, 20], 'y': [2, 2, 3.5]}
+
+    def test_merge_counts_histogram(self):
+        histogram = {'x': ['a', 'b'], 'y': [1, 2]}
+        merged = merge_counts_histogram(histogram, {'x': ['c', 'a'], 'y': [5, 1]})
+        assert merged == {'x': ['a', 'b', 'c'], 'y': [2, 2, 5]}
+
+        merged = merge_counts_histogram(histogram, {'x': ['c', 'a'], 'y': [4, 2]}, weight=0.5)
+        assert merged == {'x': ['a', 'b', 'c'], 'y': [2, 2, 2]}
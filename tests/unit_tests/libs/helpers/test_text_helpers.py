@@ -2,14 +2,21 @@ import unittest
 from collections import Counter
 import random
 import string
+import uuid
+from unittest import mock
+
+import langdetect
+import pandas as pd
 
 from mindsdb_native.libs.constants.mindsdb import DATA_SUBTYPES, DATA_TYPES
+from mindsdb_native.libs.helpers import text_helpers
 from mindsdb_native.libs.helpers.text_helpers import (
     get_language_dist,
+    get_stopwords,
     analyze_sentences
 )
 
-from mindsdb_native.libs.helpers.text_helpers import get_identifier_description
+from mindsdb_native.libs.helpers.text_helpers import get_identifier_description, IDENTIFIER_SAMPLE_SIZE
 
 
 class TestTextHelpers(unittest.TestCase):
@@ -48,6 +55,42 @@ class TestTextHelpers(unittest.TestCase):
             assert lang_dist[lang] == len(SENTENCES[lang])
 
 
+    def test_sequential_language_detection(self):
+        sentences = [f'The weather was lovely on day number {i} of the long summer holidays' for i in range(1000)]
+        words = [f'x{i}z' for i in range(1000)]
+
+        with mock.patch.object(langdetect, 'detect_langs', wraps=langdetect.detect_langs) as detect_langs:
+            lang_dist = get_language_dist(sentences, unknown_share_threshold=0.5)
+            assert detect_langs.call_count < 100
+        assert lang_dist['en'] == len(sentences)
+        assert lang_dist['Unknown'] == 0
+
+        with mock.patch.object(langdetect, 'detect_langs', wraps=langdetect.detect_langs) as detect_langs:
+            lang_dist = get_language_dist(words, unknown_share_threshold=0.5)
+            assert detect_langs.call_count < 100
+        assert lang_dist['Unknown'] / len(words) > 0.5
+
+        # Without a threshold every cell is looked at
+        with mock.patch.object(langdetect, 'detect_langs', wraps=langdetect.detect_langs) as detect_langs:
+            get_language_dist(sentences)
+            assert detect_langs.call_count == len(sentences)
+
+    def test_stopwords_loaded_once(self):
+        with mock.patch.dict(text_helpers._stopwords_cache, clear=True), \
+                mock.patch.object(text_helpers, 'stopwords', new=mock.MagicMock()) as stopwords, \
+                mock.patch('nltk.download') as download:
+            stopwords.words.return_value = ['the', 'a']
+            assert get_stopwords('english') == {'the', 'a'}
+            assert get_stopwords('english') == {'the', 'a'}
+            assert stopwords.words.call_count == 1
+            download.assert_not_called()
+
+            # Not available locally and can't be downloaded
+            stopwords.words.side_effect = LookupError
+            assert get_stopwords('german') == set()
+            assert get_stopwords('german') == set()
+            assert download.call_count == 1
+
     def test_identifiers(self):
         N = 300
 
@@ -70,3 +113,23 @@ class TestTextHelpers(unittest.TestCase):
         assert get_identifier_description(incrementing_data_2, 'col', DATA_TYPES.NUMERIC, DATA_SUBTYPES.INT, []) is not None
         assert get_identifier_description(incrementing_data_3, 'col', DATA_TYPES.NUMERIC, DATA_SUBTYPES.INT, []) is not None
         assert get_identifier_description(incrementing_data_4, 'col', DATA_TYPES.NUMERIC, DATA_SUBTYPES.INT, []) is None
+
+    def test_identifiers_sampled(self):
+        """Columns larger than the sample get the same descriptions"""
+        N = IDENTIFIER_SAMPLE_SIZE * 5
+
+        hash_like_data = pd.Series([''.join(random.choices(string.ascii_letters, k=12)) for _ in range(N)])
+        incrementing_data = pd.Series(range(10000, 10000 + N))
+        shuffled_incrementing_data = incrementing_data.sample(frac=1, random_state=1)
+        uuid_data = pd.Series([str(uuid.uuid4()) for _ in range(N)])
+        categorical_data = pd.Series([random.choice(['a', 'b', 'c']) for _ in range(N)])
+        # Unique but for a few duplicates, which the sample is unlikely to see
+        nearly_unique_data = pd.Series([f'value_{i % (N - 100)}' for i in range(N)])
+
+        assert get_identifier_description(hash_like_data, 'col', DATA_TYPES.CATEGORICAL, DATA_SUBTYPES.MULTIPLE, []) == 'Hash-like identifier'
+        assert get_identifier_description(incrementing_data, 'col', DATA_TYPES.NUMERIC, DATA_SUBTYPES.INT, []) == 'Auto-incrementing identifier'
+        assert get_identifier_description(shuffled_incrementing_data, 'col', DATA_TYPES.NUMERIC, DATA_SUBTYPES.INT, []) == 'Auto-incrementing identifier'
+        assert get_identifier_description(uuid_data, 'uuid', DATA_TYPES.CATEGORICAL, DATA_SUBTYPES.MULTIPLE, []) == 'UUID'
+        assert get_identifier_description(categorical_data, 'col', DATA_TYPES.CATEGORICAL, DATA_SUBTYPES.MULTIPLE, []) is None
+        assert get_identifier_description(categorical_data, 'user', DATA_TYPES.CATEGORICAL, DATA_SUBTYPES.MULTIPLE, []) is None
+        assert get_identifier_description(nearly_unique_data, 'col', DATA_TYPES.TEXT, DATA_SUBTYPES.SHORT, []) is None
@@ -0,0 +1,64 @@
+import time
+import unittest
+
+import pandas as pd
+
+from mindsdb_native.libs.helpers.time_budget import TimeBudget, MIN_SAMPLE_ROWS
+
+
+PHASES = ['TypeDeductor', 'DataAnalyzer', 'ModelInterface', 'ModelAnalyzer']
+
+
+class TestTimeBudget(unittest.TestCase):
+    def test_deadlines(self):
+        budget = TimeBudget(total=100, phases=PHASES)
+        budget.plan(nr_rows=10000, nr_columns=10)
+        assert budget.enforced
+
+        assert budget.time_left('TypeDeductor') is None
+        budget.start_phase('TypeDeductor')
+        # 1e5 cells at 3e-5 seconds per cell
+        assert 2.5 < budget.time_left('TypeDeductor') <= 3
+        assert budget.time_left('DataAnalyzer') is None
+        budget.finish_phase('TypeDeductor')
+        assert budget.time_left('TypeDeductor') is None
+
+        budget.start_phase('DataAnalyzer')
+        budget.finish_phase('DataAnalyzer')
+
+        # Time not used by the previous phases goes to the following ones
+        budget.start_phase('ModelInterface')
+        assert budget.time_left('ModelInterface') > 94 * 3 / 4
+        budget.finish_phase('ModelInterface')
+
+        assert [x['name'] for x in budget.report['phases']] == PHASES[:3]
+        assert all(x['actual'] is not None for x in budget.report['phases'])
+        assert budget.report['total'] == 100
+
+    def test_training_floor(self):
+        budget = TimeBudget(total=100, started_at=time.time() - 200, phases=PHASES)
+        budget.plan(nr_rows=100, nr_columns=2)
+        budget.start_phase('ModelInterface')
+        assert 9 < budget.time_left('ModelInterface') <= 10
+
+        budget.finish_phase('ModelInterface')
+        budget.start_phase('ModelAnalyzer')
+        assert budget.time_left('ModelAnalyzer') <= 0
+
+    def test_fit_sample(self):
+        df = pd.DataFrame({'x': range(MIN_SAMPLE_ROWS * 10)})
+
+        budget = TimeBudget(total=0.001, phases=PHASES)
+        budget.plan(*df.shape)
+        budget.start_phase('TypeDeductor')
+        sample_df = budget.fit_sample('TypeDeductor', df)
+        assert len(sample_df) == MIN_SAMPLE_ROWS
+        assert sample_df.equals(budget.fit_sample('TypeDeductor', df))
+
+        # Without a budget set by the user, the data is never sampled
+        budget = TimeBudget(started_at=time.time() - 3600 * 24, phases=PHASES)
+        budget.plan(*df.shape)
+        budget.start_phase('TypeDeductor')
+        assert not budget.enforced
+        assert budget.fit_sample('TypeDeductor', df) is df
+        assert budget.report['total'] is None
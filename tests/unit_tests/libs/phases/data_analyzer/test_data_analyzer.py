@@ -3,10 +3,14 @@ import json
 import unittest
 from unittest import mock
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 import numpy as np
 import pandas as pd
 
 from mindsdb_native.libs.controllers.functional import analyse_dataset
+from mindsdb_native.libs.phases.data_analyzer.data_analyzer import DataAnalyzer
+from mindsdb_native.libs.data_types.mindsdb_logger import log
+from mindsdb_native.libs.helpers.date_helpers import ParseMemo
 from mindsdb_native.libs.helpers.stats_helpers import sample_data
 from unit_tests.utils import (
     test_column_types,
@@ -172,6 +176,37 @@ class TestDataAnalyzer(unittest.TestCase):
 
         assert stats['categorical_binary']['guess_probability'] == (9 / 12)**2 + (3 / 12)**2
 
+    def test_adjust_matches_learn(self):
+        """
+        Merging new rows into the statistics gives the same guess probabilities and warnings as analyzing all the rows
+        """
+        n_points = 150
+        df = pd.DataFrame({
+            'numeric_int': [x % 10 for x in range(n_points)],
+            'categorical_str': pd.Series([None if x % 7 == 0 else ['a', 'b', 'b', 'c'][x % 4] for x in range(n_points)],
+                                         dtype=object)
+        })
+
+        def analyze(data):
+            with mock.patch('mindsdb_native.libs.controllers.functional.get_model_data', side_effect=lambda lmd: lmd):
+                return analyse_dataset(data)
+
+        lmd = analyze(df.iloc[:100])
+        transaction = SimpleNamespace(lmd=lmd, hmd={}, log=log, parse_memo=ParseMemo())
+        DataAnalyzer(None, transaction)._merge_stats(SimpleNamespace(data_frame=df.iloc[100:]))
+        learned = analyze(df)['stats_v2']['categorical_str']
+        adjusted = lmd['stats_v2']['categorical_str']
+
+        assert dict(zip(adjusted['histogram']['x'], adjusted['histogram']['y'])) == \
+            dict(zip(learned['histogram']['x'], learned['histogram']['y']))
+        # As it's always been computed: over the histogram, divided by the nr of non-null values
+        nr_values = df['categorical_str'].notna().sum()
+        assert np.isclose(learned['guess_probability'], sum((k / nr_values)**2 for k in learned['histogram']['y']))
+        assert np.isclose(adjusted['guess_probability'], learned['guess_probability'])
+        assert adjusted['balanced_guess_probability'] == learned['balanced_guess_probability']
+        assert adjusted['nr_warnings'] == learned['nr_warnings']
+        assert adjusted['empty']['empty_cells'] == learned['empty']['empty_cells']
+
     def test_analyze_dataset_empty_column(self):
         n_points = 100
         df = pd.DataFrame({
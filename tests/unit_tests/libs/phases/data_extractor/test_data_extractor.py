@@ -6,6 +6,7 @@ import pandas as pd
 
 from mindsdb_native import Predictor
 from mindsdb_native.libs.controllers.transaction import BreakpointException
+from mindsdb_native.libs.phases.data_extractor.data_extractor import _normalize_df, _replace_infs
 
 
 class TestDataExtractor(unittest.TestCase):
@@ -65,3 +66,23 @@ class TestDataExtractor(unittest.TestCase):
             null_count += predictor.transaction.input_data.data_frame[col].isna().sum()
 
         assert null_count == 6
+
+    def test_normalize_df(self):
+        df = pd.DataFrame({
+            'numeric_int': [1, 2, 3, 4],
+            'numeric_float': [1.5, np.nan, np.inf, -np.inf],
+            'categorical_str': ['a', None, np.nan, 'b'],
+            'list': [[1, 2], None, [3], 'x'],
+            'object_float': pd.Series([1.0, np.inf, None, 2.0], dtype=object)
+        })
+
+        normalized = _normalize_df(df)
+        assert df['list'][0] == [1, 2]
+        assert normalized['numeric_int'].dtype == df['numeric_int'].dtype
+        assert normalized['numeric_float'].dtype == df['numeric_float'].dtype
+        assert list(normalized['categorical_str']) == ['a', None, None, 'b']
+        assert list(normalized['list']) == [(1, 2), None, (3,), 'x']
+
+        assert _replace_infs(normalized) == 3
+        assert normalized['numeric_float'].isna().sum() == 3
+        assert list(normalized['object_float']) == [1.0, None, None, 2.0]
@@ -62,3 +62,36 @@ class TestDataSplitter:
         assert len(all_indexes[(2, 1)]) == 25
         assert len(all_indexes[(2, 2)]) == 25
         assert len(all_indexes[tuple()]) == 100
+
+    def test_max_train_rows_memory(self):
+        predictor = Predictor('test_max_train_rows_memory')
+        predictor.breakpoint = 'DataSplitter'
+
+        df = pd.DataFrame({
+            'col_a': [*range(1000)],
+            'col_b': [*range(1000)]
+        })
+        row_size = df.memory_usage(index=True, deep=True).sum() / len(df)
+
+        try:
+            predictor.learn(
+                from_data=df,
+                to_predict='col_b',
+                advanced_args={
+                    'force_column_usage': ['col_a', 'col_b'],
+                    # Enough memory for ~100 training rows
+                    'max_train_rows_memory': int(row_size * 4 * 100)
+                }
+            )
+        except BreakpointException:
+            pass
+        else:
+            raise AssertionError
+
+        train_df = predictor.transaction.input_data.train_df
+        assert 0 < len(train_df) <= 100
+        # The data is shuffled by the extraction, the kept rows are a sample of the training rows in any order
+        assert train_df['col_a'].is_unique
+        assert set(train_df['col_a']) <= set(range(1000))
+        # Only the training rows are capped
+        assert len(predictor.transaction.input_data.validation_df) == 100
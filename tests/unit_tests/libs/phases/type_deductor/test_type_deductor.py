@@ -12,6 +12,8 @@ from mindsdb_native import Predictor
 from mindsdb_native.libs.controllers.transaction import BreakpointException
 from mindsdb_native.libs.constants.mindsdb import DATA_TYPES, DATA_SUBTYPES
 from mindsdb_native.libs.helpers.stats_helpers import sample_data
+from mindsdb_native.libs.helpers.column_cache import COLUMN_CACHE
+from mindsdb_native.libs.phases.type_deductor.type_deductor import vectorized_type_check, count_data_types_in_column
 from unit_tests.utils import (
     test_column_types,
     generate_short_sentences,
@@ -298,3 +300,61 @@ class TestTypeDeductor(unittest.TestCase):
 
         assert predictor.transaction.lmd['stats_v2']['datetime']['typing']['data_type'] == DATA_TYPES.DATE
         assert predictor.transaction.lmd['stats_v2']['datetime']['typing']['data_subtype'] == DATA_SUBTYPES.TIMESTAMP
+
+    def test_vectorized_type_check(self):
+        """Cells typed in bulk get the types the per cell checkers would give them, the others are left to them"""
+        data = ['12', '-3', '1.5e3', '.5', ' 3,5', '²', 'nan', '1,2,3', 'hello',
+                '2020-01-02', '2020-01-02 00:00', '2020-01-02T10:11:12.123456', '2020-02-30', '01/02/2020']
+        lmd = {'dateutil_parser_kwargs_per_column': {}}
+
+        types, subtypes = vectorized_type_check(pd.Series(data))
+        assert types.tolist() == [DATA_TYPES.NUMERIC] * 4 + [None] * 5 + [DATA_TYPES.DATE] * 3 + [None] * 2
+        assert subtypes.tolist()[:4] == [DATA_SUBTYPES.INT] + [DATA_SUBTYPES.FLOAT] * 3
+        assert subtypes.tolist()[9:12] == [DATA_SUBTYPES.DATE, DATA_SUBTYPES.DATE, DATA_SUBTYPES.TIMESTAMP]
+
+        type_counts, subtype_counts, _ = count_data_types_in_column(pd.Series(data), lmd, 'col')
+        assert type_counts[DATA_TYPES.NUMERIC] == 5
+        assert type_counts[DATA_TYPES.SEQUENTIAL] == 1
+        assert type_counts[DATA_TYPES.DATE] == 4
+        assert subtype_counts[DATA_SUBTYPES.DATE] == 3
+
+        # Dates only take the fast path when they're parsed without options
+        types, _ = vectorized_type_check(pd.Series(data), check_dates=False)
+        assert types.isna().sum() == 10
+
+    @mock.patch.object(COLUMN_CACHE, 'max_size', 0)
+    @mock.patch('mindsdb_native.libs.phases.type_deductor.type_deductor.MIN_CELLS_FOR_PROCESSES', 0)
+    def test_multiprocess_type_deduction(self):
+        """Types and identifiers deduced in worker processes are the same whatever the number of processes"""
+        n_points = 500
+        df = pd.DataFrame({
+            'numeric_int': [x % 10 for x in range(n_points)],
+            'numeric_float': np.linspace(0, n_points, n_points),
+            'id': list(range(n_points)),
+            'date': [(datetime(2020, 1, 1) + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(n_points)],
+            'categorical_str': [f'category_{x % 4}' for x in range(n_points)],
+            'categorical': pd.Categorical(['a', 'b'] * (n_points // 2)),
+            'short_text': generate_short_sentences(n_points)
+        })
+
+        stats = []
+        for nr_procs in [1, 2, 3]:
+            predictor = Predictor(name='test_multiprocess_type_deduction')
+            predictor.breakpoint = 'TypeDeductor'
+            with mock.patch('mindsdb_native.libs.phases.type_deductor.type_deductor.get_nr_procs', return_value=nr_procs):
+                try:
+                    predictor.learn(
+                        from_data=df,
+                        to_predict='numeric_int',
+                        advanced_args={'force_column_usage': list(df.columns)}
+                    )
+                except BreakpointException:
+                    pass
+                else:
+                    raise AssertionError
+            stats.append({col: (x['typing'], x['additional_info'], x['identifier'])
+                          for col, x in predictor.transaction.lmd['stats_v2'].items()})
+
+        assert stats[0]['id'][2] is not None
+        assert stats[1] == stats[0]
+        assert stats[2] == stats[0]